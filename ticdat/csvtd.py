@@ -8,6 +8,7 @@ from ticdat.utils import DataFrame, create_generic_free, numericish, case_space_
 from ticdat.utils import freezable_factory, TicDatError, verify, containerish, dictish
 from collections import defaultdict
 from itertools import product
+from operator import itemgetter
 
 try:
     import csv
@@ -16,6 +17,21 @@ except:
 
 _can_unit_test = csv
 
+def _read_table(full_schema, file_path, table, dialect, headers_present, encoding):
+    # reads a (non generator) table file with a TicDatFactory rebuilt from full_schema. Module level, so that
+    # it can be run by a ProcessPoolExecutor
+    from ticdat import TicDatFactory
+    return TicDatFactory.create_from_full_schema(full_schema).csv._create_table(file_path, table, dialect,
+                                                                                  headers_present, encoding)
+
+def _write_table(file_path, dialect, header, rows):
+    # module level, so that it can be run by a ProcessPoolExecutor
+    with open(file_path, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile, dialect=dialect)
+        if header is not None:
+            writer.writerow(header)
+        writer.writerows(rows)
+
 class CsvTicFactory(freezable_factory(object, "_isFrozen")) :
     """
     Primary class for reading/writing csv files with TicDat objects.
@@ -37,7 +53,7 @@ class CsvTicFactory(freezable_factory(object, "_isFrozen")) :
         self._dv_dt = {}
         self._isFrozen = True
     def create_tic_dat(self, dir_path, dialect='excel', headers_present = True,
-                       freeze_it = False, encoding=None):
+                       freeze_it = False, encoding=None, executor=None):
         """
         Create a TicDat object from the csv files in a directory
 
@@ -52,6 +68,11 @@ class CsvTicFactory(freezable_factory(object, "_isFrozen")) :
 
         :param freeze_it: boolean. should the returned object be frozen?
 
+        :param executor: optional. A concurrent.futures.Executor used to read the table files in parallel, one
+                         table per job. Since the parsing is pure Python, a ProcessPoolExecutor is recommended.
+                         Generator tables are still read lazily, in the calling process. The result is the same
+                         as when no executor is used.
+
         :return: a TicDat object populated by the matching files.
 
         caveats: Missing files resolve to an empty table, but missing fields on
@@ -75,8 +96,9 @@ class CsvTicFactory(freezable_factory(object, "_isFrozen")) :
                "headers need to be present to read generic tables")
         verify(DataFrame or not tdf.generic_tables,
                "Strange absence of pandas despite presence of generic tables")
-        rtn = self.tic_dat_factory.TicDat(**self._create_tic_dat(dir_path, dialect,
-                                                                  headers_present, encoding))
+        # the data comes from our own reader, so it can be bulk loaded without verification
+        rtn = self.tic_dat_factory.TicDat.from_columns(**self._create_tic_dat(dir_path, dialect,
+                                                                               headers_present, encoding, executor))
         rtn = self.tic_dat_factory._parameter_table_post_read_adjustment(rtn)
         if freeze_it:
             return self.tic_dat_factory.freeze_me(rtn)
@@ -89,35 +111,56 @@ class CsvTicFactory(freezable_factory(object, "_isFrozen")) :
                 self.tic_dat_factory.data_types.get(table, {}).get(field)
             )
         return self._dv_dt[table, field]
-    def _read_cell(self, table, field, x):
-        def _inner_rtn(x):
-            if table == "parameters" and self.tic_dat_factory.parameters:
-                return x
-            dv, dt = self._get_dv_dt(table, field)
-            if x == "" and ((dt and dt.nullable) or (not dt and dv is None) or
-                            numericish(self.tic_dat_factory._general_read_cell(table, field, None))):
-                return None
-            should_try_float = (dt and dt.number_allowed) or (not dt and numericish(dv)) or \
-                               (table in self.tic_dat_factory.generic_tables)
+    def _cell_converter(self, table, field):
+        # returns the function that reads a cell for table.field. The data type and default value checks are
+        # resolved here, once per field, rather than once per cell
+        tdf = self.tic_dat_factory
+        general_read = tdf._general_read_cell_function(table, field)
+        if table == "parameters" and tdf.parameters:
+            return general_read
+        dv, dt = self._get_dv_dt(table, field)
+        empty_is_none = (dt and dt.nullable) or (not dt and dv is None) or numericish(general_read(None))
+        should_try_float = (dt and dt.number_allowed) or (not dt and numericish(dv)) or \
+                           (table in tdf.generic_tables)
+        must_be_int = dt and dt.must_be_int
+        if not (empty_is_none or should_try_float):
+            return general_read
+        def rtn(x):
+            if x == "" and empty_is_none:
+                return general_read(None)
             if should_try_float:
                 try:
                     x = float(x)
-                    if int(x) == x and dt and dt.must_be_int:
+                    if must_be_int and int(x) == x:
                         x = int(x)
                 except:
-                    return x
-            return x
-        return self.tic_dat_factory._general_read_cell(table, field, _inner_rtn(x))
-    def _create_tic_dat(self, dir_path, dialect, headers_present, encoding):
+                    pass
+            return general_read(x)
+        return rtn
+    def _create_tic_dat(self, dir_path, dialect, headers_present, encoding, executor=None):
         verify(dialect in csv.list_dialects(), "Invalid dialect %s"%dialect)
         verify(os.path.isdir(dir_path), "Invalid directory path %s"%dir_path)
-        rtn =  {t : self._create_table(dir_path, t, dialect, headers_present, encoding)
-                for t in self.tic_dat_factory.all_tables}
-        missing_tables = {t for t in self.tic_dat_factory.all_tables if not rtn[t]}
+        tdf = self.tic_dat_factory
+        file_paths = self._get_file_paths(dir_path)
+        futures = {}
+        if executor:
+            full_schema = tdf.schema(include_ancillary_info=True)
+            futures = {t: executor.submit(_read_table, full_schema, file_paths[t], t, dialect, headers_present,
+                                          encoding)
+                       for t in tdf.all_tables if t in file_paths and t not in tdf.generator_tables}
+        try:
+            rtn = {t: futures[t].result() if t in futures else
+                      self._create_table(file_paths.get(t), t, dialect, headers_present, encoding)
+                   for t in tdf.all_tables}
+        finally:
+            for future in futures.values():
+                future.cancel()
+        missing_tables = {t for t in self.tic_dat_factory.all_tables
+                          if not (rtn[t] and (callable(rtn[t]) or any(map(len, rtn[t].values()))))}
         if missing_tables:
             print ("The following table names could not be found (or were empty) in the %s directory.\n%s\n"%
                    (dir_path,"\n".join(missing_tables)))
-        return {k:v for k,v in rtn.items() if v}
+        return {k:v for k,v in rtn.items() if k not in missing_tables}
     def find_duplicates(self, dir_path, dialect='excel', headers_present = True, encoding=None):
         """
         Find the row counts for duplicated rows.
@@ -145,76 +188,97 @@ class CsvTicFactory(freezable_factory(object, "_isFrozen")) :
         verify(dialect in csv.list_dialects(), "Invalid dialect %s"%dialect)
         verify(os.path.isdir(dir_path), "Invalid directory path %s"%dir_path)
         tdf = self.tic_dat_factory
+        file_paths = self._get_file_paths(dir_path)
         rtn = {t:defaultdict(int) for t,_ in tdf.primary_key_fields.items()
-               if _ and self._get_file_path(dir_path, t)}
+               if _ and t in file_paths}
         for t in rtn:
-            with open(self._get_file_path(dir_path, t), encoding=encoding) as csvfile:
-                for r in self._get_data(csvfile, t, dialect, headers_present):
-                    p_key = r[tdf.primary_key_fields[t][0]] \
-                            if len(tdf.primary_key_fields[t])==1 else \
-                            tuple(r[_] for _ in tdf.primary_key_fields[t])
+            num_pks = len(tdf.primary_key_fields[t])
+            with open(file_paths[t], encoding=encoding) as csvfile:
+                for r in self._get_data(csvfile, t, dialect, headers_present)[1]:
+                    p_key = r[0] if num_pks == 1 else tuple(r[:num_pks])
                     rtn[t][p_key] += 1
         for t in list(rtn.keys()):
             rtn[t] = {k:v for k,v in rtn[t].items() if v > 1}
             if not rtn[t]:
                 del(rtn[t])
         return rtn
-    def _get_file_path(self, dir_path, table):
-        rtn = [path for f in os.listdir(dir_path) for path in [os.path.join(dir_path, f)]
-               if os.path.isfile(path) and
-               f.lower().replace(" ", "_") == "%s.csv"%table.lower()]
-        verify(len(rtn) <= 1, "duplicate .csv files found for %s"%table)
-        if rtn:
-            return rtn[0]
-    def _get_data(self, csvfile, table, dialect, headers_present):
+    def _get_file_paths(self, dir_path):
+        # maps each table to its file path. The directory is listed once, rather than once per table
+        candidates = defaultdict(list)
+        for f in os.listdir(dir_path):
+            path = os.path.join(dir_path, f)
+            if os.path.isfile(path):
+                candidates[f.lower().replace(" ", "_")].append(path)
+        rtn = {}
+        for table in self.tic_dat_factory.all_tables:
+            paths = candidates.get("%s.csv"%table.lower(), [])
+            verify(len(paths) <= 1, "duplicate .csv files found for %s"%table)
+            if paths:
+                rtn[table] = paths[0]
+        return rtn
+    def _get_raw_data(self, csvfile, table, dialect, headers_present):
+        # returns the field names, and a generator of the raw (i.e. string) rows ordered like the field names
+        # the header is matched to the field names once per file, after which cells are accessed by position
         tdf = self.tic_dat_factory
-        fieldnames=tdf.primary_key_fields.get(table, ()) + tdf.data_fields.get(table, ())
+        fieldnames = tdf.primary_key_fields.get(table, ()) + tdf.data_fields.get(table, ())
         assert fieldnames or table in self.tic_dat_factory.generic_tables
-        for row in csv.DictReader(csvfile, dialect = dialect,
-                            **({"fieldnames":fieldnames} if not headers_present else {})):
-            if not headers_present:
-                verify(len(row) == len(fieldnames),
-                   "Need %s columns for table %s"%(len(fieldnames), table))
-                yield {f: self._read_cell(table, f, row[f]) for f in fieldnames}
-            else:
-                key_matching = defaultdict(list)
-                for k,f in product(row.keys(), fieldnames or row.keys()):
-                    if k.lower() ==f.lower():
-                        key_matching[f].append(k)
-                fieldnames = fieldnames or row.keys()
-                for f in fieldnames:
-                    verify(f in key_matching, "Unable to find field name %s for table %s"%(f, table))
-                    verify(len(key_matching[f]) <= 1,
-                           "Duplicate field names found for field %s table %s"%(f, table))
-                yield {f: self._read_cell(table, f, row[key_matching[f][0]]) for f in fieldnames}
-
-    def _create_table(self, dir_path, table, dialect, headers_present, encoding):
-        file_path = self._get_file_path(dir_path, table)
+        reader = csv.reader(csvfile, dialect=dialect)
+        problems = []
+        if headers_present:
+            header_posns = {k: i for i, k in enumerate(next(reader, []))} # like DictReader, the last duplicate wins
+            fieldnames = fieldnames or tuple(header_posns)
+            key_matching = defaultdict(list)
+            for k, f in product(header_posns, fieldnames):
+                if k.lower() == f.lower():
+                    key_matching[f].append(header_posns[k])
+            for f in fieldnames:
+                if f not in key_matching:
+                    problems.append("Unable to find field name %s for table %s"%(f, table))
+                elif len(key_matching[f]) > 1:
+                    problems.append("Duplicate field names found for field %s table %s"%(f, table))
+            posns = [key_matching[f][0] for f in fieldnames if f in key_matching]
+        else:
+            posns = list(range(len(fieldnames)))
+        def rows():
+            num_cells = max(posns, default=-1) + 1
+            get_cells = itemgetter(*posns) if len(posns) > 1 else lambda row: tuple(row[_] for _ in posns)
+            for row in reader:
+                if not row: # DictReader, which this replaces, skips empty rows
+                    continue
+                if problems: # as with DictReader, a problem with the header is only reported when there is data
+                    raise TicDatError(problems[0])
+                if len(row) != num_cells:
+                    verify(headers_present or len(row) <= len(fieldnames),
+                           "Need %s columns for table %s"%(len(fieldnames), table))
+                    if len(row) < num_cells:
+                        row = row + [None] * (num_cells - len(row))
+                yield get_cells(row)
+        return fieldnames, rows()
+    def _get_data(self, csvfile, table, dialect, headers_present):
+        # returns the field names, and a generator of the rows, which are lists ordered like the field names
+        fieldnames, rows = self._get_raw_data(csvfile, table, dialect, headers_present)
+        converters = [self._cell_converter(table, f) for f in fieldnames]
+        return fieldnames, ([c(x) for c, x in zip(converters, row)] for row in rows)
+
+    def _create_table(self, file_path, table, dialect, headers_present, encoding):
         if not (file_path and  os.path.isfile(file_path)) :
             return
         tdf = self.tic_dat_factory
         if table in tdf.generator_tables:
             def rtn() :
                 with open(file_path, encoding=encoding) as csvfile:
-                    for r in self._get_data(csvfile, table, dialect, headers_present):
-                        yield tuple(r[_] for _ in tdf.data_fields[table])
+                    for r in self._get_data(csvfile, table, dialect, headers_present)[1]:
+                        yield tuple(r)
         else:
-            rtn = {} if tdf.primary_key_fields.get(table) else []
             with open(file_path, encoding=encoding) as csvfile:
-                for r in self._get_data(csvfile, table, dialect, headers_present) :
-                    if tdf.primary_key_fields.get(table) :
-                        p_key = r[tdf.primary_key_fields[table][0]] \
-                                if len(tdf.primary_key_fields[table]) == 1 else \
-                                tuple(r[_] for _ in tdf.primary_key_fields[table])
-                        rtn[p_key] = tuple(r[_] for _ in tdf.data_fields.get(table,()))
-                    elif table in tdf.generic_tables:
-                        rtn.append(r)
-                    else:
-                        rtn.append(tuple(r[_] for _ in tdf.data_fields[table]))
+                fieldnames, rows = self._get_raw_data(csvfile, table, dialect, headers_present)
+                columns = list(zip(*rows)) or [()] * len(fieldnames)
+            # each column is converted in a single pass, with the converter compiled for its field
+            rtn = {f: list(map(self._cell_converter(table, f), column)) for f, column in zip(fieldnames, columns)}
         return rtn
 
     def write_directory(self, tic_dat, dir_path, allow_overwrite = False, dialect='excel',
-                        write_header = True, case_space_table_names = False):
+                        write_header = True, case_space_table_names = False, executor=None):
         """
 
         write the ticDat data to a collection of csv files
@@ -234,6 +298,11 @@ class CsvTicFactory(freezable_factory(object, "_isFrozen")) :
         :param case_space_table_names: boolean - make best guesses how to add spaces and upper case
                                        characters to table names
 
+        :param executor: optional. A concurrent.futures.Executor used to write the table files in parallel,
+                         one table per job. The rows of each table are prepared in the calling process, so a
+                         ProcessPoolExecutor can be used. The files written are the same as when no executor
+                         is used.
+
         :return:
         """
         verify(csv, "csv needs to be installed to use this subroutine")
@@ -241,7 +310,7 @@ class CsvTicFactory(freezable_factory(object, "_isFrozen")) :
         verify(not os.path.isfile(dir_path), "A file is not a valid directory path")
         if self.tic_dat_factory.generic_tables:
             dat, tdf = create_generic_free(tic_dat, self.tic_dat_factory)
-            return tdf.csv.write_directory(dat, dir_path, allow_overwrite, dialect, write_header)
+            return tdf.csv.write_directory(dat, dir_path, allow_overwrite, dialect, write_header, executor=executor)
         tdf = self.tic_dat_factory
         msg = []
         if not self.tic_dat_factory.good_tic_dat_object(tic_dat, lambda m : msg.append(m)) :
@@ -255,20 +324,31 @@ class CsvTicFactory(freezable_factory(object, "_isFrozen")) :
         case_space_table_names = case_space_table_names and \
                                  len(set(self.tic_dat_factory.all_tables)) == \
                                  len(set(map(case_space_to_pretty, self.tic_dat_factory.all_tables)))
-        for t in tdf.all_tables :
-            f = os.path.join(dir_path, (case_space_to_pretty(t) if case_space_table_names else t) + ".csv")
-            with open(f, 'w', newline='') as csvfile:
-                 writer = csv.DictWriter(csvfile,dialect=dialect, fieldnames=
-                        tdf.primary_key_fields.get(t, ()) + tdf.data_fields.get(t, ()) )
-                 writer.writeheader() if write_header else None
-                 def infinty_io_dict(d):
-                     return {f: self.tic_dat_factory._infinity_flag_write_cell(t, f, x) for f,x in d.items()}
-                 _t =  getattr(tic_dat, t)
-                 if dictish(_t) :
-                     for p_key, data_row in _t.items() :
-                         primaryKeyDict = {f:v for f,v in zip(tdf.primary_key_fields[t],
-                                            p_key if containerish(p_key) else (p_key,))}
-                         writer.writerow(infinty_io_dict(dict(data_row, **primaryKeyDict)))
-                 else :
-                     for data_row in (_t if containerish(_t) else _t()) :
-                         writer.writerow(infinty_io_dict(data_row))
\ No newline at end of file
+        futures = []
+        try:
+            for t in tdf.all_tables :
+                f = os.path.join(dir_path, (case_space_to_pretty(t) if case_space_table_names else t) + ".csv")
+                header = tdf.primary_key_fields.get(t, ()) + tdf.data_fields.get(t, ()) if write_header else None
+                if executor:
+                    futures.append(executor.submit(_write_table, f, dialect, header, list(self._rows(tic_dat, t))))
+                else:
+                    _write_table(f, dialect, header, self._rows(tic_dat, t))
+            for future in futures:
+                future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+    def _rows(self, tic_dat, t):
+        # the rows to write for table t, ordered like the fields, with the infinity_io_flag applied
+        tdf = self.tic_dat_factory
+        pks, dfs = tdf.primary_key_fields.get(t, ()), tdf.data_fields.get(t, ())
+        fields = pks + dfs
+        write_cell = tdf._infinity_flag_write_cell
+        _t =  getattr(tic_dat, t)
+        if dictish(_t) :
+            for p_key, data_row in _t.items() :
+                row = list(p_key[:len(pks)] if containerish(p_key) else (p_key,)) + [data_row[f] for f in dfs]
+                yield [write_cell(t, f, x) for f, x in zip(fields, row)]
+        else :
+            for data_row in (_t if containerish(_t) else _t()) :
+                yield [write_cell(t, f, data_row[f]) for f in fields]
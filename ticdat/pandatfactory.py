@@ -170,7 +170,7 @@ class PanDatFactory(object):
         :param clone_factory : optional. Defaults to PanDatFactory. Can also be TicDatFactory.  Can also be a function,
                                in which case it should behave similarly to create_from_full_schema.
                                If clone_factory=TicDatFactory, the row predicates that use predicate_kwargs_maker
-                               won't be copied over.
+                               (or that are vectorized) won't be copied over.
 
         :return: a clone of the PanDatFactory. Returned object will be based on clone_factory, if provided.
         """
@@ -181,13 +181,16 @@ class PanDatFactory(object):
             clone_factory = clone_factory.create_from_full_schema
         full_schema = utils.clone_a_anchillary_info_schema(self.schema(include_ancillary_info=True), table_restrictions)
         rtn = clone_factory(full_schema)
+        if hasattr(rtn, "set_predicate_kwargs_caching"):
+            rtn.set_predicate_kwargs_caching(self.predicate_kwargs_caching)
         for tbl, row_predicates in self._data_row_predicates.items():
             if table_restrictions is None or tbl in table_restrictions:
                 for pn, rpi in row_predicates.items():
-                    if not (rpi.predicate_kwargs_maker and no_copy_predicate_kwargs_maker):
+                    if not ((rpi.predicate_kwargs_maker or rpi.vectorized) and no_copy_predicate_kwargs_maker):
                         rtn.add_data_row_predicate(tbl, predicate=rpi.predicate, predicate_name=pn,
                                                    predicate_kwargs_maker=rpi.predicate_kwargs_maker,
-                                                   predicate_failure_response=rpi.predicate_failure_response)
+                                                   predicate_failure_response=rpi.predicate_failure_response,
+                                                   **({"vectorized": True} if rpi.vectorized else {}))
         return rtn
     @property
     def default_values(self):
@@ -219,6 +222,50 @@ class PanDatFactory(object):
         verify(value in ["prune", "ignore"], f"bad value {value}")
         self._xlsx_trailing_empty_rows[0] = value
     @property
+    def predicate_kwargs_caching(self):
+        """
+        see __doc__ for set_predicate_kwargs_caching
+        """
+        return self._predicate_kwargs_caching[0]
+    def set_predicate_kwargs_caching(self, value):
+        """
+        Set the predicate_kwargs_caching for the PanDatFactory. When True, the dict returned by a
+        predicate_kwargs_maker (see add_data_row_predicate) is remembered by the PanDat object it was computed for,
+        and find_data_row_failures reuses it for as long as the tables of that PanDat are unchanged. Since a
+        DataFrame can't tell us when it has been edited, each find_data_row_failures call hashes the tables
+        of the PanDat (which is fast, but not free).
+
+        Only the results of predicate_kwargs_maker functions that succeed in returning a dict are remembered.
+        Use clear_predicate_kwargs_cache if a predicate_kwargs_maker depends on anything other than its dat argument.
+        :param value: boolean
+        :return:
+        """
+        verify(value in [True, False], "value should be a boolean")
+        self._predicate_kwargs_caching[0] = value
+    def clear_predicate_kwargs_cache(self, pan_dat):
+        """
+        Forget the predicate_kwargs_maker results remembered for a PanDat object.
+        See set_predicate_kwargs_caching for more details.
+        :param pan_dat: a PanDat object
+        :return:
+        """
+        verify(isinstance(pan_dat, self.PanDat), "pan_dat should be a PanDat object created by this factory")
+        pan_dat._predicate_kwargs_results.clear()
+    def _predicate_kwargs_cache(self, pan_dat):
+        # the remembered predicate_kwargs_maker results for pan_dat, along with the current signature of its
+        # tables (or None if they can't be remembered)
+        if not (self.predicate_kwargs_caching and isinstance(pan_dat, self.PanDat)):
+            return None
+        signature = []
+        for t in sorted(self.all_tables):
+            df = getattr(pan_dat, t)
+            try:
+                hashed = int(pd.util.hash_pandas_object(df, index=True).sum())
+            except TypeError: # unhashable cells, such as lists
+                return None
+            signature.append((tuple(df.columns), tuple(map(str, df.dtypes)), len(df), hashed))
+        return pan_dat._predicate_kwargs_results, tuple(signature)
+    @property
     def infinity_io_flag(self):
         """
         see __doc__ for set_infinity_io_flag
@@ -298,19 +345,15 @@ class PanDatFactory(object):
             df = getattr(dat, t)
             for f in self.primary_key_fields.get(t, ()) + self.data_fields.get(t, ()):
                 if utils.numericish(self.infinity_io_flag):
-                    fixme = apply(df, lambda row: utils.numericish(row[f]) and row[f] >= self.infinity_io_flag)
-                    df.loc[fixme, f] = float("inf")
-                    fixme = apply(df, lambda row: utils.numericish(row[f]) and row[f] <= -self.infinity_io_flag)
-                    df.loc[fixme, f] = -float("inf")
+                    too_big, too_small = utils.infinity_flag_masks(df[f], self.infinity_io_flag)
+                    df.loc[too_big, f] = float("inf")
+                    df.loc[too_small, f] = -float("inf")
                 elif utils.numericish(self._none_as_infinity_bias(t, f)):
                     assert self.infinity_io_flag is None
                     df[f].fillna(value=self._none_as_infinity_bias(t, f) * float("inf"), inplace=True)
                 dt = self.data_types.get(t, {}).get(f, None)
                 if dt and dt.datetime:
-                    def fixed_row(row):
-                        new_row_f = utils.dateutil_adjuster(row[f])
-                        return new_row_f if new_row_f is not None else row[f]
-                    df[f] = apply(df, fixed_row)
+                    df[f] = utils.dateutil_adjusted_series(df[f])
                 if json_read and self._dtypes_for_pandas_read(t).get(f) == str:
                     assert dt, "assumed because _dtypes_for_pandas_read result"
                     if dt.nullable:
@@ -318,7 +361,7 @@ class PanDatFactory(object):
                             if utils.stringish(row[f]) and row[f].lower() == "none":
                                 return None
                             return row[f]
-                        df[f] = apply(df, fixed_row)
+                        df[f] = apply(df, fixed_row, fields=[f])
 
         # this is the logic that is used in lieu of infinity_io_flag logic for the parameters table
         # it is predicated on the assumption that the parameters table will be serialized to a string/string table
@@ -369,20 +412,18 @@ class PanDatFactory(object):
                                                    lambda row: None if isnull(row[fld]) else row[fld])
         if self.infinity_io_flag == "N/A":
             return rtn
-        apply = utils.faster_df_apply
         for t in set(self.all_tables).difference(["parameters"]): # parameters table is handled differently
             df = getattr(rtn, t)
             for f in self.primary_key_fields.get(t, ()) + self.data_fields.get(t, ()):
                 if utils.numericish(self.infinity_io_flag):
-                    fixme = apply(df, lambda row: utils.numericish(row[f]) and row[f] >= self.infinity_io_flag)
-                    if fixme.any():
-                        df.loc[fixme, f] = self.infinity_io_flag
-                    fixme = apply(df, lambda row: utils.numericish(row[f]) and row[f] <= -self.infinity_io_flag)
-                    if fixme.any():
-                        df.loc[fixme, f] = -self.infinity_io_flag
+                    too_big, too_small = utils.infinity_flag_masks(df[f], self.infinity_io_flag)
+                    if too_big.any():
+                        df.loc[too_big, f] = self.infinity_io_flag
+                    if too_small.any():
+                        df.loc[too_small, f] = -self.infinity_io_flag
                 elif utils.numericish(self._none_as_infinity_bias(t, f)):
                     assert self.infinity_io_flag is None
-                    fixme = apply(df, lambda row: row[f] == float("inf") * self._none_as_infinity_bias(t, f))
+                    fixme = (df[f] == float("inf") * self._none_as_infinity_bias(t, f)).fillna(False).astype(bool)
                     if fixme.any():
                         df.loc[fixme, f] = None
         return rtn
@@ -435,6 +476,7 @@ class PanDatFactory(object):
         self._data_types[table][field] = TypeDictionary.safe_creator(number_allowed, inclusive_min, inclusive_max,
                                             min, max, must_be_int, strings_allowed, nullable, datetime)
         self._none_as_infinity_bias_cache.clear()
+        self._true_data_types_cache.clear()
 
     def clear_data_type(self, table, field):
         """
@@ -454,10 +496,11 @@ class PanDatFactory(object):
                "The data types can't be changed after a PanDatFactory has been used.")
         del(self._data_types[table][field])
         self._none_as_infinity_bias_cache.clear()
+        self._true_data_types_cache.clear()
 
     def add_data_row_predicate(self, table, predicate, predicate_name=None,
                                predicate_kwargs_maker=None,
-                               predicate_failure_response="Boolean"):
+                               predicate_failure_response="Boolean", vectorized=False):
         """
         The purpose of calling add_data_row_predicate is to prepare for a future call to find_data_row_failures.
         See https://bit.ly/3e9pdCP for more details on these two functions.
@@ -498,7 +541,15 @@ class PanDatFactory(object):
                                            a clean row by returning True (the one and only literal True in Python)
                                            and a dirty row by returning a non-empty string (which is an error message).
 
+        :param vectorized: boolean. If truthy, then predicate is called exactly once per find_data_row_failures call,
+                           with the entire table DataFrame (and not a row dict) as its argument. It should return
+                           a boolean Series (or array-like) aligned with the DataFrame rows, or, if
+                           predicate_failure_response is "Error Message", a Series whose entries are True for clean
+                           rows and error message strings for dirty rows. Vectorized predicates are much faster
+                           for large tables, but won't be copied over when cloning to a TicDatFactory.
+
         See find_data_row_failures for details on handling exceptions thrown by predicate or predicate_kwargs_maker.
+        (An exception thrown by a vectorized predicate, if handled, indicates a failure for every row of the table).
         :return:
         """
         verify(not self._has_been_used,
@@ -518,7 +569,8 @@ class PanDatFactory(object):
         if predicate_name is None:
             predicate_name = next(i for i in count() if i not in self._data_row_predicates[table])
         self._data_row_predicates[table][predicate_name] = RowPredicateInfo(predicate, predicate_kwargs_maker,
-                                                                            predicate_failure_response)
+                                                                            predicate_failure_response,
+                                                                            bool(vectorized))
 
     def add_parameter(self, name, default_value, number_allowed = True,
                       inclusive_min = True, inclusive_max = False, min = 0, max = float("inf"),
@@ -760,7 +812,9 @@ class PanDatFactory(object):
         self._parameters = {}
         self._infinity_io_flag = ["N/A"]
         self._xlsx_trailing_empty_rows = ["prune"]
+        self._predicate_kwargs_caching = [False]
         self._none_as_infinity_bias_cache = {}
+        self._true_data_types_cache = {}
 
 
         self.all_tables = frozenset(init_fields)
@@ -776,6 +830,8 @@ class PanDatFactory(object):
                 return "pd: {" + ", ".join("%s: %s"%(t, tlen(t)) for t in sorted(superself.all_tables)) + "}"
             def __init__(self, **init_tables):
                 superself._trigger_has_been_used()
+                # the predicate_kwargs_maker results, along with the table signatures they depend on
+                self._predicate_kwargs_results = {}
                 init_tables = {k: v for k,v in init_tables.items() if isinstance(v, (pd.DataFrame, pd.Series)) or
                                utils.safe_apply(bool)(v)}
                 for t in init_tables:
@@ -916,14 +972,16 @@ class PanDatFactory(object):
         for more info
         :return:
         '''
-        tmp_pdf = PanDatFactory.create_from_full_schema(self.schema(include_ancillary_info=True))
-        for t, pks in self.primary_key_fields.items():
-            for pk in pks:
-                if pk not in self._data_types.get(t, ()):
-                    tmp_pdf.set_data_type(t, pk, number_allowed=True,
-                      inclusive_min=True, inclusive_max=True, min=-float("inf"), max=float("inf"),
-                      must_be_int=False, strings_allowed='*', nullable=False, datetime=False)
-        return tmp_pdf.data_types
+        if not self._true_data_types_cache:
+            rtn = {t: dict(v) for t, v in self._data_types.items()}
+            for t, pks in self.primary_key_fields.items():
+                for pk in pks:
+                    if pk not in self._data_types.get(t, ()):
+                        rtn.setdefault(t, {})[pk] = TypeDictionary.safe_creator(number_allowed=True,
+                          inclusive_min=True, inclusive_max=True, min=-float("inf"), max=float("inf"),
+                          must_be_int=False, strings_allowed='*', nullable=False, datetime=False)
+            self._true_data_types_cache.update({t: FrozenDict(v) for t, v in rtn.items()})
+        return FrozenDict(self._true_data_types_cache)
     def find_data_type_failures(self, pan_dat, as_table=True, max_failures=float("inf")):
         """
         Finds the data type failures for a pandat object
@@ -953,27 +1011,29 @@ class PanDatFactory(object):
         verify(self.good_pan_dat_object(pan_dat, msg.append),
                "pan_dat not a good object for this factory : %s"%"\n".join(msg))
         assert max_failures > 0, "max_failures should be a positive number"
-
+        return self._find_data_type_failures(pan_dat, as_table, max_failures)
+    def _find_data_type_failures(self, pan_dat, as_table=True, max_failures=float("inf")):
+        # find_data_type_failures, without validating pan_dat
         rtn = {}
         TableField = clt.namedtuple("TableField", ["table", "field"])
-        number_failures = [0]
-        check_too_many = None
-        if max_failures < float("inf"):
-            def check_too_many(is_bad_row):
-                if is_bad_row:
-                    number_failures[0] += 1
-                    if number_failures[0] >= max_failures:
-                        return lambda row: False  # all future rows will be good (i.e. not bad, i.e. False)
+        for (table, field), where_bad_rows in self._data_type_failure_masks(pan_dat, max_failures).items():
+            _table = getattr(pan_dat, table)
+            rtn[TableField(table, field)] = _table[where_bad_rows].copy() if as_table else where_bad_rows
+        return rtn
+    def _data_type_failure_masks(self, pan_dat, max_failures=float("inf")):
+        # the boolean Series flagging the data type failures of each (table, field), evaluated a column at a time
+        rtn = {}
+        number_failures = 0
         for table, type_row in self._true_data_types().items():
             _table = getattr(pan_dat, table)
             for field, data_type in type_row.items():
-                def bad_row(row):
-                    data = row[field]
-                    return not data_type.valid_data(None if isnull(data) else data)
-                where_bad_rows = utils.faster_df_apply(_table, bad_row, trip_wire_check=check_too_many)
-                if where_bad_rows.any():
-                    rtn[TableField(table, field)] = _table[where_bad_rows].copy() if as_table else where_bad_rows
-                if number_failures[0] >= max_failures:
+                bad = ~data_type.valid_data_mask(_table[field])
+                if bad.any():
+                    if number_failures + bad.sum() > max_failures: # only the first failures are reported
+                        bad[numpy.flatnonzero(bad)[int(max_failures - number_failures):]] = False
+                    number_failures += bad.sum()
+                    rtn[table, field] = pd.Series(bad, index=_table.index)
+                if number_failures >= max_failures:
                     return rtn
         return rtn
     def replace_data_type_failures(self, pan_dat, replacement_values=None):
@@ -1008,7 +1068,7 @@ class PanDatFactory(object):
             verify(table in self.all_tables, "%s is not a table for this schema"%table)
             verify(field in self._all_fields(table), "%s is not a field for %s"%(field, table))
 
-        replacements_needed = self.find_data_type_failures(pan_dat, as_table=False)
+        replacements_needed = self._data_type_failure_masks(pan_dat)
         if not replacements_needed:
             return pan_dat
 
@@ -1023,13 +1083,13 @@ class PanDatFactory(object):
                 verify(self._true_data_types()[table][field].valid_data(value),
                        "The replacement value %s is not itself valid for %s : %s"%(value, table, field))
 
+        # the replacement values are valid, so the masks of the failures don't need to be recomputed afterwards
         for (table, field), rows in replacements_needed.items() :
             if (table, field) in real_replacements:
                 getattr(pan_dat, table).loc[rows, field] = real_replacements[table, field]
-        assert not set(self.find_data_type_failures(pan_dat)).intersection(real_replacements)
         return pan_dat
     def find_data_row_failures(self, pan_dat, as_table=True, exception_handling="__debug__",
-                               max_failures=float("inf")):
+                               max_failures=float("inf"), executor=None):
         """
         Finds the data row failures for a ticdat object
 
@@ -1052,6 +1112,16 @@ class PanDatFactory(object):
         :param max_failures: number. An upper limit on the number of failures to find. Will short circuit and return
                                      ASAP with a partial failure enumeration when this number is reached.
 
+        :param executor: optional. A concurrent.futures.Executor (i.e. a ThreadPoolExecutor or a ProcessPoolExecutor)
+                         used to evaluate the (non vectorized) row predicates in parallel, in chunks of
+                         utils.ROW_PREDICATE_CHUNK_SIZE rows. Each predicate_kwargs_maker is still called exactly once
+                         (in the calling process) and its result is shared with the workers. The chunks are
+                         submitted table by table, as the enumeration reaches each predicate, so no more
+                         predicate_kwargs_makers are called (nor chunks submitted) once max_failures is reached.
+                         A ProcessPoolExecutor requires picklable predicates and predicate_kwargs_maker results.
+                         The returned failures (including the max_failures short circuiting and the exceptions
+                         raised when "Unhandled") are the same as when no executor is used.
+
         :return: A dictionary constructed as follows:
 
         The keys are namedtuples with members "table", "predicate_name".
@@ -1069,6 +1139,15 @@ class PanDatFactory(object):
         and the latter will be a string describing the failure.
         """
         assert max_failures > 0, "max_failures should be a positive number"
+        msg = []
+        verify(self.good_pan_dat_object(pan_dat, msg.append),
+               "pan_dat not a good object for this factory : %s"%"\n".join(msg))
+        verify(exception_handling in ["Handled as Failure", "Unhandled", "__debug__"],
+               "bad exception_handling argument")
+        return self._find_data_row_failures(pan_dat, as_table, exception_handling, max_failures, executor)
+    def _find_data_row_failures(self, pan_dat, as_table=True, exception_handling="__debug__",
+                                max_failures=float("inf"), executor=None):
+        # find_data_row_failures, without validating pan_dat
         number_failures = [0]
         check_too_many_bool = check_too_many_msg = None
         if max_failures < float("inf"):
@@ -1084,11 +1163,6 @@ class PanDatFactory(object):
                     if number_failures[0] >= max_failures:  # all future rows will be good
                         return lambda row: True  # which in this context is True
 
-        msg = []
-        verify(self.good_pan_dat_object(pan_dat, msg.append),
-               "pan_dat not a good object for this factory : %s"%"\n".join(msg))
-        verify(exception_handling in ["Handled as Failure", "Unhandled", "__debug__"],
-               "bad exception_handling argument")
         if exception_handling == "__debug__":
             exception_handling = "Unhandled" if __debug__ else "Handled as Failure"
         data_row_predicates = {k: dict(v) for k,v in self._data_row_predicates.items()}
@@ -1110,62 +1184,169 @@ class PanDatFactory(object):
         predicate_kwargs_maker_results = {}
         TPN = clt.namedtuple("TablePredicateName", ["table", "predicate_name"])
         PKEM = clt.namedtuple("PrimaryKeyErrorMessage", ["primary_key", "error_message"])
-        for tbl, row_predicates in data_row_predicates.items():
+        predicate_kwargs_maker_exceptions = {}
+        predicate_kwargs_cache = self._predicate_kwargs_cache(pan_dat)
+        if predicate_kwargs_cache:
+            cached, signature = predicate_kwargs_cache
+            predicate_kwargs_maker_results.update((maker, result) for maker, (_signature, result) in cached.items()
+                                                  if _signature == signature)
+        def make_predicate_kwargs(rpi):
+            if not rpi.predicate_kwargs_maker:
+                return {}
+            if rpi.predicate_kwargs_maker not in predicate_kwargs_maker_results:
+                try:
+                    _predicate_kwargs = rpi.predicate_kwargs_maker(pan_dat)
+                    if predicate_kwargs_cache and isinstance(_predicate_kwargs, dict):
+                        predicate_kwargs_cache[0][rpi.predicate_kwargs_maker] = (predicate_kwargs_cache[1],
+                                                                                 _predicate_kwargs)
+                except Exception as e:
+                    if exception_handling == "Handled as Failure":
+                        _predicate_kwargs = f"Exception<{e}>"
+                    else: # defer raising until the predicate by predicate enumeration reaches this predicate
+                        _predicate_kwargs = None
+                        predicate_kwargs_maker_exceptions[rpi.predicate_kwargs_maker] = e
+                predicate_kwargs_maker_results[rpi.predicate_kwargs_maker] = _predicate_kwargs
+            if rpi.predicate_kwargs_maker in predicate_kwargs_maker_exceptions:
+                raise predicate_kwargs_maker_exceptions[rpi.predicate_kwargs_maker]
+            return predicate_kwargs_maker_results[rpi.predicate_kwargs_maker]
+        chunk_futures = {}
+        def submit_chunks(tbl, row_predicates):
+            # the chunks for the first predicate (whose kwargs have been made) and for the later ones whose kwargs
+            # are already known, so that no predicate_kwargs_maker is called before the enumeration reaches it
             _table = getattr(pan_dat, tbl)
-            for pn, rpi in row_predicates.items():
-                predicate_kwargs = {}
-                if rpi.predicate_kwargs_maker:
-                    if rpi.predicate_kwargs_maker not in predicate_kwargs_maker_results:
-                        if exception_handling == "Handled as Failure":
-                            try:
-                                _predicate_kwargs = rpi.predicate_kwargs_maker(pan_dat)
-                            except Exception as e:
-                                _predicate_kwargs = f"Exception<{e}>"
-                        else:
-                            _predicate_kwargs = rpi.predicate_kwargs_maker(pan_dat)
-                        predicate_kwargs_maker_results[rpi.predicate_kwargs_maker] = _predicate_kwargs
-                    predicate_kwargs = predicate_kwargs_maker_results[rpi.predicate_kwargs_maker]
-                if not isinstance(predicate_kwargs, dict):
-                    rtn[TPN(tbl, pn)] = PKEM('*', predicate_kwargs
-                                        if (isinstance(predicate_kwargs, str) and "Exception<" in predicate_kwargs)
-                                        else f"predicate_kwargs_maker failed to return a dict")
-                    number_failures[0] += 1
-                else:
-                    if rpi.predicate_failure_response == "Boolean":
-                        def _p(row):
-                            try:
-                                return rpi.predicate(row, **predicate_kwargs)
-                            except:
-                                return False
-                        bad_row = (lambda row: not rpi.predicate(row, **predicate_kwargs)) \
-                                  if exception_handling == "Unhandled" else (lambda row: not _p(row))
-
-                        where_bad_rows = utils.faster_df_apply(_table, bad_row, trip_wire_check=check_too_many_bool)
-                        if where_bad_rows.any():
-                            rtn[TPN(tbl, pn)] = _table[where_bad_rows].copy() if as_table else where_bad_rows
+            for position, (pn, rpi) in enumerate(row_predicates):
+                if (tbl, pn) in chunk_futures or rpi.vectorized or \
+                   (position and rpi.predicate_kwargs_maker and
+                    (rpi.predicate_kwargs_maker not in predicate_kwargs_maker_results or
+                     rpi.predicate_kwargs_maker in predicate_kwargs_maker_exceptions)):
+                    continue
+                predicate_kwargs = make_predicate_kwargs(rpi)
+                if isinstance(predicate_kwargs, dict):
+                    chunk_futures[tbl, pn] = [executor.submit(utils.df_row_predicate_failures,
+                                                              _table.iloc[i:i+utils.ROW_PREDICATE_CHUNK_SIZE],
+                                                              rpi.predicate, predicate_kwargs,
+                                                              rpi.predicate_failure_response, exception_handling)
+                                              for i in range(0, len(_table), utils.ROW_PREDICATE_CHUNK_SIZE)]
+        def populate_rtn():
+            for tbl, row_predicates in data_row_predicates.items():
+                _table = getattr(pan_dat, tbl)
+                row_predicates = list(row_predicates.items())
+                for position, (pn, rpi) in enumerate(row_predicates):
+                    predicate_kwargs = make_predicate_kwargs(rpi)
+                    if executor is not None and isinstance(predicate_kwargs, dict) and not rpi.vectorized and \
+                       (tbl, pn) not in chunk_futures:
+                        submit_chunks(tbl, row_predicates[position:])
+                    if not isinstance(predicate_kwargs, dict):
+                        rtn[TPN(tbl, pn)] = PKEM('*', predicate_kwargs
+                                            if (isinstance(predicate_kwargs, str) and "Exception<" in predicate_kwargs)
+                                            else f"predicate_kwargs_maker failed to return a dict")
+                        number_failures[0] += 1
                     else:
-                        def _p(row):
-                            try:
-                                return rpi.predicate(row, **predicate_kwargs)
-                            except Exception as e:
-                                return f"Exception<{e}>"
-                        predicate = (lambda row: rpi.predicate(row, **predicate_kwargs)) \
-                                    if exception_handling == "Unhandled" else (lambda row: _p(row))
-                        predicate_result = utils.faster_df_apply(_table, predicate, trip_wire_check=check_too_many_msg)
-                        where_bad_rows = predicate_result.apply(lambda x: x is not True)
+                        if (tbl, pn) in chunk_futures:
+                            predicate_result, exception = self._chunked_predicate_result(_table,
+                                                                                         chunk_futures[tbl, pn])
+                            where_bad_rows = ~predicate_result.astype(bool) \
+                                             if rpi.predicate_failure_response == "Boolean" else \
+                                             predicate_result.map(lambda x: x is not True).astype(bool)
+                            remaining_failures = max_failures - number_failures[0]
+                            if where_bad_rows.sum() >= remaining_failures:
+                                exception = None
+                                where_bad_rows &= where_bad_rows.cumsum() <= math.ceil(remaining_failures)
+                            if exception is not None:
+                                raise exception
+                            number_failures[0] += int(where_bad_rows.sum())
+                        elif rpi.vectorized:
+                            predicate_result, where_bad_rows = self._vectorized_predicate_failures(
+                                _table, rpi, predicate_kwargs, exception_handling, max_failures - number_failures[0])
+                            number_failures[0] += int(where_bad_rows.sum())
+                        elif rpi.predicate_failure_response == "Boolean":
+                            def _p(row):
+                                try:
+                                    return rpi.predicate(row, **predicate_kwargs)
+                                except:
+                                    return False
+                            bad_row = (lambda row: not rpi.predicate(row, **predicate_kwargs)) \
+                                      if exception_handling == "Unhandled" else (lambda row: not _p(row))
+
+                            where_bad_rows = utils.faster_df_apply(_table, bad_row,
+                                                                   trip_wire_check=check_too_many_bool)
+                        else:
+                            def _p(row):
+                                try:
+                                    return rpi.predicate(row, **predicate_kwargs)
+                                except Exception as e:
+                                    return f"Exception<{e}>"
+                            predicate = (lambda row: rpi.predicate(row, **predicate_kwargs)) \
+                                        if exception_handling == "Unhandled" else (lambda row: _p(row))
+                            predicate_result = utils.faster_df_apply(_table, predicate,
+                                                                     trip_wire_check=check_too_many_msg)
+                            where_bad_rows = predicate_result.apply(lambda x: x is not True)
                         if where_bad_rows.any():
                             if as_table:
                                 rtn[TPN(tbl, pn)] = _df = _table[where_bad_rows].copy()
-                                err_column = "Error Message"
-                                _ = count(1)
-                                while err_column in _df.columns:
-                                    err_column = f"Error Message ({next(_)})"
-                                _df[err_column] = predicate_result[where_bad_rows].copy()
+                                if rpi.predicate_failure_response == "Error Message":
+                                    err_column = "Error Message"
+                                    _ = count(1)
+                                    while err_column in _df.columns:
+                                        err_column = f"Error Message ({next(_)})"
+                                    _df[err_column] = predicate_result[where_bad_rows].copy()
                             else:
                                 rtn[TPN(tbl, pn)] = where_bad_rows
-                if number_failures[0] >= max_failures:
-                    return rtn
+                    if number_failures[0] >= max_failures:
+                        return
+        try:
+            populate_rtn()
+        finally:
+            for futures in chunk_futures.values():
+                for future in futures:
+                    future.cancel()
         return rtn
+    def _chunked_predicate_result(self, table, futures):
+        """
+        :param table: a DataFrame
+        :param futures: the futures returned by submitting df_row_predicate_failures for each chunk of table
+        :return: the (predicate results, exception) pair for table as a whole. The rows following an
+                 unhandled exception are treated as clean (i.e. the predicate results are True).
+        """
+        results, exception = [], None
+        for future in futures:
+            result, exception = future.result()
+            results.append(result)
+            if exception is not None:
+                break
+        num_results = sum(map(len, results))
+        if num_results < len(table):
+            results.append(pd.Series(True, index=table.index[num_results:], dtype=object))
+        return (pd.concat(results) if results else pd.Series([], dtype=bool)), exception
+    def _vectorized_predicate_failures(self, table, rpi, predicate_kwargs, exception_handling, remaining_failures):
+        """
+        evaluates a vectorized row predicate against an entire table
+        :return: the (predicate result, where bad rows) pair of Series, both aligned with table. At most
+                 remaining_failures rows will be flagged as bad, mimicking the row by row short circuit.
+        """
+        try:
+            predicate_result = rpi.predicate(table, **predicate_kwargs)
+        except Exception as e:
+            if exception_handling == "Unhandled":
+                raise
+            predicate_result = pd.Series(f"Exception<{e}>" if rpi.predicate_failure_response == "Error Message"
+                                         else False, index=table.index)
+        if isinstance(predicate_result, pd.Series) and predicate_result.index.equals(table.index):
+            pass
+        else:
+            verify(utils.containerish(predicate_result) and len(predicate_result) == len(table),
+                   f"vectorized predicate {rpi.predicate} failed to return a result for each row of the table")
+            predicate_result = pd.Series(list(predicate_result) if isinstance(predicate_result, pd.Series)
+                                         else predicate_result, index=table.index)
+        if predicate_result.dtype == bool:
+            where_bad_rows = ~predicate_result
+        elif rpi.predicate_failure_response == "Boolean":
+            where_bad_rows = ~predicate_result.astype(bool)
+        else:
+            where_bad_rows = predicate_result.map(lambda x: x is not True).astype(bool)
+        if remaining_failures < float("inf") and where_bad_rows.sum() > remaining_failures:
+            where_bad_rows = where_bad_rows & (where_bad_rows.cumsum() <= math.ceil(remaining_failures))
+        return predicate_result, where_bad_rows
     def find_foreign_key_failures(self, pan_dat, verbosity="High", as_table=True, max_failures=float("inf")):
         """
         Finds the foreign key failures for a pandat object
@@ -1175,9 +1356,8 @@ class PanDatFactory(object):
         :param verbosity: either "High" or "Low"
 
         :param as_table: as_table boolean : if truthy then the values of the return dictionary will be the
-               failed rows themselves. Otherwise will return the a boolean list that indicates which rows
-               have failures. (For technical reasons, not returning a boolean Series like the
-               other find functions)
+               failed rows themselves. Otherwise will return the boolean Series that indicates which rows
+               have failures.
 
         :param max_failures: number. An upper limit on the number of failures to find. Will short circuit and return
                                      ASAP with a partial failure enumeration when this number is reached.
@@ -1192,68 +1372,39 @@ class PanDatFactory(object):
 
          The values are DataFrames that contain the subset of native table rows that fail to find
          the foreign table matching defined by the associated returned key (or the
-         list that identifies these rows).
+         Series that identifies these rows).
 
          For verbosity = 'Low' a simpler return object is created that doesn't use namedtuples
          and omits the foreign key cardinality.
         """
-        # note - the as_table argument is messy here because I'm applying an index to a copy of the table
-        # as a result, we provide the remove_foreign_key_failures companion function
         assert max_failures > 0, "max_failures should be a positive number"
         verify(verbosity in ["High", "Low"], "verbosity needs to be either 'High' or 'Low'")
+        msg  = []
+        verify(self.good_pan_dat_object(pan_dat, msg.append),
+               "pan_dat not a good object for this factory : %s"%"\n".join(msg))
+        return self._find_foreign_key_failures(pan_dat, as_table, verbosity, max_failures)
+    def _find_foreign_key_failures(self, pan_dat, as_table=True, verbosity="High", max_failures=float("inf")):
+        # find_foreign_key_failures, without validating pan_dat
         rtn = {}
-        for fk, rows in self._find_foreign_key_failure_rows(pan_dat, max_failures=max_failures).items():
+        for fk, rows in self._find_foreign_key_failure_rows(pan_dat, max_failures).items():
             native, foreign, mappings, card = fk
             rtn[fk] = getattr(pan_dat, native)[rows] if as_table else rows
         if verbosity == "Low":
             rtn = {tuple(k[:2]) + (tuple(k[2]),): v for k,v in rtn.items()}
         return rtn
     def _find_foreign_key_failure_rows(self, pan_dat, max_failures=float("inf")):
-        msg  = []
-        verify(self.good_pan_dat_object(pan_dat, msg.append),
-               "pan_dat not a good object for this factory : %s"%"\n".join(msg))
-        number_failures = [0]
-        check_too_many = None
-        if max_failures < float("inf"):
-            def check_too_many(is_bad_row):
-                if is_bad_row:
-                    number_failures[0] += 1
-                    if number_failures[0] >= max_failures:
-                        return lambda row: False  # all future rows will be good (i.e. not bad, i.e. False)
-
         rtn = {}
+        remaining_failures = max_failures
         for fk in self.foreign_keys:
-            native, foreign, mappings, card = fk
-            child = getattr(pan_dat, native).copy(deep=True)
-            # makes sense to deep copy the possibly smaller drop_duplicates slice of the parent table
-            parent = getattr(pan_dat, foreign)
-            _ = 0
-            while any("_%s_"%_ in c for c in set(parent.columns).union(child.columns)):
-                _ += 1
-            magic_field = "_%s_"%_
-            if all(hasattr(mappings, _) for _ in ["native_field", "foreign_field"]):
-                parent = parent.drop_duplicates(mappings.foreign_field, inplace=False).copy(deep=True)
-                parent[mappings.native_field] = parent[mappings.foreign_field]
-                new_index = mappings.native_field
-            else:
-                parent = parent.drop_duplicates([_.foreign_field for _ in mappings], inplace=False).copy(deep=True)
-                for _ in mappings:
-                    parent[_.native_field] = parent[_.foreign_field]
-                new_index = [_.native_field for _ in mappings]
-            # sadly a join might knacker the row order, hence the ugliness with magic_field*2 for child
-            parent[magic_field] = True
-            child.insert(0, magic_field*2, range(0, len(child)))
-            parent.set_index(new_index, drop=True, inplace=True)
-            child.set_index(new_index, drop=True, inplace=True)
-            joined = child.join(parent, rsuffix=magic_field)
-            bad_rows = set(joined[joined[magic_field] != True][magic_field*2])
-            if bad_rows:
-                # I'm casting to list here because child is a copy that doesn't have the original index
-                # This is fixable, (i.e. we could return a Series with an index matching the original child table)
-                # but the fix isn't high priority.
-                rtn[fk] = list(utils.faster_df_apply(child, lambda row: row[magic_field*2] in bad_rows,
-                                                     trip_wire_check=check_too_many))
-                if number_failures[0] >= max_failures:
+            child = getattr(pan_dat, fk.native_table)
+            failed = pd.Series(self._foreign_key_failure_mask(fk, child, getattr(pan_dat, fk.foreign_table)),
+                               index=child.index)
+            if failed.any():
+                if failed.sum() > remaining_failures:
+                    failed &= failed.cumsum() <= math.ceil(remaining_failures)
+                rtn[fk] = failed
+                remaining_failures -= failed.sum()
+                if remaining_failures <= 0:
                     return rtn
         return rtn
     def create_full_parameters_dict(self, dat):
@@ -1287,16 +1438,54 @@ class PanDatFactory(object):
                  Note that all foreign key removals are cascading. When a child removal results in
                  new foreign key failures, those failures are removed as well.
         """
-        remove_rows = self._find_foreign_key_failure_rows(pan_dat)
-        while remove_rows:
-            # just performing one bulk removal per iteration, since fks can intermingle in complicated ways
-            fk = next(iter(remove_rows))
-            native, foreign, mappings, card = fk
-            rows = remove_rows[fk]
-            setattr(pan_dat, native, getattr(pan_dat, native)[[not _ for _ in rows]].copy(deep=True))
-            remove_rows = self._find_foreign_key_failure_rows(pan_dat)
-
+        msg  = []
+        verify(self.good_pan_dat_object(pan_dat, msg.append),
+               "pan_dat not a good object for this factory : %s"%"\n".join(msg))
+        # the tables are visited in foreign key order, so that (outside of circular foreign keys) each table is
+        # checked once, against the rows of its foreign tables that survive
+        fks_by_native, fks_by_foreign = clt.defaultdict(list), clt.defaultdict(list)
+        for fk in self.foreign_keys:
+            fks_by_native[fk.native_table].append(fk)
+            fks_by_foreign[fk.foreign_table].append(fk)
+        keep = {t: numpy.ones(len(getattr(pan_dat, t)), dtype=bool) for t in self.all_tables}
+        work = clt.deque(t for t in utils.foreign_key_table_order(self) if fks_by_native[t])
+        queued = set(work)
+        while work:
+            t = work.popleft()
+            queued.discard(t)
+            for fk in fks_by_native[t]:
+                failed = self._foreign_key_failure_mask(fk, getattr(pan_dat, t), getattr(pan_dat, fk.foreign_table),
+                                                        keep[fk.foreign_table])
+                if (keep[t] & failed).any():
+                    keep[t] &= ~failed
+                    for _fk in fks_by_foreign[t]:
+                        if _fk.native_table not in queued:
+                            work.append(_fk.native_table)
+                            queued.add(_fk.native_table)
+        for t, rows in keep.items():
+            if not rows.all():
+                setattr(pan_dat, t, getattr(pan_dat, t)[rows].copy(deep=True))
         return pan_dat
+    def _foreign_key_failure_mask(self, fk, child, parent, parent_rows=None):
+        # a boolean array flagging the rows of child with no match in parent (or in the parent_rows slice of parent)
+        # the key columns are hashed as they are, so neither table is copied
+        mappings = (fk.mapping,) if type(fk.mapping) is ForeignKeyMapping else fk.mapping
+        look_into = [parent[_.foreign_field] for _ in mappings]
+        if parent_rows is not None:
+            look_into = [_[parent_rows] for _ in look_into]
+        if len(mappings) == 1:
+            return ~child[mappings[0].native_field].isin(look_into[0]).values
+        # factorize each key column over child and parent together, and combine the codes into one dense code per
+        # row, so that multi-field keys are matched with a lookup array rather than with tuples
+        keys = numpy.zeros(len(child) + len(look_into[0]), dtype=numpy.int64)
+        for m, parent_values in zip(mappings, look_into):
+            # factorize the raw array, so object columns keep their dtype rather than being inferred as numeric
+            values = pd.concat([child[m.native_field], parent_values], ignore_index=True).to_numpy()
+            codes = pd.factorize(values)[0] + 1
+            keys = pd.factorize(keys * (codes.max(initial=0) + 1) + codes)[0]
+        found = numpy.zeros(keys.max(initial=-1) + 1, dtype=bool)
+        found[keys[len(child):]] = True
+        return ~found[keys[:len(child)]]
     def find_duplicates(self, pan_dat, keep="first", as_table=True):
         """
         Find the duplicated rows based on the primary key fields.
@@ -1317,13 +1506,73 @@ class PanDatFactory(object):
         msg  = []
         verify(self.good_pan_dat_object(pan_dat, msg.append),
                "pan_dat not a good object for this factory : %s"%"\n".join(msg))
+        return {t: getattr(pan_dat, t)[list(dups)] if as_table else dups
+                for t, dups in self._find_duplicates(pan_dat, keep).items()}
+    def _find_duplicates(self, pan_dat, keep="first"):
+        # the boolean Series flagging the duplicated rows of each table, without validating pan_dat
         rtn = {}
         for t in self.all_tables:
             if self.primary_key_fields.get(t):
                 dups = getattr(pan_dat, t).duplicated(list(self.primary_key_fields[t]), keep=keep)
                 if dups.any():
-                    rtn[t] = getattr(pan_dat, t)[list(dups)] if as_table else dups
+                    rtn[t] = dups
         return rtn
+    def find_all_failures(self, pan_dat, as_table=True, keep="first", exception_handling="__debug__",
+                          max_failures=float("inf"), executor=None):
+        """
+        Finds all the data integrity failures for a pandat object with a single call, sharing one failure budget.
+
+        :param pan_dat: pandat object
+
+        :param as_table: see the individual find functions
+
+        :param keep: see find_duplicates
+
+        :param exception_handling: see find_data_row_failures
+
+        :param max_failures: number. An upper limit on the total number of failures to find. The duplicates are
+                                     enumerated first, then the data type failures, then the data row failures and
+                                     then the foreign key failures. Will short circuit and return ASAP with a partial
+                                     failure enumeration when this number is reached.
+
+        :param executor: see find_data_row_failures
+
+        :return: a namedtuple with members "duplicates", "data_type_failures", "data_row_failures" and
+                 "foreign_key_failures". These are the dictionaries returned by find_duplicates,
+                 find_data_type_failures, find_data_row_failures and find_foreign_key_failures, respectively.
+        """
+        msg = []
+        verify(self.good_pan_dat_object(pan_dat, msg.append),
+               "pan_dat not a good object for this factory : %s"%"\n".join(msg))
+        assert max_failures > 0, "max_failures should be a positive number"
+        verify(exception_handling in ["Handled as Failure", "Unhandled", "__debug__"],
+               "bad exception_handling argument")
+        def num_failures(v):
+            if isinstance(v, DataFrame):
+                return len(v)
+            return 1 if hasattr(v, "error_message") else int(sum(v))
+        def find_duplicates(mf):
+            rtn = {}
+            for t, dups in self._find_duplicates(pan_dat, keep).items():
+                if dups.sum() > mf:
+                    dups = dups & (dups.cumsum() <= math.ceil(mf))
+                mf -= dups.sum()
+                rtn[t] = getattr(pan_dat, t)[list(dups)] if as_table else dups
+                if mf <= 0:
+                    break
+            return rtn
+        rtn, number_failures = {}, 0
+        for name, find in [
+                ("duplicates", find_duplicates),
+                ("data_type_failures", lambda mf: self._find_data_type_failures(pan_dat, as_table, mf)),
+                ("data_row_failures", lambda mf: self._find_data_row_failures(pan_dat, as_table, exception_handling,
+                                                                              mf, executor)),
+                ("foreign_key_failures", lambda mf: self._find_foreign_key_failures(pan_dat, as_table,
+                                                                                    max_failures=mf))]:
+            rtn[name] = find(max_failures - number_failures) if number_failures < max_failures else {}
+            number_failures += sum(map(num_failures, rtn[name].values()))
+        AllFailures = clt.namedtuple("AllFailures", list(rtn))
+        return AllFailures(**rtn)
     def copy_to_ampl(self, pan_dat, field_renamings = None, excluded_tables = None):
         """
         copies the pan_dat object into a new pan_dat object populated with amplpy.DataFrame objects
@@ -8,6 +8,7 @@ import uuid
 import os
 from ticdat.utils import freezable_factory, verify, case_space_to_pretty, pd, TicDatError, FrozenDict, all_fields
 from ticdat.utils import all_underscore_replacements, stringish, dictish, containerish, debug_break, faster_df_apply
+from ticdat.utils import sqlite_table_matches, sqlite_column_names, sqlite_delta_write, DeltaWriteCounts
 from itertools import product, chain
 from collections import defaultdict
 import datetime
@@ -24,6 +25,12 @@ def _sql_con(dbFile):
     con = sql.connect(dbFile)
     return con
 
+def _sqlite_cells(series):
+    # the values of series, as sqlite3 can bind them. datetimes are written as text, as pandas writes them
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return [None if pd.isnull(x) else str(x.to_pydatetime()) for x in series]
+    return series
+
 class _DummyContextManager(object):
     def __init__(self, *args, **kwargs):
         pass
@@ -32,6 +39,18 @@ class _DummyContextManager(object):
     def __exit__(self, *excinfo) :
         pass
 
+def _map_tables(func, tables, executor=None):
+    # {t: func(t) for t in tables}, with the calls made by executor (if provided). Exceptions are raised in
+    # table order, so the outcome is the same as when no executor is used
+    if not executor:
+        return {t: func(t) for t in tables}
+    futures = {t: executor.submit(func, t) for t in tables}
+    try:
+        return {t: future.result() for t, future in futures.items()}
+    finally:
+        for future in futures.values():
+            future.cancel()
+
 def _clean_pandat_creator(pdf, df_dict, push_parameters_to_be_valid=True, json_read=False):
     # note that pandas built in IO routines tend to be a bit overy pushy with the typing, hence
     # the push_parameters_to_be_valid argument
@@ -170,8 +189,8 @@ class JsonPanFactory(freezable_factory(object, "_isFrozen")):
         for t, (pks, dfs) in self.pan_dat_factory.schema().items():
             jdict[t] = []
             def append_row_list(row):
-                jdict[t].append([fix_cell(row[f]) for f in pks + dfs])
-            faster_df_apply(getattr(pan_dat, t), append_row_list)
+                jdict[t].append([fix_cell(x) for x in row])
+            faster_df_apply(getattr(pan_dat, t), append_row_list, fields=pks + dfs, row_type="tuple")
         if not json_file_path:
             return json.dumps(jdict, sort_keys=True, indent=2)
         with open(json_file_path, "w") as fp:
@@ -269,7 +288,7 @@ class CsvPanFactory(freezable_factory(object, "_isFrozen")):
         """
         self.pan_dat_factory = pan_dat_factory
         self._isFrozen = True
-    def create_pan_dat(self, dir_path, fill_missing_fields=False, **kwargs):
+    def create_pan_dat(self, dir_path, fill_missing_fields=False, executor=None, **kwargs):
         """
         Create a PanDat object from a directory of csv files.
 
@@ -279,6 +298,10 @@ class CsvPanFactory(freezable_factory(object, "_isFrozen")):
                                     with their default value. Otherwise, missing fields
                                     throw an Exception.
 
+        :param executor: optional. A concurrent.futures.Executor used to read the table files in parallel, one
+                         table per job. pandas.read_csv releases the GIL while parsing, so a ThreadPoolExecutor
+                         is recommended. The result is the same as when no executor is used.
+
         :param kwargs: additional named arguments to pass to pandas.read_csv
 
         :return: a PanDat object populated by the matching tables.
@@ -301,12 +324,12 @@ class CsvPanFactory(freezable_factory(object, "_isFrozen")):
         """
         verify(os.path.isdir(dir_path), "%s not a directory path"%dir_path)
         tbl_names = self._get_table_names(dir_path)
-        rtn = {}
-        for t, f in tbl_names.items():
+        def read_csv(t):
             kwargs_ = dict(kwargs)
             if "dtype" not in kwargs_:
                 kwargs_["dtype"] = self.pan_dat_factory._dtypes_for_pandas_read(t)
-            rtn[t] = pd.read_csv(f, **kwargs_)
+            return pd.read_csv(tbl_names[t], **kwargs_)
+        rtn = _map_tables(read_csv, tbl_names, executor)
         missing_tables = {t for t in self.pan_dat_factory.all_tables if t not in rtn}
         if missing_tables:
             print ("The following table names could not be found in the %s directory.\n%s\n"%
@@ -324,18 +347,22 @@ class CsvPanFactory(freezable_factory(object, "_isFrozen")):
         return _clean_pandat_creator(self.pan_dat_factory, rtn)
 
     def _get_table_names(self, dir_path):
+        candidates = defaultdict(list) # the directory is listed once, rather than once per table
+        for f in os.listdir(dir_path):
+            path = os.path.join(dir_path, f)
+            if os.path.isfile(path):
+                candidates[f.lower().replace(" ", "_")].append(path)
         rtn = {}
         for table in self.pan_dat_factory.all_tables:
-            rtn[table] = [path for f in os.listdir(dir_path) for path in [os.path.join(dir_path, f)]
-                          if os.path.isfile(path) and
-                          f.lower().replace(" ", "_") == "%s.csv"%table.lower()]
+            rtn[table] = candidates.get("%s.csv"%table.lower(), [])
             verify(len(rtn[table]) <= 1, "Multiple possible csv files found for table %s" % table)
             if len(rtn[table]) == 1:
                 rtn[table] = rtn[table][0]
             else:
                 rtn.pop(table)
         return rtn
-    def write_directory(self, pan_dat, dir_path, case_space_table_names=False, index=False, **kwargs):
+    def write_directory(self, pan_dat, dir_path, case_space_table_names=False, index=False, executor=None,
+                        **kwargs):
         """
         write the PanDat data to a collection of csv files
 
@@ -349,6 +376,10 @@ class CsvPanFactory(freezable_factory(object, "_isFrozen")):
 
         :param index: boolean - whether or not to write the index.
 
+        :param executor: optional. A concurrent.futures.Executor (normally a ThreadPoolExecutor) used to write
+                         the table files in parallel, one table per job. The files written are the same as when no
+                         executor is used.
+
         :param kwargs: additional named arguments to pass to pandas.to_csv
 
         :return:
@@ -367,9 +398,10 @@ class CsvPanFactory(freezable_factory(object, "_isFrozen")):
                                  len(set(map(case_space_to_pretty, self.pan_dat_factory.all_tables)))
         if not os.path.isdir(dir_path) :
             os.mkdir(dir_path)
-        for t in self.pan_dat_factory.all_tables :
+        def to_csv(t):
             f = os.path.join(dir_path, (case_space_to_pretty(t) if case_space_table_names else t) + ".csv")
             getattr(pan_dat, t).to_csv(f, **kwargs)
+        _map_tables(to_csv, self.pan_dat_factory.all_tables, executor)
 
 class SqlPanFactory(freezable_factory(object, "_isFrozen")):
     """
@@ -437,15 +469,18 @@ class SqlPanFactory(freezable_factory(object, "_isFrozen")):
         return _clean_pandat_creator(self.pan_dat_factory, rtn)
 
     def _get_table_names(self, con):
-        rtn = {}
         def try_name(name):
             try :
                 con.execute("Select * from [%s]"%name)
             except :
                 return False
             return True
+        try:
+            rtn = sqlite_table_matches(con, self.pan_dat_factory.all_tables)
+        except Exception: # a con whose catalog can't be read is probed one candidate name at a time
+            rtn = {table: [t for t in all_underscore_replacements(table) if try_name(t)]
+                   for table in self.pan_dat_factory.all_tables}
         for table in self.pan_dat_factory.all_tables:
-            rtn[table] = [t for t in all_underscore_replacements(table) if try_name(t)]
             verify(len(rtn[table]) <= 1, "Multiple possible tables found for table %s" % table)
             if rtn[table]:
                 rtn[table] = rtn[table][0]
@@ -497,6 +532,50 @@ class SqlPanFactory(freezable_factory(object, "_isFrozen")):
                 getattr(pan_dat, t).to_sql(name=case_space_to_pretty(t) if case_space_table_names else t,
                                            con=con_, if_exists=if_exists, index=False)
 
+    def write_file_delta(self, pan_dat, db_file_path):
+        """
+
+        write the PanDat data to a SQLite file, changing only the records that differ from the data already
+        in the file
+
+        :param pan_dat: the PanDat object to write
+
+        :param db_file_path: The file path of the SQLite file to update (created if need be).
+
+        :return: a dictionary mapping each table name to a DeltaWriteCounts namedtuple of the number
+                 of records inserted, updated and deleted
+
+        caveats: Records are matched by primary key, so pan_dat can't have duplicated primary keys
+                 (see PanDatFactory.find_duplicates). Tables without primary keys are rewritten in full
+                 if (and only if) their records differ. Tables missing from the file are written by pandas,
+                 as write_file would write them.
+        """
+        msg = []
+        verify(self.pan_dat_factory.good_pan_dat_object(pan_dat, msg.append),
+               "pan_dat not a good object for this factory : %s"%"\n".join(msg))
+        dups = self.pan_dat_factory.find_duplicates(pan_dat, as_table=False)
+        verify(not dups, "The following tables have duplicated primary keys, and can't be delta written.\n%s"%
+               sorted(dups))
+        pan_dat = self.pan_dat_factory._pre_write_adjustment(pan_dat)
+        verify(not os.path.isdir(db_file_path), "A directory is not a valid SQLLite file path")
+        rtn = {}
+        with _sql_con(db_file_path) as con:
+            table_names = self._get_table_names(con)
+            for t in self.pan_dat_factory.all_tables:
+                df = getattr(pan_dat, t)
+                if t not in table_names:
+                    df.to_sql(name=t, con=con, index=False)
+                    rtn[t] = DeltaWriteCounts(len(df), 0, 0)
+                    continue
+                pks = self.pan_dat_factory.primary_key_fields.get(t, ())
+                dfs = [f for f in df.columns if f not in pks]
+                missing = set(df.columns).difference(sqlite_column_names(con, table_names[t]))
+                verify(not missing, "The following fields of table %s are missing from the %s file.\n%s"%
+                       (t, db_file_path, sorted(missing)))
+                rows = zip(*[_sqlite_cells(df[f]) for f in list(pks) + dfs])
+                rtn[t] = sqlite_delta_write(con, table_names[t], pks, dfs, rows)
+        return rtn
+
 class XlsPanFactory(freezable_factory(object, "_isFrozen")):
     """
     Primary class for reading/writing Excel files with panDat objects.
@@ -273,8 +273,9 @@ class PostgresTicFactory(_PostgresFactory):
         return rtn
 
     def _Rtn(self, freeze_it):
-        def _rtn(*args, **kwargs):
-            rtn = self.tdf._parameter_table_post_read_adjustment(self.tdf.TicDat(*args, **kwargs))
+        def _rtn(**kwargs):
+            # the data comes from our own reader, so it can be bulk loaded without verification
+            rtn = self.tdf._parameter_table_post_read_adjustment(self.tdf.TicDat.from_columns(**kwargs))
             if freeze_it:
                 return self.tdf.freeze_me(rtn)
             return rtn
@@ -318,20 +319,14 @@ class PostgresTicFactory(_PostgresFactory):
         missing_tables = self.check_tables_fields(engine, schema)
         rtn = {}
         for table in set(tdf.all_tables).difference(missing_tables):
-            rtn[table] = {} if tdf.primary_key_fields.get(table) else []
             assert tdf.primary_key_fields.get(table) or tdf.data_fields.get(table), "since no generic tables"
-            fields = [_pg_name(f) for f in tdf.primary_key_fields.get(table, ()) +
-                      tdf.data_fields.get(table, ())]
-            for row in engine.execute(f"Select {', '.join(fields)} from {schema}.{table}" +
+            fields = tdf.primary_key_fields.get(table, ()) + tdf.data_fields.get(table, ())
+            rtn[table] = {f: [] for f in fields}
+            columns = [rtn[table][f] for f in fields]
+            for row in engine.execute(f"Select {', '.join(_pg_name(f) for f in fields)} from {schema}.{table}" +
                                       (f" where {active_fld} is True" if table in active_fld_tables else "")):
-                if tdf.primary_key_fields.get(table):
-                    pk = [self._read_data_cell(table, f, x) for f,x in
-                          zip(tdf.primary_key_fields[table], row[:len(tdf.primary_key_fields[table])])]
-                    data = [self._read_data_cell(table, f, x) for f, x in
-                            zip(tdf.data_fields[table], row[len(tdf.primary_key_fields[table]):])]
-                    rtn[table][pk[0] if len(pk) == 1 else tuple(pk)] = data
-                else:
-                    rtn[table].append([self._read_data_cell(table, f, x) for f, x in zip(tdf.data_fields[table], row)])
+                for c, f, x in zip(columns, fields, row):
+                    c.append(self._read_data_cell(table, f, x))
 
         return rtn
 
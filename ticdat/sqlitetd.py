@@ -5,9 +5,13 @@ PEP8
 import os
 from collections import defaultdict
 from ticdat.utils import freezable_factory, TicDatError, verify, stringish, dictish, containerish, numericish
-from ticdat.utils import FrozenDict, all_underscore_replacements, find_duplicates
+from ticdat.utils import FrozenDict, find_duplicates
+from ticdat.utils import sqlite_table_matches, sqlite_column_names, sqlite_delta_write
 from ticdat.utils import create_duplicate_focused_tdf, create_generic_free, safe_apply
 import datetime
+from contextlib import contextmanager
+from itertools import chain, groupby, islice
+from operator import itemgetter
 try:
     import sqlite3 as sql
 except:
@@ -20,6 +24,8 @@ def _fix_str(x):
     can't fix all the strings. won't work right if some jerk wants to insert '' or some other multiple
     of consecutive of '. need bound parameters for that, which precludes storing things in readable sql
     """
+    if "'" not in x:
+        return x
     rtn = []
     for i,c in enumerate(x):
         preceeding = x[i-1] if x else ""
@@ -30,8 +36,12 @@ def _fix_str(x):
             rtn.append("''")
     return "".join(rtn)
 
+_inf = float("inf")
+
 def _insert_format(x) :
     # note that [1==True, 0==False, 1 is not True, 0 is not False] is all part of Python
+    if x.__class__ is int or (x.__class__ is float and -_inf < x < _inf): # the common numbers, checked quickly
+        return str(x)
     if stringish(x):
         return "'%s'"%_fix_str(x)
     if x in (float("inf"), -float("inf")) or isinstance(x, datetime.datetime):
@@ -49,6 +59,41 @@ def _sql_con(dbFile, foreign_keys = True) :
 def _brackets(l) :
     return ["[%s]"%_ for _ in l]
 
+_fetch_size = 10000 # the number of rows fetched from a cursor at a time
+_rows_per_insert = 500 # the number of rows in each INSERT statement of a sql file
+
+@contextmanager
+def _bulk_load_pragmas(con):
+    # trades durability for speed while bulk loading, then restores the settings of the connection
+    journal_mode, synchronous = [con.execute("PRAGMA %s"%_).fetchone()[0] for _ in ["journal_mode", "synchronous"]]
+    change_journal = journal_mode.lower() != "wal" # wal is persistent, and already suited to bulk loads
+    if change_journal:
+        con.execute("PRAGMA journal_mode = MEMORY")
+    con.execute("PRAGMA synchronous = OFF")
+    try:
+        yield con
+    finally:
+        if con.in_transaction: # the pragmas can't be restored until the failed load is abandoned
+            con.rollback()
+        con.execute("PRAGMA synchronous = %s"%synchronous)
+        if change_journal:
+            con.execute("PRAGMA journal_mode = %s"%journal_mode)
+
+def _chunks(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _fetch_batches(cursor):
+    while True:
+        rows = cursor.fetchmany(_fetch_size)
+        if not rows:
+            return
+        yield rows
+
 class SQLiteTicFactory(freezable_factory(object, "_isFrozen")) :
     """
     Primary class for reading/writing SQLite files with TicDat objects.
@@ -68,8 +113,9 @@ class SQLiteTicFactory(freezable_factory(object, "_isFrozen")) :
         self._duplicate_focused_tdf = create_duplicate_focused_tdf(tic_dat_factory)
         self._isFrozen = True
     def _Rtn(self, freeze_it):
-        def rtn(*args, **kwargs):
-            rtn = self.tic_dat_factory.TicDat(*args, **kwargs)
+        def rtn(**kwargs):
+            # the data comes from our own readers, so it can be bulk loaded without verification
+            rtn = self.tic_dat_factory.TicDat.from_columns(**kwargs)
             rtn = self.tic_dat_factory._parameter_table_post_read_adjustment(rtn)
             if freeze_it:
                 return self.tic_dat_factory.freeze_me(rtn)
@@ -149,20 +195,11 @@ class SQLiteTicFactory(freezable_factory(object, "_isFrozen")) :
     def _get_table_names(self, db_file_path, tables):
         rtn = {}
         with sql.connect(db_file_path) as con:
-            def try_name(name):
-                try :
-                    con.execute("Select * from [%s]"%name)
-                except :
-                    return False
-                return True
-            for table in tables:
-                rtn[table] = [t for t in all_underscore_replacements(table) if try_name(t)]
-                verify(len(rtn[table]) <= 1, "Duplicate tables found for table %s in SQLite file %s"%
+            for table, matches in sqlite_table_matches(con, tables).items():
+                verify(len(matches) <= 1, "Duplicate tables found for table %s in SQLite file %s"%
                                   (table, db_file_path))
-                if rtn[table]:
-                    rtn[table] = rtn[table][0]
-                else:
-                    rtn.pop(table)
+                if matches:
+                    rtn[table] = matches[0]
         return rtn
     def _check_tables_fields(self, db_file_path, tables):
         tdf = self.tic_dat_factory
@@ -176,31 +213,39 @@ class SQLiteTicFactory(freezable_factory(object, "_isFrozen")) :
         table_names = self._get_table_names(db_file_path, tables)
         with sql.connect(db_file_path) as con:
             for table, sql_table in table_names.items():
+                columns = {c.lower() for c in sqlite_column_names(con, sql_table)}
                 for field in tdf.primary_key_fields.get(table, ()) + \
                              tdf.data_fields.get(table, ()):
-                    try :
-                        con.execute("Select [%s] from [%s]"%(field, sql_table))
-                    except :
+                    if field.lower() not in columns:
                         raise TDE("Unable to recognize field %s in table %s for file %s"%
                                   (field, table, db_file_path))
         return table_names
-    def _read_data_cell(self, t, f, x):
-        if stringish(x) and x.lower() in ("inf", "-inf") and self.tic_dat_factory.infinity_io_flag == "N/A" and \
-            not (t == "parameters" and self.tic_dat_factory.parameters):
-            return float(x)
-        if stringish(x) and x.lower() == "true":
-            return True
-        if stringish(x) and x.lower() == "false":
-            return False
-        return self.tic_dat_factory._general_read_cell(t, f, x)
+    def _read_cell_function(self, t, f):
+        # returns the function that reads a cell for t.f, with the table and field specific checks resolved up front
+        general_read = self.tic_dat_factory._general_read_cell_function(t, f)
+        read_infinity = self.tic_dat_factory.infinity_io_flag == "N/A" and \
+                        not (t == "parameters" and self.tic_dat_factory.parameters)
+        def rtn(x):
+            if x.__class__ is str or (x.__class__ not in (int, float, type(None)) and stringish(x)):
+                lower_x = x.lower()
+                if read_infinity and lower_x in ("inf", "-inf"):
+                    return float(x)
+                if lower_x == "true":
+                    return True
+                if lower_x == "false":
+                    return False
+            return general_read(x)
+        return rtn
     def _create_gen_obj(self, db_file_path, table, table_name):
         tdf = self.tic_dat_factory
         def tableObj() :
             assert (not tdf.primary_key_fields.get(table)) and (tdf.data_fields.get(table))
+            read_cells = [self._read_cell_function(table, f) for f in tdf.data_fields[table]]
             with sql.connect(db_file_path) as con:
-                for row in con.execute("Select %s from [%s]"%
-                        (", ".join(_brackets(tdf.data_fields[table])), table_name)):
-                    yield [self._read_data_cell(table, f, x) for f, x in zip(tdf.data_fields[table], row)]
+                for rows in _fetch_batches(con.execute("Select %s from [%s]"%
+                        (", ".join(_brackets(tdf.data_fields[table])), table_name))):
+                    for row in rows:
+                        yield [read_cell(x) for read_cell, x in zip(read_cells, row)]
         return tableObj
     def _create_tic_dat(self, db_file_path):
         tdf = self.tic_dat_factory
@@ -222,20 +267,14 @@ class SQLiteTicFactory(freezable_factory(object, "_isFrozen")) :
             fields = tdf.primary_key_fields.get(table, ()) + tdf.data_fields.get(table, ())
             if not fields:
                 assert table in tdf.generic_tables
-                fields = tuple(x[1] for x in con.execute("PRAGMA table_info(%s)"%table))
-            rtn[table]= {} if tdf.primary_key_fields.get(table, ())  else []
-            for row in con.execute("Select %s from [%s]"%(", ".join(_brackets(fields)),
-                                                          table_names[table])):
-                if table in tdf.generic_tables:
-                    rtn[table].append({f:self._read_data_cell(table, f, d) for f, d in zip(fields, row)})
-                else:
-                    pkfs = tdf.primary_key_fields.get(table, ())
-                    pk = tuple(self._read_data_cell(table, f, x) for f, x in zip(pkfs, row[:len(pkfs)]))
-                    data = [self._read_data_cell(table, f, x) for f, x in zip(fields[len(pkfs):], row[len(pkfs):])]
-                    if dictish(rtn[table]) :
-                        rtn[table][pk[0] if len(pk) == 1 else tuple(pk)] = data
-                    else :
-                        rtn[table].append(data)
+                fields = tuple(sqlite_column_names(con, table_names[table]))
+            rtn[table] = {f: [] for f in fields}
+            columns = [(rtn[table][f], self._read_cell_function(table, f)) for f in fields]
+            for rows in _fetch_batches(con.execute("Select %s from [%s]"%(", ".join(_brackets(fields)),
+                                                                           table_names[table]))):
+                # each batch is transposed, so that every column is converted in a single pass
+                for (c, read_cell), values in zip(columns, zip(*rows)):
+                    c.extend(map(read_cell, values))
         return rtn
     def _ordered_tables(self):
         rtn = []
@@ -275,39 +314,36 @@ class SQLiteTicFactory(freezable_factory(object, "_isFrozen")) :
             str += ",\n".join(strl) + "\n);"
             rtn.append(str)
         return tuple(rtn)
-    def _write_data_cell(self, t, f, x):
-        if x is True or x is False:
-            return str(x)
-        return self.tic_dat_factory._infinity_flag_write_cell(t, f, x)
-    def _get_data(self, tic_dat, as_sql):
-        rtn = []
+    def _write_cell_function(self, t, f):
+        write_cell = self.tic_dat_factory._infinity_flag_write_cell_function(t, f)
+        return lambda x: str(x) if x is True or x is False else write_cell(x)
+    def _table_rows(self, tic_dat, t):
+        # yields (fields, row) pairs, with the cells of each row already formatted for writing
+        _t = getattr(tic_dat, t)
+        if dictish(_t) :
+            primarykeys = tuple(self.tic_dat_factory.primary_key_fields[t])
+            data_fields = None
+            for pkrow, sqldatarow in _t.items() :
+                if tuple(sqldatarow.keys()) != data_fields: # the rows of a TicDat table share the same keys
+                    data_fields = tuple(sqldatarow.keys())
+                    fields = primarykeys + data_fields
+                    write_cells = tuple(self._write_cell_function(t, f) for f in fields)
+                datarow = ((pkrow,) if len(primarykeys)==1 else pkrow) + tuple(sqldatarow.values())
+                assert len(datarow) == len(fields)
+                yield fields, tuple(w(x) for w, x in zip(write_cells, datarow))
+        else :
+            for sqldatarow in (_t if containerish(_t) else _t()) :
+                yield tuple(sqldatarow.keys()), tuple(sqldatarow.values())
+    def _insert_batches(self, tic_dat):
+        # yields (table, fields, rows) triples, grouping consecutive rows that populate the same fields
         for t in self.tic_dat_factory.all_tables:
-            _t = getattr(tic_dat, t)
-            if dictish(_t) :
-                primarykeys = tuple(self.tic_dat_factory.primary_key_fields[t])
-                for pkrow, sqldatarow in _t.items() :
-                    _items = list(sqldatarow.items())
-                    fields = primarykeys + tuple(x[0] for x in _items)
-                    datarow = ((pkrow,) if len(primarykeys)==1 else pkrow) + tuple(x[1] for x in _items)
-                    assert len(datarow) == len(fields)
-                    datarow = tuple(self._write_data_cell(t, f, x) for f,x in zip(fields, datarow))
-                    str = "INSERT INTO [%s] (%s) VALUES (%s)"%(t, ",".join(_brackets(fields)),
-                          ",".join("%s" if as_sql else "?" for _ in fields))
-                    if as_sql:
-                        rtn.append((str%tuple(map(_insert_format, datarow))) + ";")
-                    else:
-                        rtn.append((str, datarow))
-            else :
-                for sqldatarow in (_t if containerish(_t) else _t()) :
-                    k,v = zip(*sqldatarow.items())
-                    str = "INSERT INTO [%s] (%s) VALUES (%s)"%\
-                             (t, ",".join(_brackets(k)), ",".join(
-                                ["%s" if as_sql else "?"]*len(sqldatarow)))
-                    if as_sql:
-                        rtn.append((str%tuple(map(_insert_format, v))) + ";")
-                    else:
-                        rtn.append((str,v))
-        return tuple(rtn)
+            for fields, pairs in groupby(self._table_rows(tic_dat, t), key=itemgetter(0)):
+                yield t, fields, map(itemgetter(1), pairs)
+    def _get_sql_inserts(self, tic_dat):
+        for t, fields, rows in self._insert_batches(tic_dat):
+            str = "INSERT INTO [%s] (%s) VALUES\n"%(t, ",".join(_brackets(fields)))
+            for chunk in _chunks(rows, _rows_per_insert):
+                yield str + ",\n".join("(%s)"%",".join(map(_insert_format, row)) for row in chunk) + ";"
     def write_db_schema(self, db_file_path):
         """
         :param db_file_path: the file path of the SQLite database to create
@@ -345,15 +381,64 @@ class SQLiteTicFactory(freezable_factory(object, "_isFrozen")) :
         if not os.path.exists(db_file_path) :
             self.write_db_schema(db_file_path)
         table_names = self._check_tables_fields(db_file_path, self.tic_dat_factory.all_tables)
-        with _sql_con(db_file_path, foreign_keys=False) as con:
+        with _sql_con(db_file_path, foreign_keys=False) as con, _bulk_load_pragmas(con):
             for t in self.tic_dat_factory.all_tables:
                 verify(table_names.get(t) == t, "Failed to find table %s in path %s"%
                                             (t, db_file_path))
-                verify(allow_overwrite or not any(True for _ in  con.execute("Select * from [%s]"%t)),
+                verify(allow_overwrite or not any(True for _ in  con.execute("Select * from [%s] limit 1"%t)),
                         "allow_overwrite is False, but there are already data records in %s"%t)
                 con.execute("Delete from [%s]"%t) if allow_overwrite else None
-            for sql_str, data in self._get_data(tic_dat, as_sql=False):
-                con.execute(sql_str, list(data))
+            # the deletes and the inserts all happen inside the single transaction committed here
+            for t, fields, rows in self._insert_batches(tic_dat):
+                con.executemany("INSERT INTO [%s] (%s) VALUES (%s)"%
+                                (t, ",".join(_brackets(fields)), ",".join("?" * len(fields))), rows)
+            con.commit()
+
+    def write_db_delta(self, tic_dat, db_file_path):
+        """
+        write the ticDat data to an SQLite database file, changing only the records that differ
+        from the data already in the file
+
+        :param tic_dat: the data object to write
+
+        :param db_file_path: the file path of the SQLite database to update (created if need be)
+
+        :return: a dictionary mapping each table name to a DeltaWriteCounts namedtuple of the number
+                 of records inserted, updated and deleted
+
+        caveats : Records are matched by primary key. Tables without primary keys are rewritten in full
+                  if (and only if) their records differ. The file ends up holding the same data as
+                  write_db_data with allow_overwrite=True would write. Also see the write_db_data caveats.
+        """
+        verify(sql, "sqlite3 needs to be installed to use this subroutine")
+        msg = []
+        if not self.tic_dat_factory.good_tic_dat_object(tic_dat, lambda m : msg.append(m)) :
+            raise TicDatError("Not a valid TicDat object for this schema : " + " : ".join(msg))
+        verify(not os.path.isdir(db_file_path), "A directory is not a valid SQLite file path")
+        if self.tic_dat_factory.generic_tables:
+             dat, tdf = create_generic_free(tic_dat, self.tic_dat_factory)
+             return tdf.sql.write_db_delta(dat, db_file_path)
+        if not os.path.exists(db_file_path) :
+            self.write_db_schema(db_file_path)
+        table_names = self._check_tables_fields(db_file_path, self.tic_dat_factory.all_tables)
+        rtn = {}
+        with _sql_con(db_file_path, foreign_keys=False) as con, _bulk_load_pragmas(con):
+            for t in self.tic_dat_factory.all_tables:
+                verify(table_names.get(t) == t, "Failed to find table %s in path %s"%
+                                            (t, db_file_path))
+                rtn[t] = sqlite_delta_write(con, t, self.tic_dat_factory.primary_key_fields.get(t, ()),
+                                            self.tic_dat_factory.data_fields.get(t, ()), self._full_rows(tic_dat, t))
+            con.commit()
+        return rtn
+    def _full_rows(self, tic_dat, t):
+        # the rows of _table_rows, with every field of the table present, in schema order
+        tdf = self.tic_dat_factory
+        fields = tuple(tdf.primary_key_fields.get(t, ())) + tuple(tdf.data_fields.get(t, ()))
+        for row_fields, row in self._table_rows(tic_dat, t):
+            if row_fields != fields:
+                row = dict(zip(row_fields, row))
+                row = tuple(row[f] if f in row else tdf.default_values[t][f] for f in fields)
+            yield row
 
     def write_sql_file(self, tic_dat, sql_file_path, include_schema = False,
                        allow_overwrite = False):
@@ -385,7 +470,6 @@ class SQLiteTicFactory(freezable_factory(object, "_isFrozen")) :
 
     def _write_sql_file(self, tic_dat, sql_file_path, schema_tables):
         with open(sql_file_path, "w") as f:
-            for str in self._get_schema_sql(schema_tables) + \
-                       self._get_data(tic_dat, as_sql=True):
+            for str in chain(self._get_schema_sql(schema_tables), self._get_sql_inserts(tic_dat)):
                 f.write(str + "\n")
 
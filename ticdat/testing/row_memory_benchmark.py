@@ -0,0 +1,69 @@
+#useful helper testing script
+# reports the memory retained per TicDat row for the netflow and diet schemas
+# usage : python -m ticdat.testing.row_memory_benchmark [number of rows per table]
+
+import sys
+import gc
+import tracemalloc
+from ticdat import TicDatFactory
+from ticdat.utils import ForeignKeyMapping
+from ticdat.testing.ticdattestutils import netflowSchema, dietSchema, addNetflowForeignKeys, addDietForeignKeys
+
+def _synthetic_tables(tdf, num_rows):
+    # row i of a table takes its foreign key fields from row i of the foreign table, so every foreign key is satisfied
+    fks = tdf.foreign_keys
+    fields, todo = {}, list(tdf.all_tables)
+    while todo:
+        t = next((t for t in todo if all(fk.foreign_table in fields for fk in fks
+                                          if fk.native_table == t and fk.foreign_table != t)), todo[0])
+        todo.remove(t)
+        pks, dfs = tdf.primary_key_fields.get(t, ()), tdf.data_fields.get(t, ())
+        fields[t] = [dict([(f, "%s_%s"%(f, i)) for f in pks] + [(f, float(i)) for f in dfs])
+                     for i in range(num_rows)]
+        for fk in fks:
+            if fk.native_table == t and fk.foreign_table in fields and fk.foreign_table != t:
+                for m in ((fk.mapping,) if type(fk.mapping) is ForeignKeyMapping else fk.mapping):
+                    for row, foreign_row in zip(fields[t], fields[fk.foreign_table]):
+                        row[m.native_field] = foreign_row[m.foreign_field]
+    rtn = {}
+    for t, rows in fields.items():
+        pks, dfs = tdf.primary_key_fields.get(t, ()), tdf.data_fields.get(t, ())
+        rtn[t] = [(row[pks[0]] if len(pks) == 1 else tuple(row[f] for f in pks), [row[f] for f in dfs])
+                  for row in rows]
+    return rtn
+
+def bytes_per_row(tdf, num_rows, tables=None):
+    """
+    :param tdf: a TicDatFactory with primary keys for every table
+    :param num_rows: number of rows to create for each table
+    :param tables: optional rows to use for each table, as made by _synthetic_tables. Defaults to rows made from tdf.
+    :return: the number of bytes retained by a TicDat, divided by the total number of rows
+    """
+    tables = tables or _synthetic_tables(tdf, num_rows)
+    tdf.TicDat() # the first TicDat triggers one time work we don't want to measure
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    dat = tdf.TicDat(**{t: {k: v for k, v in rows} for t, rows in tables.items()})
+    gc.collect()
+    rtn = (tracemalloc.get_traced_memory()[0] - start) / float(num_rows * len(tables))
+    tracemalloc.stop()
+    assert sum(map(len, (getattr(dat, t) for t in tables))) == num_rows * len(tables)
+    return rtn
+
+def main(num_rows=20000):
+    for name, schema, add_fks in [("netflow", netflowSchema, addNetflowForeignKeys),
+                                  ("diet", dietSchema, addDietForeignKeys)]:
+        fk_tdf = TicDatFactory(**schema())
+        add_fks(fk_tdf)
+        # both factories get the same rows, and those rows satisfy every foreign key
+        tables = _synthetic_tables(fk_tdf, num_rows)
+        tdf = TicDatFactory(**schema())
+        print("%s : %.1f bytes per row"%(name, bytes_per_row(tdf, num_rows, tables)))
+        fk_tdf.enable_foreign_key_links()
+        dat = fk_tdf.TicDat(**{t: {k: v for k, v in rows} for t, rows in tables.items()})
+        assert not fk_tdf.find_foreign_key_failures(dat)
+        print("%s (foreign key links enabled) : %.1f bytes per row"%(name, bytes_per_row(fk_tdf, num_rows, tables)))
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
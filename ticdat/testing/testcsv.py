@@ -11,6 +11,7 @@ from ticdat.testing.ticdattestutils import flagged_as_run_alone
 import unittest
 from ticdat.csvtd import _can_unit_test
 import datetime
+from concurrent.futures import ProcessPoolExecutor
 try:
     import dateutil, dateutil.parser
 except:
@@ -433,6 +434,62 @@ class TestCsv(unittest.TestCase):
         self.assertTrue(raw_tdf._same_data(dat_nums, dat_nums_2))
         self.assertTrue(raw_tdf._same_data(dat_strs, dat_strs_2))
 
+    def testHeaderResolution(self):
+        if not self.can_run:
+            return
+        tdf = TicDatFactory(data=[["Key"], ["Num", "Int", "Txt"]])
+        tdf.set_data_type("data", "Num", nullable=True, max=float("inf"), inclusive_max=True)
+        tdf.set_data_type("data", "Int", must_be_int=True)
+        tdf.set_data_type("data", "Txt", number_allowed=False, strings_allowed='*')
+        tdf.set_infinity_io_flag(100)
+        dir_path = makeCleanDir(os.path.join(_scratchDir, "header_resolution"))
+        with open(os.path.join(dir_path, "data.csv"), "w") as f:
+            f.write("txt,Ignored,INT,key,num\n" + "a,x,2.0,k1,1.5\n" + "\n" + "b,x,3,k2,\n" + "c,x,4,k3,200\n" +
+                    "d,x,5.5,k4\n")
+        dat = tdf.csv.create_tic_dat(dir_path)
+        self.assertTrue({k: tuple(v.values()) for k, v in dat.data.items()} ==
+                        {"k1": (1.5, 2, "a"), "k2": (None, 3, "b"), "k3": (float("inf"), 4, "c"),
+                         "k4": (None, 5.5, "d")})
+        self.assertTrue([type(dat.data[k]["Int"]) for k in ["k1", "k4"]] == [int, float])
+        with open(os.path.join(dir_path, "data.csv"), "w") as f:
+            f.write("key,num,Num,int,txt\n" + "k1,1,2,3,a\n")
+        self.assertTrue("Duplicate field names" in str(firesException(lambda: tdf.csv.create_tic_dat(dir_path))))
+        with open(os.path.join(dir_path, "data.csv"), "w") as f:
+            f.write("key,num,txt\n")
+        self.assertFalse(tdf.csv.create_tic_dat(dir_path).data)
+        with open(os.path.join(dir_path, "data.csv"), "w") as f:
+            f.write("key,num,txt\n" + "k1,1,a\n")
+        self.assertTrue("Unable to find field name Int" in str(firesException(lambda:
+                                                                             tdf.csv.create_tic_dat(dir_path))))
+
+    def testExecutor(self):
+        if not self.can_run:
+            return
+        tdf = TicDatFactory(notes=[[], ["note"]], **netflowSchema())
+        tdf.set_generator_tables(["notes"])
+        tdf.set_data_type("cost", "cost", max=float("inf"), inclusive_max=True)
+        tdf.set_infinity_io_flag(999)
+        ticDat = tdf.TicDat(notes=[["hello"], ["there"]],
+                            **{t: getattr(netflowData(), t) for t in tdf.primary_key_fields if t != "notes"})
+        ticDat.cost["Pencils", "Denver", "Boston"] = float("inf")
+        dirPaths = [makeCleanDir(os.path.join(_scratchDir, _)) for _ in ["netflow_serial", "netflow_pool"]]
+        tdf.csv.write_directory(ticDat, dirPaths[0], case_space_table_names=True)
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            tdf.csv.write_directory(ticDat, dirPaths[1], case_space_table_names=True, executor=executor)
+            self.assertTrue(sorted(os.listdir(dirPaths[0])) == sorted(os.listdir(dirPaths[1])))
+            for f in os.listdir(dirPaths[0]):
+                with open(os.path.join(dirPaths[0], f)) as serial, open(os.path.join(dirPaths[1], f)) as pooled:
+                    self.assertTrue(serial.read() == pooled.read())
+            serial_dat = tdf.csv.create_tic_dat(dirPaths[1])
+            pooled_dat = tdf.csv.create_tic_dat(dirPaths[1], executor=executor)
+            self.assertTrue(tdf._same_data(serial_dat, pooled_dat) and tdf._same_data(ticDat, pooled_dat))
+            self.assertTrue(pooled_dat.cost["Pencils", "Denver", "Boston"]["cost"] == float("inf"))
+            self.assertTrue([_["note"] for _ in pooled_dat.notes()] == ["hello", "there"])
+            with open(os.path.join(dirPaths[1], "Arcs.csv"), "w") as f:
+                f.write("source,capacity\nfoo,1\n")
+            ex = firesException(lambda: tdf.csv.create_tic_dat(dirPaths[1], executor=executor))
+            self.assertTrue("Unable to find field name destination" in str(ex))
+
 _scratchDir = TestCsv.__name__ + "_scratch"
 
 # Run the tests.
@@ -16,6 +16,7 @@ try:
 except:
     numpy = pd = None
 import math
+from concurrent.futures import ThreadPoolExecutor
 try:
     import dateutil, dateutil.parser
 except:
@@ -423,6 +424,32 @@ class TestIO(unittest.TestCase):
         sqlPanDat = pdf2.sql.create_pan_dat(filePath)
         self.assertTrue(pdf._same_data(panDat, sqlPanDat))
 
+    def testSqlDeltaWrite(self):
+        if not self.can_run:
+            return
+        pdf = PanDatFactory(**dietSchema())
+        pdf.set_data_type("foods", "cost", datetime=True)
+        pdf.set_data_type("categories", "maxNutrition", max=float("inf"), inclusive_max=True)
+        pdf.set_infinity_io_flag(1e10)
+        tdf = TicDatFactory(**dietSchema())
+        panDat = pan_dat_maker(dietSchema(), tdf.TicDat(**{t:getattr(dietData(),t) for t in tdf.all_tables}))
+        panDat.foods["cost"] = pd.Timestamp("2020-01-02 03:04:05")
+        filePath = os.path.join(_scratchDir, "diet_delta.db")
+        pdf.sql.write_file(panDat, filePath)
+        counts = pdf.sql.write_file_delta(panDat, filePath)
+        self.assertTrue(set(counts) == set(pdf.all_tables) and not any(map(any, counts.values())))
+        panDat.foods.iloc[0, list(panDat.foods.columns).index("cost")] = pd.Timestamp("2021-01-01")
+        panDat.categories.iloc[0, list(panDat.categories.columns).index("maxNutrition")] = float("inf")
+        panDat.nutritionQuantities = panDat.nutritionQuantities.iloc[1:]
+        counts = pdf.sql.write_file_delta(panDat, filePath)
+        self.assertTrue({t: tuple(v) for t, v in counts.items()} ==
+                        {"foods": (0, 1, 0), "categories": (0, 1, 0), "nutritionQuantities": (0, 0, 1)})
+        self.assertTrue(pdf._same_data(panDat, pdf.sql.create_pan_dat(filePath)))
+        panDat.foods = pd.concat([panDat.foods, panDat.foods.iloc[:1]], ignore_index=True)
+        self.assertTrue(firesException(lambda: pdf.sql.write_file_delta(panDat, filePath)))
+        panDat.foods = panDat.foods.iloc[:-1]
+        self.assertTrue(not any(map(any, pdf.sql.write_file_delta(panDat, filePath).values())))
+
     def testSqlSpacey(self):
         if not self.can_run:
             return
@@ -547,6 +574,29 @@ class TestIO(unittest.TestCase):
         panDat2 = pdf.csv.create_pan_dat(dirPath, decimal=",")
         self.assertTrue(pdf._same_data(panDat, panDat2))
 
+    def testCsvExecutor(self):
+        if not self.can_run:
+            return
+        tdf = TicDatFactory(**netflowSchema())
+        pdf = PanDatFactory(**netflowSchema())
+        ticDat = tdf.freeze_me(tdf.TicDat(**{t:getattr(netflowData(),t) for t in tdf.primary_key_fields}))
+        panDat = pan_dat_maker(netflowSchema(), ticDat)
+        dirPaths = [makeCleanDir(os.path.join(_scratchDir, _)) for _ in ["netflow_serial_csv", "netflow_threads_csv"]]
+        pdf.csv.write_directory(panDat, dirPaths[0], case_space_table_names=True)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            pdf.csv.write_directory(panDat, dirPaths[1], case_space_table_names=True, executor=executor)
+            self.assertTrue(sorted(os.listdir(dirPaths[0])) == sorted(os.listdir(dirPaths[1])))
+            for f in os.listdir(dirPaths[0]):
+                with open(os.path.join(dirPaths[0], f)) as serial, open(os.path.join(dirPaths[1], f)) as threaded:
+                    self.assertTrue(serial.read() == threaded.read())
+            panDat2 = pdf.csv.create_pan_dat(dirPaths[1], executor=executor)
+            self.assertTrue(pdf._same_data(panDat, panDat2))
+            self.assertTrue(pdf._same_data(panDat2, pdf.csv.create_pan_dat(dirPaths[1])))
+            with open(os.path.join(dirPaths[1], "Arcs.csv"), "w") as f:
+                f.write("source,capacity\nfoo,1\n")
+            ex = firesException(lambda: pdf.csv.create_pan_dat(dirPaths[1], executor=executor))
+            self.assertTrue(ex and "missing fields" in str(ex))
+
     def testCsvSpacey(self):
         if not self.can_run:
             return
@@ -5,10 +5,13 @@ import ticdat.utils as utils
 from ticdat.testing.ticdattestutils import fail_to_debugger, flagged_as_run_alone, netflowPandasData
 from ticdat.testing.ticdattestutils import netflowSchema, copy_to_pandas_with_reset, dietSchema, netflowData
 from ticdat.testing.ticdattestutils import addNetflowForeignKeys, sillyMeSchema, dietData, pan_dat_maker
-from ticdat.testing.ticdattestutils import addDietForeignKeys, dietData
+from ticdat.testing.ticdattestutils import addDietForeignKeys, dietData, firesException
 from ticdat.ticdatfactory import TicDatFactory
 import itertools
+import warnings
+from unittest.mock import patch
 from math import isnan
+from concurrent.futures import ThreadPoolExecutor
 
 def _deep_anonymize(x)  :
     if not hasattr(x, "__contains__") or utils.stringish(x):
@@ -454,7 +457,7 @@ class TestUtils(unittest.TestCase):
         fk_fails_3 = input_schema.find_foreign_key_failures(new_pan_dat, verbosity="Low", as_table=False)
         self.assertTrue({tuple(k)[:2] + (tuple(k[2]),): len(v) for k,v in fk_fails.items()} ==
                         {k:len(v) for k,v in fk_fails_2.items()} ==
-                        {k:v.count(True) for k,v in fk_fails_3.items()} ==
+                        {k:v.sum() for k,v in fk_fails_3.items()} ==
                         {('position_constraints', 'innings', ("Inning Group", "Inning Group")): 2,
                          ('position_constraints', 'positions', ("Position Group", "Position Group")): 2,
                          ('position_constraints', 'roster', ("Grade", "Grade")): 1})
@@ -832,6 +835,37 @@ class TestUtils(unittest.TestCase):
         errs = pdf.find_foreign_key_failures(pan_dat, max_failures=9)
         self.assertTrue(len(errs) == 1 and all(len(_) == 9 for _ in errs.values()))
 
+    def test_fk_failures_as_series(self):
+        if not self.canRun:
+            return
+        pdf = PanDatFactory(parent=[["a", "b"], ["c"]], child=[["name"], ["a", "b"]], other=[["name"], ["a"]])
+        pdf.add_foreign_key("child", "parent", [["a", "a"], ["b", "b"]])
+        pdf.add_foreign_key("other", "parent", ["a", "a"])
+        dat = pdf.PanDat(parent=DataFrame({"a": [1, 1, 2, None], "b": ["x", "y", "x", "z"], "c": [0]*4}),
+                         child=DataFrame({"name": list("pqrstu"), "a": [1, 2, 2, 3, None, None],
+                                          "b": ["y", "y", "x", "x", "z", "x"]}, index=[10, 5, 7, 7, 0, 1]),
+                         other=DataFrame({"name": list("pqr"), "a": [2, 5, None]}, index=["i", "j", "k"]))
+        orig = {t: getattr(dat, t).copy(deep=True) for t in pdf.all_tables}
+        fails = {fk.native_table: v for fk, v in pdf.find_foreign_key_failures(dat, as_table=False).items()}
+        self.assertTrue(set(fails) == {"child", "other"})
+        self.assertTrue(list(fails["child"].index) == [10, 5, 7, 7, 0, 1] and fails["child"].dtype == bool and
+                        list(fails["child"]) == [False, True, False, True, False, True])
+        self.assertTrue(list(fails["other"].index) == ["i", "j", "k"] and list(fails["other"]) == [False, True, False])
+        child_fk = next(fk for fk in pdf.foreign_keys if fk.native_table == "child")
+        self.assertTrue(list(pdf.find_foreign_key_failures(dat)[child_fk]["name"]) == list("qsu"))
+        self.assertTrue(all(getattr(dat, t).equals(orig[t]) for t in pdf.all_tables))
+        fails = pdf.find_foreign_key_failures(dat, as_table=False, max_failures=2)
+        self.assertTrue(len(fails) == 1 and list(next(iter(fails.values()))).count(True) == 2)
+        # object dtype key columns holding only numbers are matched as they are, without dtype inference warnings
+        dat = pdf.PanDat(parent=DataFrame({"a": utils.pd.Series([1, 2.0, 3], dtype=object), "b": ["x", "y", "x"],
+                                           "c": [0]*3}),
+                         child=DataFrame({"name": list("pqrs"), "a": utils.pd.Series([1.0, 2, 3, 2], dtype=object),
+                                          "b": ["x", "y", "y", "x"]}))
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", FutureWarning)
+            fails = pdf.find_foreign_key_failures(dat, as_table=False)
+        self.assertTrue(list(fails[child_fk]) == [False, False, True, True])
+
     def test_trailing_all_nan(self):
         df = utils.pd.DataFrame({"a": [1, 2, None, None], "b": [10, 20, None, None]})
         df2 = remove_trailing_all_nan(df)
@@ -860,6 +894,342 @@ class TestUtils(unittest.TestCase):
 
         self.assertTrue(len(remove_trailing_all_nan(utils.pd.DataFrame({"a": [None, float("nan"), None],
                                                                         "b":[None]*3}))) == 0)
+    def test_valid_data_mask(self):
+        if not self.canRun:
+            return
+        pd, numpy, TypeDictionary = utils.pd, utils.numpy, utils.TypeDictionary
+        data_types = [TypeDictionary.safe_creator(number_allowed, inclusive_min, inclusive_max, min_, max_,
+                                                  must_be_int, strings_allowed, nullable, datetime)
+                      for number_allowed in [True, False] for inclusive_min in [True, False]
+                      for inclusive_max in [True, False] for min_, max_ in [(0, float("inf")), (-2.5, 10), (1, 1)]
+                      for must_be_int in [True, False] for strings_allowed in ["*", ("a", "b")]
+                      for nullable in [True, False] for datetime in [False, True]]
+        columns = [[0, 1, -1, 10, 11], [0.0, 1.5, -2.5, 10.0, float("inf"), -float("inf"), numpy.nan, 1.0],
+                   ["a", "c", None, ""], ["a", 1, 2.5, None, True, "2020-1-1"], [True, False],
+                   list(pd.to_datetime(["2020-1-1", None, "2021-3-4"])), [None, numpy.nan], []]
+        for data_type in data_types:
+            for column in columns:
+                series = pd.Series(column, index=[10 * i for i in range(len(column))], dtype=None if column else float)
+                self.assertTrue(list(data_type.valid_data_mask(series)) ==
+                                [data_type.valid_data(None if utils.pd.isnull(x) else x) for x in series])
+
+        pdf = PanDatFactory(table=[["pk"], ["a", "b"]])
+        pdf.set_data_type("table", "a", min=0, max=10, must_be_int=True)
+        pdf.set_default_value("table", "a", 2)
+        pdf.set_data_type("table", "b", number_allowed=False, strings_allowed=("x", "y"))
+        pdf.set_default_value("table", "b", "x")
+        dat = pdf.PanDat(table=DataFrame({"pk": ["p1", "p2", None, "p4"], "a": [1, 1.5, 11, 3],
+                                          "b": ["x", "z", "y", None]}))
+        failures = pdf.find_data_type_failures(dat, as_table=False)
+        self.assertTrue({k: list(v) for k, v in failures.items()} ==
+                        {("table", "pk"): [False, False, True, False], ("table", "a"): [False, True, True, False],
+                         ("table", "b"): [False, True, False, True]})
+        self.assertTrue(sum(map(sum, pdf.find_data_type_failures(dat, as_table=False, max_failures=3).values())) == 3)
+        pdf.replace_data_type_failures(dat)
+        self.assertTrue(list(dat.table["a"]) == [1, 2, 2, 3] and list(dat.table["b"]) == ["x", "x", "y", "x"])
+        self.assertTrue(set(pdf.find_data_type_failures(dat)) == {("table", "pk")})
+
+    def test_vectorized_data_row_predicates(self):
+        if not self.canRun:
+            return
+        tdf = TicDatFactory(**dietSchema())
+        pandat = copy_to_pandas_with_reset(tdf, tdf.copy_tic_dat(dietData()))
+        vec_pdf, row_pdf = PanDatFactory(**dietSchema()), PanDatFactory(**dietSchema())
+        for pdf, vec in [(vec_pdf, True), (row_pdf, False)]:
+            pdf.add_data_row_predicate("foods", (lambda df, bound: df["cost"] < bound) if vec else
+                                       (lambda row, bound: row["cost"] < bound), predicate_name="cheap",
+                                       predicate_kwargs_maker=lambda dat: {"bound": 2.5}, vectorized=vec)
+            pdf.add_data_row_predicate("nutritionQuantities",
+                                       (lambda df: df["qty"].where(df["qty"] < 50, "too much").where(
+                                        df["qty"] >= 50, True)) if vec else
+                                       (lambda row: True if row["qty"] < 50 else "too much"),
+                                       predicate_name="qty", predicate_failure_response="Error Message",
+                                       vectorized=vec)
+            pdf.add_data_row_predicate("categories", lambda x: x["nonsense"], predicate_name="oops",
+                                       vectorized=vec)
+        for kwargs in [{}, {"as_table": False}, {"max_failures": 7}]:
+            vec_fails = vec_pdf.find_data_row_failures(pandat, exception_handling="Handled as Failure", **kwargs)
+            row_fails = row_pdf.find_data_row_failures(pandat, exception_handling="Handled as Failure", **kwargs)
+            self.assertTrue(set(vec_fails) == set(row_fails) and vec_fails)
+            for k, v in vec_fails.items():
+                self.assertTrue(v.equals(row_fails[k]))
+        self.assertTrue(len(vec_pdf.find_data_row_failures(pandat, exception_handling="Handled as Failure")
+                            ["categories", "oops"]) == len(pandat.categories))
+        ex = []
+        try:
+            vec_pdf.find_data_row_failures(pandat, exception_handling="Unhandled")
+        except Exception as e:
+            ex[:] = [str(e.__class__)]
+        self.assertTrue("KeyError" in ex[0])
+        tdf_clone = vec_pdf.clone(clone_factory=TicDatFactory)
+        self.assertFalse(tdf_clone.find_data_row_failures(tdf.copy_tic_dat(dietData())))
+        self.assertTrue(set(vec_pdf.clone().find_data_row_failures(pandat, exception_handling="Handled as Failure"))
+                        == {("foods", "cheap"), ("nutritionQuantities", "qty"), ("categories", "oops")})
+
+    def test_data_row_predicates_with_executor(self):
+        if not self.canRun:
+            return
+        tdf = TicDatFactory(**dietSchema())
+        pandat = copy_to_pandas_with_reset(tdf, tdf.copy_tic_dat(dietData()))
+        pdf = PanDatFactory(**dietSchema())
+        kwargs_calls = []
+        def cost_bound(dat):
+            kwargs_calls.append(dat)
+            return {"bound": 2.5}
+        pdf.add_data_row_predicate("foods", lambda row, bound: row["cost"] < bound, predicate_name="cheap",
+                                   predicate_kwargs_maker=cost_bound)
+        pdf.add_data_row_predicate("nutritionQuantities", lambda row: True if row["qty"] < 50 else
+                                   f"{row['food']} has too much {row['category']}", predicate_name="qty",
+                                   predicate_failure_response="Error Message")
+        pdf.add_data_row_predicate("nutritionQuantities", lambda df: df["qty"] > 0, predicate_name="positive",
+                                   vectorized=True)
+        pdf.add_data_row_predicate("categories", lambda row: row["minNutrition"] <= 1 or row["oops"],
+                                   predicate_name="oops")
+        chunk_size = utils.ROW_PREDICATE_CHUNK_SIZE
+        utils.ROW_PREDICATE_CHUNK_SIZE = 2
+        try:
+            for exception_handling, max_failures, as_table in itertools.product(
+                    ["Handled as Failure", "Unhandled"], [float("inf"), 1, 4, 9, 20], [True, False]):
+                def find(executor=None):
+                    try:
+                        return pdf.find_data_row_failures(pandat, as_table=as_table, max_failures=max_failures,
+                                                          exception_handling=exception_handling, executor=executor)
+                    except KeyError as e:
+                        return str(e)
+                kwargs_calls[:] = []
+                serial = find()
+                self.assertTrue(serial and len(kwargs_calls) == 1)
+                with ThreadPoolExecutor(max_workers=3) as executor:
+                    kwargs_calls[:] = []
+                    parallel = find(executor)
+                    self.assertTrue(len(kwargs_calls) == 1)
+                if isinstance(serial, str):
+                    self.assertTrue(parallel == serial)
+                else:
+                    self.assertTrue(set(serial) == set(parallel))
+                    for k, v in serial.items():
+                        self.assertTrue(v.equals(parallel[k]))
+        finally:
+            utils.ROW_PREDICATE_CHUNK_SIZE = chunk_size
+
+    def test_lazy_predicate_kwargs_makers(self):
+        if not self.canRun:
+            return
+        calls = []
+        def maker(name, fail=False):
+            def _maker(dat):
+                calls.append(name)
+                if fail:
+                    raise ValueError(name)
+                return {}
+            return _maker
+        def category_check(row):
+            calls.append("category_check")
+            return True
+        tdf = TicDatFactory(**dietSchema())
+        pandat = copy_to_pandas_with_reset(tdf, tdf.copy_tic_dat(dietData()))
+        for fail in [False, True]:
+            pdf = PanDatFactory(**dietSchema())
+            pdf.add_data_row_predicate("foods", lambda row: row["cost"] < 0, predicate_name="all_fail")
+            pdf.add_data_row_predicate("foods", lambda row: True, predicate_name="made",
+                                       predicate_kwargs_maker=maker("made"))
+            pdf.add_data_row_predicate("categories", category_check, predicate_name="check",
+                                       predicate_kwargs_maker=maker("check", fail))
+            for exception_handling, max_failures in itertools.product(["Handled as Failure", "Unhandled"],
+                                                                      [float("inf"), 3, len(pandat.foods) + 1]):
+                def find(executor=None):
+                    calls[:] = []
+                    try:
+                        rtn = {k: v if isinstance(v, tuple) else list(v["name"])
+                               for k, v in pdf.find_data_row_failures(pandat, exception_handling=exception_handling,
+                                                                      max_failures=max_failures,
+                                                                      executor=executor).items()}
+                    except ValueError as e:
+                        rtn = str(e)
+                    return rtn, list(calls)
+                serial = find()
+                with ThreadPoolExecutor(max_workers=3) as executor:
+                    self.assertTrue(find(executor) == serial)
+                if max_failures <= len(pandat.foods):
+                    self.assertTrue(serial[1] == [] and len(serial[0][("foods", "all_fail")]) == max_failures)
+                else:
+                    self.assertTrue(serial[1][:2] == ["made", "check"])
+                    self.assertTrue(serial[0] == "check" if fail and exception_handling == "Unhandled" else
+                                    len(serial[1]) == 2 + (0 if fail else len(pandat.categories)))
+
+    def test_find_all_failures(self):
+        if not self.canRun:
+            return
+        tdf = TicDatFactory(**dietSchema())
+        pdf = PanDatFactory(**dietSchema())
+        addDietForeignKeys(pdf)
+        pdf.set_data_type("foods", "cost", min=0, max=10, inclusive_max=True)
+        pdf.add_data_row_predicate("nutritionQuantities", lambda row: row["qty"] < 50, predicate_name="qty")
+        dat = tdf.copy_tic_dat(dietData())
+        dat.foods["pizza"] = 11
+        dat.nutritionQuantities["pasta", "fad"] = 1
+        dat.nutritionQuantities["pastry", "fat"] = 1
+        pandat = copy_to_pandas_with_reset(tdf, dat)
+        pandat.foods = utils.pd.concat([pandat.foods, pandat.foods.iloc[:1]])
+        for as_table in [True, False]:
+            with patch.object(PanDatFactory, "good_pan_dat_object", autospec=True,
+                              side_effect=PanDatFactory.good_pan_dat_object) as good_pan_dat_object:
+                failures = pdf.find_all_failures(pandat, as_table=as_table)
+                self.assertTrue(good_pan_dat_object.call_count == 1) # the data object is validated once
+            self.assertTrue(all(failures))
+            for all_fails, fails in zip(failures, [pdf.find_duplicates(pandat, as_table=as_table),
+                                                   pdf.find_data_type_failures(pandat, as_table=as_table),
+                                                   pdf.find_data_row_failures(pandat, as_table=as_table),
+                                                   pdf.find_foreign_key_failures(pandat, as_table=as_table)]):
+                self.assertTrue(set(all_fails) == set(fails))
+                for k, v in fails.items():
+                    self.assertTrue(list(v) == list(all_fails[k]) if isinstance(v, list) else v.equals(all_fails[k]))
+            num_failures = lambda f: sum(len(v) if as_table else sum(v) for d in f for v in d.values())
+            total = num_failures(failures)
+            for max_failures in range(1, total + 2):
+                _failures = pdf.find_all_failures(pandat, as_table=as_table, max_failures=max_failures)
+                self.assertTrue(num_failures(_failures) == min(max_failures, total))
+                for all_fails, fails in zip(failures, _failures):
+                    self.assertTrue(set(fails).issubset(all_fails))
+            self.assertTrue(set(pdf.find_all_failures(pandat, max_failures=1).duplicates) == {"foods"})
+            self.assertFalse(any(pdf.find_all_failures(pandat, max_failures=1)[1:]))
+
+    def test_predicate_kwargs_caching(self):
+        if not self.canRun:
+            return
+        tdf = TicDatFactory(**dietSchema())
+        pdf = PanDatFactory(**dietSchema())
+        calls = []
+        def max_cost(dat):
+            calls.append(dat)
+            return {"max_cost": dat.foods["cost"].max()}
+        pdf.add_data_row_predicate("foods", lambda row, max_cost: row["cost"] < max_cost,
+                                   predicate_name="priciest", predicate_kwargs_maker=max_cost)
+        pdf.add_data_row_predicate("categories", lambda row, max_cost: row["maxNutrition"] > max_cost,
+                                   predicate_kwargs_maker=max_cost)
+        pandat = pdf.copy_pan_dat(copy_to_pandas_with_reset(tdf, tdf.copy_tic_dat(dietData())))
+        pdf.find_data_row_failures(pandat)
+        pdf.find_data_row_failures(pandat)
+        self.assertTrue(len(calls) == 2 and not pdf.predicate_kwargs_caching)
+        pdf.set_predicate_kwargs_caching(True)
+        self.assertTrue(pdf.clone().predicate_kwargs_caching)
+        calls[:] = []
+        for _ in range(3):
+            self.assertTrue(set(pdf.find_data_row_failures(pandat)) == {("foods", "priciest")} and len(calls) == 1)
+        pandat.foods.loc[pandat.foods["name"] == "pizza", "cost"] = 100
+        self.assertTrue(list(pdf.find_data_row_failures(pandat)["foods", "priciest"]["name"]) == ["pizza"]
+                        and len(calls) == 2)
+        pandat.foods = pandat.foods.copy()
+        pdf.find_data_row_failures(pandat)
+        self.assertTrue(len(calls) == 2)
+        pdf.clear_predicate_kwargs_cache(pandat)
+        pdf.find_data_row_failures(pandat)
+        self.assertTrue(len(calls) == 3)
+        pandat.categories = pandat.categories[pandat.categories["name"] != "fat"]
+        pdf.find_data_row_failures(pandat)
+        self.assertTrue(len(calls) == 4)
+
+    def test_faster_df_apply_engine(self):
+        if not self.canRun:
+            return
+        pd = utils.pd
+        df = pd.DataFrame({"a": [1, 2, 3, 4, 5], "b": [1.5, None, 2.5, 3.5, float("nan")],
+                           "c": ["x", None, "y", "z", "w"], "d": [True, False, True, True, False],
+                           "e": pd.to_datetime(["2020-1-1", None, "2021-3-4", "2022-5-6", "2023-7-8"])},
+                          index=pd.MultiIndex.from_tuples([(i, str(i)) for i in range(5)], names=["i", "s"]))
+        rows = [{f: v for f, v in zip(df.columns, r[1:])} for r in df.itertuples(index=True)]
+        seen = []
+        self.assertTrue(utils.faster_df_apply(df, lambda row: seen.append(row) or row["a"]).to_dict() ==
+                        {k: r["a"] for k, r in zip(df.index, rows)})
+        self.assertTrue(len(seen) == len(rows) and all(type(x) == type(y) or (x != x and y != y)
+                                                       for s, r in zip(seen, rows) for x, y in
+                                                       zip(s.values(), r.values())))
+        self.assertTrue(str(seen) == str(rows))
+        for kwargs, func in [({"fields": ["c", "a"]}, lambda row: (row["c"], row["a"])),
+                             ({"fields": ["c", "a"], "row_type": "tuple"}, lambda row: row),
+                             ({"fields": ["c", "a"], "row_type": "namedtuple"}, lambda row: (row.c, row.a))]:
+            self.assertTrue(list(utils.faster_df_apply(df, func, **kwargs)) == [(r["c"], r["a"]) for r in rows])
+        self.assertTrue(str(list(utils.faster_df_apply(df, lambda row: row, row_type="tuple"))) ==
+                        str([tuple(r.values()) for r in rows]))
+        trip_wire = lambda x: (lambda row: -row["a"]) if x >= 2 else None
+        self.assertTrue(list(utils.faster_df_apply(df, lambda row: row["a"], trip_wire_check=trip_wire)) ==
+                        [1, 2, -3, -4, -5])
+        empty = utils.faster_df_apply(df.iloc[:0], lambda row: row["a"])
+        self.assertTrue(len(empty) == 0 and empty.dtype == float)
+        big = pd.DataFrame({"a": range(1000), "b": range(1000, 2000)})
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            for trip_at in [None, 0, 99, 100, 555, 999]:
+                trip_wire = (lambda x: (lambda row: -row["a"]) if x == trip_at else None) if trip_at is not None \
+                            else None
+                serial = utils.faster_df_apply(big, lambda row: row["a"], trip_wire_check=trip_wire)
+                parallel = utils.faster_df_apply(big, lambda row: row["a"], trip_wire_check=trip_wire,
+                                                 executor=executor, chunk_size=100)
+                self.assertTrue(serial.equals(parallel) and list(serial.index) == list(big.index))
+        self.assertTrue(isinstance(firesException(lambda: utils.faster_df_apply(df, lambda row: 1, fields=["a", "z"])),
+                                   utils.TicDatError))
+
+    def test_vectorized_io_adjustments(self):
+        if not self.canRun:
+            return
+        pd = utils.pd
+        pdf = PanDatFactory(t=[["k"], ["n", "o", "d"]])
+        pdf.set_data_type("t", "n", min=-float("inf"), max=float("inf"), inclusive_max=True)
+        pdf.set_data_type("t", "o", min=-float("inf"), max=float("inf"), inclusive_max=True, strings_allowed="*")
+        pdf.set_data_type("t", "d", datetime=True, nullable=True)
+        pdf.set_infinity_io_flag(100)
+        dat = pdf.PanDat(t=pd.DataFrame({"k": ["a", "b", "c", "d", "e"],
+                                         "n": [1.5, 100, -200, float("nan"), -99],
+                                         "o": [500, "x", -100, None, True],
+                                         "d": ["2020-01-01", "20200101", "2020111", "junk", None]}))
+        pdf._general_post_read_adjustment(dat)
+        self.assertTrue(str(dat.t["n"].tolist()) == str([1.5, float("inf"), -float("inf"), float("nan"), -99.0]))
+        self.assertTrue(dat.t["o"].tolist() == [float("inf"), "x", -float("inf"), None, True])
+        self.assertTrue(dat.t["d"].tolist()[:4] == [pd.Timestamp("2020-01-01"), pd.Timestamp("2020-01-01"),
+                                                    "2020111", "junk"] and utils.pd.isnull(dat.t["d"][4]))
+        written = pdf._pre_write_adjustment(dat)
+        self.assertTrue(str(written.t["n"].tolist()) == str([1.5, 100.0, -100.0, float("nan"), -99.0]))
+        self.assertTrue(written.t["o"].tolist() == [100, "x", -100, None, True])
+        self.assertTrue(dat.t["n"].tolist()[1] == float("inf"))
+        dat = pdf.PanDat(t=pd.DataFrame({"k": ["a", "b"], "n": [1, 2], "o": [3, 4],
+                                         "d": ["2020-01-01 10:30:00", "2021-03-04 11:45:30"]}))
+        pdf._general_post_read_adjustment(dat)
+        self.assertTrue(utils.pd.api.types.is_datetime64_any_dtype(dat.t["d"]) and
+                        list(dat.t["d"]) == [pd.Timestamp("2020-01-01 10:30"), pd.Timestamp("2021-03-04 11:45:30")])
+
+    def test_remove_foreign_key_failures_cascade(self):
+        if not self.canRun:
+            return
+        tdf = TicDatFactory(region=[["name"], []], site=[["name"], ["region", "backup"]],
+                            line=[["site", "code"], []], product=[["name"], ["site", "line"]],
+                            demand=[["product", "period"], ["qty"]], notes=[[], ["site", "text"]])
+        pdf = PanDatFactory(**tdf.schema())
+        for fk_pdf in [tdf, pdf]:
+            fk_pdf.add_foreign_key("site", "region", ["region", "name"])
+            fk_pdf.add_foreign_key("site", "site", ["backup", "name"])
+            fk_pdf.add_foreign_key("line", "site", ["site", "name"])
+            fk_pdf.add_foreign_key("product", "line", [["site", "site"], ["line", "code"]])
+            fk_pdf.add_foreign_key("demand", "product", ["product", "name"])
+            fk_pdf.add_foreign_key("notes", "site", ["site", "name"])
+        def make_dat():
+            dat = tdf.TicDat(region=["east", "west"],
+                site={"s1": ["east", "s1"], "s2": ["west", "s1"], "s3": ["north", "s2"], "s4": ["west", "s3"],
+                      "s5": ["west", "s5"]},
+                line=[["s1", "a"], ["s2", "a"], ["s4", "a"], ["s5", "a"], ["s6", "a"]],
+                product={"p1": ["s1", "a"], "p2": ["s4", "a"], "p3": ["s5", "b"], "p4": ["s5", "a"]},
+                demand={(p, t): 1 for p in ["p1", "p2", "p3", "p4", "p5"] for t in range(3)},
+                notes=[["s1", "x"], ["s4", "y"], ["s9", "z"]])
+            return pan_dat_maker(tdf.schema(), dat)
+        pan_dat = pdf.remove_foreign_key_failures(make_dat())
+        self.assertFalse(pdf.find_foreign_key_failures(pan_dat))
+        self.assertTrue(set(pan_dat.site["name"]) == {"s1", "s2", "s5"} and
+                        set(pan_dat.product["name"]) == {"p1", "p4"} and list(pan_dat.notes["site"]) == ["s1"])
+        self.assertTrue(list(pan_dat.demand.index) == [0, 1, 2, 9, 10, 11])
+        slow_pan_dat = make_dat()
+        while pdf.find_foreign_key_failures(slow_pan_dat): # one bulk removal per iteration
+            fk, rows = next(iter(pdf.find_foreign_key_failures(slow_pan_dat, as_table=False).items()))
+            setattr(slow_pan_dat, fk.native_table, getattr(slow_pan_dat, fk.native_table)[[not _ for _ in rows]])
+        self.assertTrue(pdf._same_data(pan_dat, slow_pan_dat))
+
     def test_empty_maker(self):
         pdf = PanDatFactory(**dietSchema())
         dat = pdf.PanDat(nutritionQuantities=[[f"food_{_}", f"cat_{_}", 10] for _ in range(10)],
@@ -465,6 +465,88 @@ class TestSql(unittest.TestCase):
         dat_2 = tdf.sql.create_tic_dat_from_sql(path)
         self.assertTrue(tdf._same_data(dat_1, dat_2, nans_are_same_for_data_rows=True))
 
+    def testCatalogResolution(self):
+        if not self.can_run:
+            return
+        path = makeCleanPath(os.path.join(_scratchDir, "catalog.db"))
+        with sql.connect(path) as con:
+            con.execute("Create TABLE [Big Table] (K text, V, W)")
+            con.execute("Create TABLE [odds_and_ends] (a, b)")
+            con.execute("Create VIEW [some view] as Select K, V from [Big Table]")
+            con.executemany("Insert into [Big Table] values (?, ?, ?)",
+                            [("k%s"%i, ["inf", "TRUE", "false", i][i%4], None if i%5 else "x") for i in range(25000)])
+        tdf = TicDatFactory(big_table=[["k"], ["v", "w"]], some_view="*", odds_and_ends=[[], ["a", "B"]])
+        tdf.set_default_value("big_table", "w", None)
+        dat = tdf.sql.create_tic_dat(path)
+        self.assertTrue(len(dat.big_table) == 25000 and not dat.odds_and_ends)
+        self.assertTrue([dat.big_table["k%s"%i]["v"] for i in range(4)] == [float("inf"), True, False, 3])
+        self.assertTrue(dat.big_table["k5"]["w"] == "x" and dat.big_table["k6"]["w"] is None)
+        self.assertTrue(list(dat.some_view.columns) == ["K", "V"] and len(dat.some_view) == 25000)
+        tdf = TicDatFactory(big_table=[["k"], ["v", "x"]])
+        self.assertTrue("Unable to recognize field x in table big_table" in
+                        str(firesException(lambda: tdf.sql.create_tic_dat(path))))
+        with sql.connect(path) as con:
+            con.execute("Create TABLE [big_TABLE] (k, v)")
+        self.assertTrue("Duplicate tables found for table big_table" in
+                        str(firesException(lambda: tdf.sql.create_tic_dat(path))))
+
+    def testBulkWrite(self):
+        if not self.can_run:
+            return
+        tdf = TicDatFactory(big_table=[["k"], ["v", "w"]], notes=[[], ["note", "count"]])
+        tdf.set_infinity_io_flag(1e10)
+        dat = tdf.TicDat(big_table={"k%s"%i: [["it's", True, float("inf"), i][i%4], None if i%5 else i*1.5]
+                                    for i in range(2500)},
+                         notes=[{"note": "a;b"}, ["c", 2]])
+        path = makeCleanPath(os.path.join(_scratchDir, "bulk.db"))
+        tdf.sql.write_db_data(dat, path)
+        with sql.connect(path) as con:
+            self.assertTrue(con.execute("PRAGMA journal_mode").fetchone()[0].lower() == "delete")
+            self.assertTrue(con.execute("Select count(*) from big_table").fetchone()[0] == 2500)
+        dat_2 = tdf.sql.create_tic_dat(path)
+        self.assertTrue(tdf._same_data(dat, dat_2))
+        self.assertTrue(firesException(lambda: tdf.sql.write_db_data(dat, path)))
+        tdf.sql.write_db_data(dat, path, allow_overwrite=True)
+        self.assertTrue(tdf._same_data(dat, tdf.sql.create_tic_dat(path)))
+
+        sql_path = makeCleanPath(os.path.join(_scratchDir, "bulk.sql"))
+        dat = tdf.TicDat(big_table=dat.big_table) # the sql file reader splits statements on ;
+        tdf.sql.write_sql_file(dat, sql_path, include_schema=True)
+        with open(sql_path) as f:
+            self.assertTrue(f.read().count("INSERT INTO") == 5)
+        self.assertTrue(tdf._same_data(dat, tdf.sql.create_tic_dat_from_sql(sql_path, includes_schema=True)))
+
+    def testDeltaWrite(self):
+        if not self.can_run:
+            return
+        tdf = TicDatFactory(**dietSchema())
+        addDietForeignKeys(tdf)
+        ticDat = tdf.copy_tic_dat(dietData())
+        filePath = makeCleanPath(os.path.join(_scratchDir, "diet_delta.db"))
+        counts = tdf.sql.write_db_delta(ticDat, filePath)
+        self.assertTrue({t: tuple(v) for t, v in counts.items()} ==
+                        {t: (len(getattr(ticDat, t)), 0, 0) for t in tdf.all_tables})
+        self.assertFalse(any(map(any, tdf.sql.write_db_delta(ticDat, filePath).values())))
+        ticDat.foods["pizza"]["cost"] = 100
+        ticDat.foods["new food"] = 3
+        ticDat.categories["fat"]["maxNutrition"] = float("inf")
+        for k in [k for k in ticDat.nutritionQuantities if k[0] == "milk"]:
+            del ticDat.nutritionQuantities[k]
+        del ticDat.foods["milk"]
+        counts = tdf.sql.write_db_delta(ticDat, filePath)
+        self.assertTrue({t: tuple(v) for t, v in counts.items()} ==
+                        {"foods": (1, 1, 1), "categories": (0, 1, 0), "nutritionQuantities": (0, 0, 4)})
+        self.assertTrue(tdf._same_data(ticDat, tdf.sql.create_tic_dat(filePath)))
+
+        tdf = TicDatFactory(notes=[[], ["note", "count"]], generic="*")
+        ticDat = tdf.TicDat(notes=[["a", 1], ["b", None]], generic=utils.DataFrame({"x": [1, 2]}))
+        filePath = makeCleanPath(os.path.join(_scratchDir, "keyless_delta.db"))
+        tdf.sql.write_db_delta(ticDat, filePath)
+        self.assertFalse(any(map(any, tdf.sql.write_db_delta(ticDat, filePath).values())))
+        ticDat.notes.append(["c", 3])
+        self.assertTrue(tuple(tdf.sql.write_db_delta(ticDat, filePath)["notes"]) == (3, 0, 2))
+        self.assertTrue(len(tdf.sql.create_tic_dat(filePath).notes) == 3)
+
 _scratchDir = TestSql.__name__ + "_scratch"
 
 # Run the tests.
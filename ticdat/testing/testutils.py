@@ -11,12 +11,14 @@ import os
 import itertools
 import shutil
 import json
+import copy
 try:
     import dateutil, dateutil.parser
 except:
     dateutil = None
 import datetime
 from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
 try:
     import testing.postgresql as testing_postgresql
@@ -1619,6 +1621,677 @@ class TestUtils(unittest.TestCase):
             df = getattr(copy_2, t)
             self.assertTrue(list(df.index) == list(range(len(df))))
 
+    def test_columnar_tables(self):
+        tdf = TicDatFactory(**netflowSchema())
+        addNetflowForeignKeys(tdf)
+        ctdf = tdf.clone()
+        ctdf.set_columnar_tables(["arcs", "cost", "inflow"])
+        self.assertTrue(set(ctdf.clone().columnar_tables) == {"arcs", "cost", "inflow"})
+        dat = tdf.copy_tic_dat(netflowData())
+        cdat = ctdf.copy_tic_dat(dat)
+        self.assertTrue(tdf._same_data(dat, cdat) and ctdf._same_data(cdat, dat))
+        self.assertFalse(ctdf.find_foreign_key_failures(cdat))
+        self.assertTrue(utils.numpy is None or isinstance(cdat.arcs.column("capacity"), utils.numpy.ndarray))
+        self.assertTrue(list(cdat.cost.column("commodity")) == [k[0] for k in cdat.cost])
+        self.assertTrue(list(cdat.cost.column("cost")) == [r["cost"] for r in cdat.cost.values()])
+        cdat.arcs["Detroit", "Boston"]["capacity"] = "lots"
+        cdat.arcs["Boston", "Boston"] = 12
+        self.assertTrue(cdat.arcs["Detroit", "Boston"]["capacity"] == "lots")
+        self.assertTrue(dict(cdat.arcs["Boston", "Boston"]) == {"capacity": 12})
+        del cdat.arcs["Boston", "Boston"]
+        cdat.arcs["Detroit", "Boston"]["capacity"] = dat.arcs["Detroit", "Boston"]["capacity"]
+        self.assertTrue(tdf._same_data(dat, cdat))
+        self.assertTrue(firesException(lambda: cdat.arcs.__setitem__(("Detroit",), 1)))
+        self.assertTrue(firesException(lambda: cdat.arcs["Detroit", "Boston"]["nope"]))
+        self.assertFalse(firesException(lambda: cdat.inflow["Pens", "Boston"]))
+        self.assertTrue(("Pens", "Boston") in cdat.inflow)
+        # a row view dies with its key, and stays dead if the key is added back
+        row, row_2 = cdat.inflow["Pens", "Boston"], cdat.inflow["Pencils", "Boston"]
+        del cdat.inflow["Pens", "Boston"]
+        self.assertTrue(all(isinstance(firesException(f), utils.TicDatError) for f in
+                            [lambda: row["quantity"], lambda: row.__setitem__("quantity", 1)]))
+        cdat.inflow["Pens", "Boston"] = 7
+        self.assertTrue(firesException(lambda: row["quantity"]) and cdat.inflow["Pens", "Boston"]["quantity"] == 7)
+        self.assertTrue(row_2["quantity"] == dat.inflow["Pencils", "Boston"]["quantity"])
+        cdat.inflow["Pencils", "Boston"] = 5
+        self.assertTrue(firesException(lambda: row_2.__setitem__("quantity", 1)))
+        row_2 = cdat.inflow["Pencils", "Boston"]
+        cdat.inflow.clear()
+        cdat.inflow["Pencils", "Boston"] = 5
+        self.assertTrue(firesException(lambda: row_2["quantity"]))
+        for k, r in dat.inflow.items():
+            cdat.inflow[k] = r
+        self.assertTrue(tdf._same_data(dat, cdat))
+        ctdf.freeze_me(cdat)
+        self.assertTrue(firesException(lambda: cdat.inflow["Pencils", "Detroit"].__setitem__("quantity", 3)))
+        self.assertTrue(firesException(lambda: cdat.inflow["Pencils", "Miami"]))
+        self.assertTrue(firesException(lambda: ctdf.set_columnar_tables(["nodes"])))
+        self.assertTrue(firesException(lambda: TicDatFactory(**netflowSchema()).set_columnar_tables(["not_a_table"])))
+
+    def test_columnar_diet(self):
+        tdf = TicDatFactory(**dietSchema())
+        ctdf = TicDatFactory(**dietSchema())
+        ctdf.set_columnar_tables(ctdf.all_tables)
+        dat = tdf.copy_tic_dat(dietData())
+        cdat = ctdf.TicDat(**{t: [[k] + list(r.values()) for k, r in getattr(dat, t).items()]
+                              for t in ["categories", "foods"]})
+        cdat.nutritionQuantities = ctdf.copy_tic_dat(dat).nutritionQuantities
+        self.assertTrue(tdf._same_data(dat, cdat))
+        pdf = PanDatFactory(**tdf.schema())
+        self.assertTrue(pdf._same_data(tdf.copy_to_pandas(dat, reset_index=True),
+                                       ctdf.copy_to_pandas(cdat, reset_index=True)))
+        self.assertTrue(list(ctdf.copy_to_pandas(cdat).foods.index) == list(cdat.foods))
+
+    def test_compact_rows(self):
+        tdf = TicDatFactory(**dietSchema())
+        addDietForeignKeys(tdf)
+        tdf.enable_foreign_key_links()
+        dat = tdf.copy_tic_dat(dietData())
+        dat_2 = tdf.copy_tic_dat(dat, freeze_it=True)
+        self.assertTrue(tdf._same_data(dat, dat_2))
+        row, row_2 = dat.foods["chicken"], dat_2.foods["chicken"]
+        self.assertFalse(hasattr(row, "__dict__") or hasattr(row_2, "__dict__"))
+        self.assertTrue(type(row) is type(row_2) and row._state is not row_2._state)
+        self.assertTrue(row.nutritionQuantities["protein"] is dat.nutritionQuantities["chicken", "protein"] is
+                        dat.categories["protein"].nutritionQuantities["chicken"])
+        self.assertTrue(row_2.nutritionQuantities["fat"] is dat_2.nutritionQuantities["chicken", "fat"])
+        self.assertTrue(firesException(lambda: row_2.__setitem__("cost", 12)))
+        self.assertTrue(firesException(lambda: setattr(row_2, "nutritionQuantities", {})))
+        row["cost"] = 12
+        self.assertTrue(row["cost"] == 12 and row_2["cost"] != 12)
+        self.assertTrue(firesException(lambda: setattr(row, "not_a_link", 12)))
+        dat_3 = tdf.copy_tic_dat(dat)
+        self.assertTrue(tdf._same_data(dat, dat_3) and not dat_3.foods._state.frozen)
+        dat_3.foods["chicken"]["cost"] = 14
+        self.assertTrue(row["cost"] == 12)
+
+    def test_cached_table_classes(self):
+        tdf = TicDatFactory(**dietSchema())
+        addDietForeignKeys(tdf)
+        dat, dat_2 = tdf.TicDat(), tdf.copy_tic_dat(dietData())
+        self.assertTrue(all(type(getattr(dat, t)) is type(getattr(dat_2, t)) for t in tdf.all_tables))
+        self.assertTrue(type(dat.foods["pizza"]) is type(dat_2.foods["pizza"]))
+        tdf.freeze_me(dat)
+        self.assertTrue(firesException(lambda: dat.foods["pizza"].__setitem__("cost", 2)))
+        dat_2.foods["pizza"]["cost"] = 2
+        dat_3 = tdf.TicDat(foods=[["pizza", 2], ["milk", 3]], categories={"fat": [1, 2]})
+        self.assertTrue(dat_3.foods["pizza"]._state is dat_3.foods._state is dat_3.foods["milk"]._state)
+        self.assertTrue(dat_3.categories["fat"]._state is dat_3.categories._state)
+        self.assertTrue(tdf.freeze_me(dat_3).foods["milk"]._state.frozen and not dat_2.foods._state.frozen)
+        tdf.enable_foreign_key_links()
+        dat_4 = tdf.copy_tic_dat(dat_2)
+        self.assertTrue(tdf._same_data(dat_2, dat_4) and type(dat_4.foods) is not type(dat_2.foods))
+        self.assertTrue(dat_4.foods["pizza"].nutritionQuantities["fat"] is dat_4.nutritionQuantities["pizza", "fat"])
+        self.assertTrue(firesException(lambda: tdf.TicDat(foods=[["pizza", 2, 3]])))
+
+    def test_copy_rows(self):
+        tdf = TicDatFactory(**dietSchema())
+        addDietForeignKeys(tdf)
+        dat = tdf.copy_tic_dat(dietData())
+        row = dat.foods["pizza"]
+        for row_2 in [copy.copy(row), copy.deepcopy(row)]:
+            self.assertTrue(dict(row_2) == dict(row))
+            row_2["cost"] = -1
+            self.assertTrue(row["cost"] != -1)
+        self.assertTrue(copy.copy(row)._key is None and copy.deepcopy(row)._key == "pizza")
+        dat_2 = copy.deepcopy(dat)
+        self.assertTrue(tdf._same_data(dat, dat_2) and dat_2.foods["pizza"]._state is dat_2.foods._state)
+        dat_2.foods["pizza"]["cost"] = -1
+        self.assertTrue(row["cost"] != -1 and not tdf._same_data(dat, dat_2))
+        frozen_row = tdf.freeze_me(tdf.copy_tic_dat(dat)).foods["pizza"]
+        self.assertTrue(firesException(lambda: copy.copy(frozen_row).__setitem__("cost", 2)))
+
+        tdf.enable_foreign_key_links()
+        dat = tdf.copy_tic_dat(dietData())
+        dat_2 = copy.deepcopy(dat)
+        self.assertTrue(tdf._same_data(dat, dat_2))
+        self.assertTrue(dat_2.foods["pizza"].nutritionQuantities["fat"] is dat_2.nutritionQuantities["pizza", "fat"])
+        del dat_2.nutritionQuantities["pizza", "fat"]
+        self.assertTrue("fat" not in dat_2.foods["pizza"].nutritionQuantities)
+        self.assertTrue(dat.foods["pizza"].nutritionQuantities["fat"] is dat.nutritionQuantities["pizza", "fat"])
+
+    def test_from_columns(self):
+        def columns(tdf, dat):
+            rtn = {t: {f: [] for f in tdf.primary_key_fields.get(t, ()) + tdf.data_fields.get(t, ())}
+                   for t in tdf.all_tables}
+            for t in tdf.all_tables:
+                for k, r in getattr(dat, t).items():
+                    for f, x in zip(tdf.primary_key_fields[t] + tdf.data_fields.get(t, ()),
+                                    (k if containerish(k) else (k,)) + tuple(r.values())):
+                        rtn[t][f].append(x)
+            return rtn
+        containerish = utils.containerish
+        for schema, data, add_fks in [(dietSchema, dietData, addDietForeignKeys),
+                                      (netflowSchema, netflowData, addNetflowForeignKeys)]:
+            tdf = TicDatFactory(**schema())
+            add_fks(tdf)
+            tdf.enable_foreign_key_links()
+            dat = tdf.copy_tic_dat(data())
+            dat_2 = tdf.TicDat.from_columns(**columns(tdf, dat))
+            self.assertTrue(tdf._same_data(dat, dat_2))
+            ctdf = tdf.clone()
+            ctdf.set_columnar_tables([t for t in ctdf.all_tables if ctdf.data_fields.get(t)])
+            dat_3 = ctdf.TicDat.from_columns(**columns(tdf, dat))
+            self.assertTrue(tdf._same_data(dat, dat_3) and ctdf._same_data(dat_3, dat))
+        self.assertTrue(dat_2.nodes["Detroit"].arcs_source["Boston"] is dat_2.arcs["Detroit", "Boston"])
+        self.assertTrue(utils.numpy is None or isinstance(dat_3.arcs.column("capacity"), utils.numpy.ndarray))
+
+        tdf = TicDatFactory(**dietSchema())
+        cols = columns(tdf, tdf.copy_tic_dat(dietData()))
+        cols["foods"]["name"].append("pizza")
+        cols["foods"]["cost"].append(100)
+        dat = tdf.freeze_me(tdf.TicDat.from_columns(**cols))
+        self.assertTrue(len(dat.foods) == len(dietData().foods) and dat.foods["pizza"]["cost"] == 100)
+        self.assertTrue(firesException(lambda: dat.foods["pizza"].__setitem__("cost", 2)))
+        cols["foods"]["cost"].append(100)
+        self.assertTrue(firesException(lambda: tdf.TicDat.from_columns(foods=cols["foods"])))
+        self.assertTrue(firesException(lambda: tdf.TicDat.from_columns(foods={"name": ["a"]})))
+        self.assertTrue(firesException(lambda: tdf.TicDat.from_columns(fooods={"name": ["a"], "cost": [1]})))
+
+        tdf = TicDatFactory(table_one=[["a"], ["b"]], table_two=[[], ["c", "d"]], table_three="*")
+        tdf.set_generator_tables(["table_two"])
+        dat = tdf.TicDat.from_columns(table_one={"a": [1, 2], "b": [3, 4]}, table_two=lambda: [(1, 2)],
+                                      table_three={"x": [1, 2], "y": [3, 4]})
+        self.assertTrue(dict(dat.table_one[2]) == {"b": 4} and [dict(_) for _ in dat.table_two()] == [{"c": 1, "d": 2}])
+        self.assertTrue(list(dat.table_three.columns) == ["x", "y"] and len(dat.table_three) == 2)
+        dat = tdf.TicDat.from_columns(table_two={"c": [1, 3], "d": [2, 4]})
+        self.assertTrue([tuple(_.values()) for _ in dat.table_two()] == [(1, 2), (3, 4)])
+
+    def test_good_tic_dat_object_remembered(self):
+        tdf = TicDatFactory(**netflowSchema())
+        tdf.set_columnar_tables(["cost"])
+        dat = tdf.copy_tic_dat(netflowData())
+        with patch.object(TicDatFactory, "_good_tic_dat_object", autospec=True,
+                          side_effect=TicDatFactory._good_tic_dat_object) as checker:
+            def check_count(dat_, row_checking="strict"):
+                count = checker.call_count
+                rtn = tdf.good_tic_dat_object(dat_, row_checking=row_checking)
+                return rtn, checker.call_count - count
+            self.assertTrue(check_count(dat) == (True, 1) and check_count(dat) == (True, 0))
+            self.assertTrue(check_count(dat, "generous") == (True, 1) and check_count(dat) == (True, 0))
+            dat.arcs["Detroit", "Boston"]["capacity"] = 10
+            self.assertTrue(check_count(dat) == (True, 1) and check_count(dat) == (True, 0))
+            dat.cost["Pencils", "Detroit", "Boston"]["cost"] = 10
+            del dat.inflow["Pencils", "Detroit"]
+            self.assertTrue(check_count(dat) == (True, 1) and check_count(dat) == (True, 0))
+            self.assertTrue(firesException(lambda: dat.nodes["Detroit"].__setitem__("color", "red")))
+            dat.nodes["Flint"] = {}
+            self.assertTrue(check_count(dat) == (True, 1) and check_count(dat) == (True, 0))
+            dat.arcs = {"a": 1}
+            self.assertTrue(check_count(dat) == (False, 1) and check_count(dat) == (False, 1))
+            dat.arcs = tdf.TicDat().arcs
+            self.assertTrue(check_count(dat) == (True, 1) and check_count(dat) == (True, 0))
+            dat = tdf.freeze_me(tdf.TicDat(**{t: getattr(netflowData(), t) for t in tdf.all_tables}))
+            self.assertTrue(check_count(dat) == (True, 0))
+            self.assertTrue(check_count(netflowData())[1] == 1 and check_count(netflowData())[1] == 1)
+
+    def test_indexes(self):
+        def brute_lookup(table, **field_values):
+            return {k for k, r in table.items() if all((dict(r).get(f) if f in r else
+                        k[tdf.primary_key_fields["arcs"].index(f)]) == v for f, v in field_values.items())}
+        for columnar in [False, True]:
+            tdf = TicDatFactory(**netflowSchema())
+            tdf.add_index("arcs", ["source"])
+            tdf.add_index("arcs", ["capacity", "destination"])
+            if columnar:
+                tdf.set_columnar_tables(["arcs"])
+            self.assertTrue(set(tdf.indexes["arcs"]) == {("source",), ("capacity", "destination")})
+            dat = tdf.copy_tic_dat(netflowData())
+            for field_values in [{"source": "Detroit"}, {"source": "Boston"}, {"source": "nowhere"},
+                                 {"destination": "New York", "capacity": 120}]:
+                self.assertTrue(set(dat.arcs.lookup(**field_values)) == brute_lookup(dat.arcs, **field_values))
+            self.assertTrue(dat.arcs.lookup(source="Detroit")["Detroit", "Boston"]["capacity"] ==
+                            dat.arcs["Detroit", "Boston"]["capacity"])
+            dat.arcs["Detroit", "Boston"]["capacity"] = 1234
+            dat.arcs["Flint", "Boston"] = {"capacity": 1234}
+            del dat.arcs["Detroit", "New York"]
+            self.assertTrue(set(dat.arcs.lookup(capacity=1234, destination="Boston")) ==
+                            {("Detroit", "Boston"), ("Flint", "Boston")})
+            self.assertTrue(set(dat.arcs.lookup(source="Detroit")) == brute_lookup(dat.arcs, source="Detroit"))
+            self.assertTrue(set(dat.arcs.lookup(source="Flint")) == {("Flint", "Boston")})
+            self.assertTrue(firesException(lambda: dat.arcs.lookup(destination="Boston")))
+            self.assertTrue(firesException(lambda: dat.nodes.lookup(name="Boston")))
+            dat_2 = tdf.clone().copy_tic_dat(dat, freeze_it=True)
+            self.assertTrue(set(dat_2.arcs.lookup(source="Flint")) == {("Flint", "Boston")})
+            dat.arcs.clear()
+            self.assertTrue(not dat.arcs.lookup(source="Detroit"))
+            cols = {f: [] for f in ["source", "destination", "capacity"]}
+            for (s, d), r in tdf.copy_tic_dat(netflowData()).arcs.items():
+                for f, x in zip(cols, [s, d, r["capacity"]]):
+                    cols[f].append(x)
+            dat = tdf.TicDat.from_columns(arcs=cols)
+            self.assertTrue(set(dat.arcs.lookup(source="Detroit")) == brute_lookup(dat.arcs, source="Detroit"))
+
+        tdf = TicDatFactory(**dietSchema())
+        tdf.add_index("nutritionQuantities", ["category"])
+        dat = tdf.copy_tic_dat(dietData())
+        self.assertTrue(len(dat.nutritionQuantities.lookup(category="fat")) ==
+                        len([k for k in dat.nutritionQuantities if k[1] == "fat"]) > 0)
+        self.assertTrue(firesException(lambda: tdf.add_index("foods", ["cost"])))
+        self.assertTrue(firesException(lambda: TicDatFactory(**dietSchema()).add_index("foods", ["price"])))
+        self.assertTrue(firesException(lambda: TicDatFactory(**dietSchema()).add_index("fooods", ["cost"])))
+
+    def test_indexes_ignore_removed_rows(self):
+        tdf = TicDatFactory(**netflowSchema())
+        tdf.add_index("arcs", ["capacity"])
+        dat = tdf.copy_tic_dat(netflowData())
+        removed = [dat.arcs["Detroit", "Boston"], dat.arcs["Detroit", "New York"], dat.arcs["Detroit", "Seattle"],
+                   dat.arcs["Denver", "Boston"]]
+        del dat.arcs["Detroit", "Boston"]
+        dat.arcs.pop(("Detroit", "New York"))
+        dat.arcs["Detroit", "Seattle"] = 77
+        dat.arcs.update({("Denver", "Boston"): {"capacity": 78}})
+        for row in removed: # editing a row that has left its table is legal, and doesn't touch the table
+            row["capacity"] = 1234
+        self.assertTrue(not dat.arcs.lookup(capacity=1234) and removed[0]._key is None)
+        self.assertTrue(set(dat.arcs.lookup(capacity=77)) == {("Detroit", "Seattle")})
+        self.assertTrue(dat.arcs["Detroit", "Seattle"]["capacity"] == 77)
+        removed = list(dat.arcs.values())
+        dat.arcs.clear()
+        for row in removed:
+            row["capacity"] = 1234
+        self.assertTrue(not dat.arcs and not dat.arcs.lookup(capacity=1234))
+
+    def test_foreign_key_links_kept_current(self):
+        tdf = TicDatFactory(**netflowSchema())
+        addNetflowForeignKeys(tdf)
+        tdf.enable_foreign_key_links()
+        def check_links(dat):
+            # the links should match those of a TicDat built from scratch, and reference the current rows
+            rebuilt = tdf.copy_tic_dat(dat)
+            for t, ft, link in [("arcs", "nodes", "arcs_source"), ("arcs", "nodes", "arcs_destination"),
+                                ("cost", "nodes", "cost_source"), ("cost", "commodities", "cost"),
+                                ("inflow", "nodes", "inflow")]:
+                rows = {id(_) for _ in getattr(dat, t).values()}
+                for k, r in getattr(dat, ft).items():
+                    self.assertTrue(set(getattr(r, link)) == set(getattr(getattr(rebuilt, ft)[k], link)))
+                    self.assertTrue(all(id(_) in rows for _ in getattr(r, link).values()))
+        dat = tdf.copy_tic_dat(netflowData())
+        dat.nodes["Flint"] = {}
+        self.assertTrue(not dat.nodes["Flint"].arcs_source)
+        dat.arcs["Flint", "Boston"] = 10
+        self.assertTrue(dat.nodes["Flint"].arcs_source["Boston"] is dat.arcs["Flint", "Boston"])
+        self.assertTrue(dat.nodes["Boston"].arcs_destination["Flint"] is dat.arcs["Flint", "Boston"])
+        dat.cost["Pencils", "Ann Arbor", "Flint"] = 3
+        self.assertTrue(dat.nodes["Ann Arbor"].cost_source["Pencils", "Flint"] is
+                        dat.cost["Pencils", "Ann Arbor", "Flint"])
+        dat.nodes["Ann Arbor"] = {}
+        self.assertTrue(("Pencils", "Flint") in dat.nodes["Ann Arbor"].cost_source)
+        del dat.arcs["Detroit", "Boston"]
+        dat.inflow.pop(("Pencils", "Detroit"))
+        dat.cost.clear()
+        self.assertTrue("Boston" not in dat.nodes["Detroit"].arcs_source and
+                        "Pencils" not in dat.nodes["Detroit"].inflow)
+        self.assertTrue(not any(dat.nodes[n].cost_source for n in dat.nodes))
+        self.assertTrue(tdf._same_data(dat, tdf.copy_tic_dat(dat)))
+        check_links(dat)
+
+        tdf = TicDatFactory(parents=[["name"], []], children=[["name"], ["parent"]])
+        tdf.add_foreign_key("children", "parents", ["parent", "name"])
+        tdf.enable_foreign_key_links()
+        dat = tdf.TicDat(parents=["Homer"], children={"Bart": "Homer", "Lisa": "Homer"})
+        self.assertTrue(set(dat.parents["Homer"].children) == {"Bart", "Lisa"})
+        dat.children["Bart"]["parent"] = "Marge"
+        self.assertTrue(set(dat.parents["Homer"].children) == {"Lisa"})
+        dat.parents["Marge"] = {}
+        self.assertTrue(dat.parents["Marge"].children["Bart"] is dat.children["Bart"])
+        bart, lisa = dat.children["Bart"], dat.children["Lisa"]
+        del dat.children["Bart"]
+        dat.children["Lisa"] = "Marge"
+        bart["parent"], lisa["parent"] = "Homer", "Homer" # edits to removed rows leave the links alone
+        self.assertTrue(not dat.parents["Homer"].children and set(dat.parents["Marge"].children) == {"Lisa"})
+        self.assertTrue(dat.parents["Marge"].children["Lisa"] is dat.children["Lisa"])
+
+    def test_incremental_foreign_key_checks(self):
+        def as_sets(fk_failures):
+            return {k: (set(v.native_values), set(v.native_pks)) for k, v in fk_failures.items()}
+        for schema, data, add_fks in [(dietSchema, dietData, addDietForeignKeys),
+                                      (netflowSchema, netflowData, addNetflowForeignKeys)]:
+            tdf = TicDatFactory(**schema())
+            add_fks(tdf)
+            tdf_inc = tdf.clone()
+            tdf_inc.set_incremental_foreign_key_checks(True)
+            self.assertTrue(tdf_inc.incremental_foreign_key_checks and not tdf.incremental_foreign_key_checks)
+            dat = tdf_inc.copy_tic_dat(data())
+            def check(): # the incremental result matches the full scan
+                self.assertTrue(as_sets(tdf_inc.find_foreign_key_failures(dat)) ==
+                                as_sets(tdf.find_foreign_key_failures(dat)))
+            check()
+            self.assertTrue(dat._foreign_key_failure_trackers)
+            for t in tdf.all_tables:
+                for i, k in enumerate(list(getattr(dat, t))[::2]):
+                    if i % 2:
+                        del getattr(dat, t)[k]
+                    else:
+                        getattr(dat, t).pop(k)
+                    check()
+            for t in tdf.all_tables:
+                for k, r in getattr(tdf.copy_tic_dat(data()), t).items():
+                    getattr(dat, t)[k] = r
+                check()
+            for t in tdf.all_tables: # replacing a table replaces its tracking
+                setattr(dat, t, getattr(tdf_inc.TicDat(), t))
+                check()
+                setattr(dat, t, getattr(tdf_inc.copy_tic_dat(data()), t))
+                check()
+            t, k = ("nodes", "Detroit") if "nodes" in tdf.all_tables else ("foods", "chicken")
+            del getattr(dat, t)[k]
+            check()
+            self.assertTrue(tdf_inc.remove_foreign_key_failures(dat) and not tdf.find_foreign_key_failures(dat))
+
+        tdf = TicDatFactory(parents=[["name"], ["nickname"]], children=[["name"], ["parent"]])
+        tdf.add_foreign_key("children", "parents", ["parent", "nickname"])
+        tdf_inc = tdf.clone()
+        tdf_inc.set_incremental_foreign_key_checks(True)
+        dat = tdf_inc.TicDat(parents={"Homer": "H", "Marge": "M", "Maggie": "M"},
+                             children={"Bart": "H", "Lisa": "M"})
+        self.assertFalse(tdf_inc.find_foreign_key_failures(dat))
+        dat.parents["Marge"]["nickname"] = "Marjorie"
+        self.assertFalse(tdf_inc.find_foreign_key_failures(dat))
+        del dat.parents["Maggie"]
+        self.assertTrue(as_sets(tdf_inc.find_foreign_key_failures(dat)) ==
+                        as_sets(tdf.find_foreign_key_failures(dat)) != {})
+        dat.children["Lisa"]["parent"] = "Marjorie"
+        self.assertFalse(tdf_inc.find_foreign_key_failures(dat))
+        lisa, bart = dat.children["Lisa"], dat.children["Bart"]
+        del dat.children["Lisa"]
+        dat.children["Bart"] = "Nobody"
+        lisa["parent"], bart["parent"] = "Nobody", "H" # edits to removed rows aren't tracked
+        self.assertTrue(as_sets(tdf_inc.find_foreign_key_failures(dat)) ==
+                        as_sets(tdf.find_foreign_key_failures(dat)) != {})
+        dat.children["Bart"]["parent"] = "H"
+        self.assertFalse(tdf_inc.find_foreign_key_failures(dat))
+
+    def test_foreign_key_plans(self):
+        tdf = TicDatFactory(parents=[["name"], ["nickname"]], children=[["name", "parent"], ["age"]],
+                            pets=[[], ["owner", "owner_nickname"]])
+        tdf.add_foreign_key("children", "parents", ["parent", "name"])
+        tdf.add_foreign_key("pets", "parents", [["owner", "name"], ["owner_nickname", "nickname"]])
+        dat = tdf.TicDat(parents={"Homer": "H", "Marge": "M"},
+                         children=[["Bart", "Homer", 10], ["Lisa", "Mona", 8]],
+                         pets=[["Homer", "H"], ["Marge", "H"]])
+        fk_failures = tdf.find_foreign_key_failures(dat, verbosity="Low")
+        self.assertTrue(fk_failures == {("children", "parents", ("parent", "name")): (("Mona",), (("Lisa", "Mona"),)),
+                                        ("pets", "parents", (("owner", "name"), ("owner_nickname", "nickname"))):
+                                            ((("Marge", "H"),), (1,))})
+        plans = dict(tdf._foreign_key_plans)
+        self.assertTrue(len(plans) == 2 and tdf.find_foreign_key_failures(dat, verbosity="Low") == fk_failures)
+        self.assertTrue(all(tdf._foreign_key_plans[fk] is plan for fk, plan in plans.items()))
+        self.assertTrue(len(tdf.find_foreign_key_failures(dat, max_failures=1)) == 1)
+
+    def test_compiled_data_type_checks(self):
+        TypeDictionary = utils.TypeDictionary
+        data_types = [TypeDictionary.safe_creator(number_allowed, inclusive_min, inclusive_max, min_, max_,
+                                                  must_be_int, strings_allowed, nullable, datetime)
+                      for number_allowed in [True, False] for inclusive_min in [True, False]
+                      for inclusive_max in [True, False] for min_, max_ in [(0, float("inf")), (-2.5, 10), (1, 1)]
+                      for must_be_int in [True, False] for strings_allowed in ["*", (), ("a", "b")]
+                      for nullable in [True, False] for datetime in [False, True]]
+        values = [None, float("nan"), 0, 1, -1, 1.5, 10, 10.0, -2.5, float("inf"), -float("inf"), True, "a", "c",
+                  "", "2020-1-1", datetime.datetime(2020, 1, 1), utils.numpy.float64(1.0) if utils.numpy else 2,
+                  (1, 2)]
+        for data_type in data_types:
+            validator = data_type.validator()
+            self.assertTrue([validator(v) for v in values] == [data_type.valid_data(v) for v in values])
+
+        tdf = TicDatFactory(**dietSchema())
+        tdf.set_data_type("foods", "cost", min=0, max=10, inclusive_max=True)
+        tdf.set_data_type("categories", "minNutrition", min=0, max=float("inf"), inclusive_max=True,
+                          must_be_int=True)
+        dat = tdf.copy_tic_dat(dietData())
+        dat.foods["pizza"] = 11
+        dat.foods["salad"] = "cheap"
+        dat.categories["fat"]["minNutrition"] = 1.5
+        dat.nutritionQuantities[None, "fat"] = 1
+        with patch.object(TicDatFactory, "create_from_full_schema", autospec=True) as create:
+            failures = tdf.find_data_type_failures(dat)
+            self.assertTrue(not create.called and tdf.find_data_type_failures(dat) == failures)
+        self.assertTrue({k: (set(v.bad_values), set(v.pks)) for k, v in failures.items()} ==
+                        {("foods", "cost"): ({11, "cheap"}, {"pizza", "salad"}),
+                         ("categories", "minNutrition"): ({1.5}, {"fat"}),
+                         ("nutritionQuantities", "food"): ({None}, {(None, "fat")})})
+        ctdf = tdf.clone()
+        ctdf.set_columnar_tables(["foods", "categories"])
+        self.assertTrue(ctdf.find_data_type_failures(ctdf.copy_tic_dat(dat)) == failures)
+
+    def test_data_row_predicates_with_executor(self):
+        tdf = TicDatFactory(**dict(dietSchema(), notes=[[], ["food", "text"]]))
+        tdf.add_data_row_predicate("foods", _costs_less_than, predicate_name="cheap",
+                                   predicate_kwargs_maker=_cost_bound)
+        tdf.add_data_row_predicate("nutritionQuantities", lambda row: True if row["qty"] < 50 else
+                                   f"{row['food']} has too much {row['category']}", predicate_name="qty",
+                                   predicate_failure_response="Error Message")
+        tdf.add_data_row_predicate("categories", lambda row: row["minNutrition"] <= 1 or row["oops"],
+                                   predicate_name="oops")
+        tdf.add_data_row_predicate("notes", lambda row: row["food"] in ("pizza", "salad"), predicate_name="notes")
+        dat = tdf.TicDat(**{t: getattr(dietData(), t) for t in dietSchema()})
+        for i, f in enumerate(dat.foods):
+            dat.notes.append({"food": f, "text": f"note {i}"})
+        kwargs_calls = []
+        _cost_bound.calls = kwargs_calls
+        chunk_size = utils.ROW_PREDICATE_CHUNK_SIZE
+        utils.ROW_PREDICATE_CHUNK_SIZE = 2
+        picklable_tdf = tdf.clone(table_restrictions=["foods"]) # lambdas can't be sent to a process pool
+        try:
+            for exception_handling, max_failures, (_tdf, executor_type) in itertools.product(
+                    ["Handled as Failure", "Unhandled"], [float("inf"), 1, 4, 9, 20],
+                    [(tdf, ThreadPoolExecutor), (picklable_tdf, ProcessPoolExecutor)]):
+                _dat = _tdf.TicDat(**{t: getattr(dat, t) for t in _tdf.all_tables})
+                def find(executor=None):
+                    try:
+                        return _tdf.find_data_row_failures(_dat, exception_handling=exception_handling,
+                                                           max_failures=max_failures, executor=executor)
+                    except KeyError as e:
+                        return str(e)
+                kwargs_calls[:] = []
+                serial = find()
+                self.assertTrue(serial and len(kwargs_calls) == 1)
+                with executor_type(max_workers=3) as executor:
+                    kwargs_calls[:] = []
+                    parallel = find(executor)
+                    self.assertTrue(len(kwargs_calls) == 1)
+                if isinstance(serial, str):
+                    self.assertTrue(parallel == serial)
+                else:
+                    self.assertTrue({k: set(v) if isinstance(v, tuple) else v for k, v in serial.items()} ==
+                                    {k: set(v) if isinstance(v, tuple) else v for k, v in parallel.items()})
+        finally:
+            utils.ROW_PREDICATE_CHUNK_SIZE = chunk_size
+
+    def test_lazy_predicate_kwargs_makers(self):
+        calls = []
+        def maker(name, fail=False):
+            def _maker(dat):
+                calls.append(name)
+                if fail:
+                    raise ValueError(name)
+                return {}
+            return _maker
+        def category_check(row):
+            calls.append("category_check")
+            return True
+        for fail in [False, True]:
+            tdf = TicDatFactory(**dietSchema())
+            tdf.add_data_row_predicate("foods", lambda row: row["cost"] < 0, predicate_name="all_fail")
+            tdf.add_data_row_predicate("foods", lambda row: True, predicate_name="made",
+                                       predicate_kwargs_maker=maker("made"))
+            tdf.add_data_row_predicate("categories", category_check, predicate_name="check",
+                                       predicate_kwargs_maker=maker("check", fail))
+            dat = tdf.copy_tic_dat(dietData())
+            for exception_handling, max_failures in itertools.product(["Handled as Failure", "Unhandled"],
+                                                                      [float("inf"), 3, len(dat.foods) + 1]):
+                def find(executor=None):
+                    calls[:] = []
+                    try:
+                        rtn = tdf.find_data_row_failures(dat, exception_handling=exception_handling,
+                                                         max_failures=max_failures, executor=executor)
+                    except ValueError as e:
+                        rtn = str(e)
+                    return rtn, list(calls)
+                serial = find()
+                with ThreadPoolExecutor(max_workers=3) as executor:
+                    self.assertTrue(find(executor) == serial)
+                if max_failures <= len(dat.foods):
+                    self.assertTrue(serial[1] == [] and len(serial[0][("foods", "all_fail")]) == max_failures)
+                else:
+                    self.assertTrue(serial[1][:2] == ["made", "check"])
+                    self.assertTrue(serial[0] == "check" if fail and exception_handling == "Unhandled" else
+                                    len(serial[1]) == 2 + (0 if fail else len(dat.categories)))
+
+    def test_full_row_view_predicates(self):
+        tdf = TicDatFactory(**dietSchema())
+        seen = []
+        def check_view(row):
+            seen.append(row)
+            return dict(row) == {f: row[f] for f in tdf.primary_key_fields["nutritionQuantities"] +
+                                 tdf.data_fields["nutritionQuantities"]} and "qty" in row and "oops" not in row
+        tdf.add_data_row_predicate("nutritionQuantities", check_view, predicate_name="view")
+        tdf.add_data_row_predicate("nutritionQuantities", lambda row: row["qty"] < 50, predicate_name="qty")
+        tdf.add_data_row_predicate("nutritionQuantities", lambda row: row.get("oops", 0) == 0 and
+                                   len(row) == 3 and row["food"] != "milk", predicate_name="milk")
+        tdf.add_data_row_predicate("foods", lambda row: row["oops"], predicate_name="oops")
+        dat = tdf.copy_tic_dat(dietData())
+        with patch.object(TicDatFactory, "_get_full_row", autospec=True) as get_full_row:
+            failures = tdf.find_data_row_failures(dat, exception_handling="Handled as Failure")
+            self.assertFalse(get_full_row.called)
+        self.assertTrue(len(seen) == len(dat.nutritionQuantities) and
+                        {(r["food"], r["category"]) for r in seen} == set(dat.nutritionQuantities))
+        self.assertTrue(set(failures) == {("nutritionQuantities", "qty"), ("nutritionQuantities", "milk"),
+                                          ("foods", "oops")})
+        self.assertTrue(set(failures["nutritionQuantities", "qty"]) ==
+                        {k for k, r in dat.nutritionQuantities.items() if r["qty"] >= 50})
+        self.assertTrue(set(failures["nutritionQuantities", "milk"]) ==
+                        {k for k in dat.nutritionQuantities if k[0] == "milk"})
+        self.assertTrue(set(failures["foods", "oops"]) == set(dat.foods))
+        self.assertRaises(KeyError, lambda: tdf.find_data_row_failures(dat, exception_handling="Unhandled"))
+        for max_failures in [1, 3, 10, 30]:
+            _failures = tdf.find_data_row_failures(dat, exception_handling="Handled as Failure",
+                                                   max_failures=max_failures)
+            self.assertTrue(sum(map(len, _failures.values())) == max_failures)
+            self.assertTrue(all(set(v).issubset(failures[k]) for k, v in _failures.items()))
+
+    def test_find_all_failures(self):
+        tdf = TicDatFactory(**dietSchema())
+        addDietForeignKeys(tdf)
+        tdf.set_data_type("foods", "cost", min=0, max=10, inclusive_max=True)
+        tdf.add_data_row_predicate("nutritionQuantities", lambda row: row["qty"] < 50, predicate_name="qty")
+        tdf.add_data_row_predicate("categories", lambda row, bound: row["maxNutrition"] < bound,
+                                   predicate_name="bound", predicate_kwargs_maker=lambda dat: {"bound": 1e4})
+        dat = tdf.copy_tic_dat(dietData())
+        dat.foods["pizza"] = 11
+        dat.foods["salad"] = "cheap"
+        dat.nutritionQuantities["pasta", "fad"] = 1
+        dat.nutritionQuantities["pastry", "fat"] = 1
+        with patch.object(TicDatFactory, "good_tic_dat_object", autospec=True,
+                          side_effect=TicDatFactory.good_tic_dat_object) as good_tic_dat_object:
+            failures = tdf.find_all_failures(dat)
+            self.assertTrue(good_tic_dat_object.call_count == 1) # the data object is validated once
+        self.assertTrue(failures.data_type_failures == tdf.find_data_type_failures(dat) and
+                        failures.data_row_failures == tdf.find_data_row_failures(dat) and
+                        failures.foreign_key_failures == tdf.find_foreign_key_failures(dat))
+        self.assertTrue(all(failures))
+        num_failures = lambda f: (sum(len(v.pks) for v in f.data_type_failures.values()) +
+                                  sum(len(v) for v in f.data_row_failures.values()) +
+                                  sum(len(v.native_pks) for v in f.foreign_key_failures.values()))
+        total = num_failures(failures)
+        for max_failures in range(1, total + 2):
+            _failures = tdf.find_all_failures(dat, max_failures=max_failures)
+            self.assertTrue(num_failures(_failures) == min(max_failures, total))
+            for all_fails, fails in zip(failures, _failures):
+                self.assertTrue(set(fails).issubset(all_fails))
+        self.assertTrue(tdf.find_all_failures(dat, max_failures=2).data_type_failures ==
+                        failures.data_type_failures)
+        self.assertFalse(any(tdf.find_all_failures(dat, max_failures=2)[1:]))
+
+    def test_predicate_kwargs_caching(self):
+        tdf = TicDatFactory(**dietSchema())
+        calls = []
+        def max_cost(dat):
+            calls.append(dat)
+            return {"max_cost": max(r["cost"] for r in dat.foods.values())}
+        tdf.add_data_row_predicate("foods", lambda row, max_cost: row["cost"] < max_cost,
+                                   predicate_name="priciest", predicate_kwargs_maker=max_cost)
+        tdf.add_data_row_predicate("categories", lambda row, max_cost: row["maxNutrition"] > max_cost,
+                                   predicate_kwargs_maker=max_cost)
+        dat = tdf.copy_tic_dat(dietData())
+        failures = tdf.find_data_row_failures(dat)
+        self.assertTrue(len(calls) == 1 and tdf.find_data_row_failures(dat) == failures and len(calls) == 2)
+        self.assertFalse(tdf.predicate_kwargs_caching)
+        tdf.set_predicate_kwargs_caching(True)
+        self.assertTrue(tdf.clone().predicate_kwargs_caching)
+        calls[:] = []
+        for _ in range(3):
+            self.assertTrue(tdf.find_data_row_failures(dat) == failures and len(calls) == 1)
+        self.assertTrue(tdf.find_all_failures(dat).data_row_failures == failures and len(calls) == 1)
+        dat.categories["fat"]["minNutrition"] = 0
+        self.assertTrue(tdf.find_data_row_failures(dat) == failures and len(calls) == 2)
+        dat.foods["pizza"]["cost"] = 100
+        self.assertTrue(tdf.find_data_row_failures(dat)["foods", "priciest"] == ("pizza",) and len(calls) == 3)
+        frozen = tdf.freeze_me(tdf.copy_tic_dat(dat))
+        tdf.find_data_row_failures(frozen)
+        tdf.find_data_row_failures(frozen)
+        self.assertTrue(len(calls) == 4)
+        tdf.clear_predicate_kwargs_cache(frozen)
+        tdf.find_data_row_failures(frozen)
+        self.assertTrue(len(calls) == 5)
+        tdf.find_data_row_failures(tdf.copy_tic_dat(frozen))
+        self.assertTrue(len(calls) == 6)
+        not_a_tic_dat = type("NotATicDat", (), {t: getattr(dat, t) for t in tdf.all_tables})()
+        tdf.find_data_row_failures(not_a_tic_dat)
+        tdf.find_data_row_failures(not_a_tic_dat)
+        self.assertTrue(len(calls) == 8)
+
+        tdf = TicDatFactory(foods=[["name"], ["cost"]], limits="*")
+        tdf.set_predicate_kwargs_caching(True)
+        def max_cost(dat):
+            calls.append(dat)
+            return {"max_cost": dat.limits["max_cost"].min()}
+        tdf.add_data_row_predicate("foods", lambda row, max_cost: row["cost"] <= max_cost,
+                                   predicate_name="pricey", predicate_kwargs_maker=max_cost)
+        dat = tdf.TicDat(foods={"pizza": 10, "milk": 2}, limits=utils.DataFrame({"max_cost": [1, 5]}))
+        calls[:] = []
+        self.assertTrue(set(tdf.find_data_row_failures(dat)["foods", "pricey"]) == {"pizza", "milk"})
+        self.assertTrue(set(tdf.find_data_row_failures(dat)["foods", "pricey"]) == {"pizza", "milk"} and
+                        len(calls) == 1)
+        dat.limits.drop(0, inplace=True) # editing a generic table in place is an edit of the TicDat
+        self.assertTrue(tdf.find_data_row_failures(dat)["foods", "pricey"] == ("pizza",) and len(calls) == 2)
+
+    def test_remove_foreign_key_failures_cascade(self):
+        tdf = TicDatFactory(region=[["name"], []], site=[["name"], ["region", "backup"]],
+                            line=[["site", "name"], []], product=[["name"], ["site", "line"]],
+                            demand=[["product", "period"], ["qty"]], notes=[[], ["site", "text"]])
+        tdf.add_foreign_key("site", "region", ["region", "name"])
+        tdf.add_foreign_key("site", "site", ["backup", "name"])
+        tdf.add_foreign_key("line", "site", ["site", "name"])
+        tdf.add_foreign_key("product", "line", [["site", "site"], ["line", "name"]])
+        tdf.add_foreign_key("demand", "product", ["product", "name"])
+        tdf.add_foreign_key("notes", "site", ["site", "name"])
+        def make_dat():
+            return tdf.TicDat(region=["east", "west"],
+                site={"s1": ["east", "s1"], "s2": ["west", "s1"], "s3": ["north", "s2"], "s4": ["west", "s3"],
+                      "s5": ["west", "s5"]},
+                line=[["s1", "a"], ["s2", "a"], ["s4", "a"], ["s5", "a"], ["s6", "a"]],
+                product={"p1": ["s1", "a"], "p2": ["s4", "a"], "p3": ["s5", "b"], "p4": ["s5", "a"]},
+                demand={(p, t): 1 for p in ["p1", "p2", "p3", "p4", "p5"] for t in range(3)},
+                notes=[["s1", "x"], ["s4", "y"], ["s9", "z"]])
+        dat = make_dat()
+        while tdf.find_foreign_key_failures(dat): # the cascade done the slow way
+            tdf.remove_foreign_key_failures(dat, propagate=False)
+        dat_2 = tdf.remove_foreign_key_failures(make_dat())
+        self.assertTrue(tdf._same_data(dat, dat_2) and not tdf.find_foreign_key_failures(dat_2))
+        self.assertTrue(set(dat_2.site) == {"s1", "s2", "s5"} and set(dat_2.product) == {"p1", "p4"})
+        self.assertTrue(len(dat_2.notes) == 1 and
+                        set(dat_2.demand) == {(p, t) for p in ["p1", "p4"] for t in range(3)})
+        dat_3 = tdf.remove_foreign_key_failures(make_dat(), propagate=False)
+        self.assertTrue(set(dat_3.site) == {"s1", "s2", "s4", "s5"} and set(dat_3.product) == {"p1", "p2", "p4"})
+
+
+def _costs_less_than(row, bound): # module level so as to be picklable for test_data_row_predicates_with_executor
+    return row["cost"] < bound
+
+def _cost_bound(dat):
+    _cost_bound.calls.append(dat)
+    return {"bound": 2.5}
 
 _scratchDir = TestUtils.__name__ + "_scratch"
 
@@ -9,7 +9,7 @@ from ticdat.utils import verify, freezable_factory, FrozenDict, FreezeableDict
 from ticdat.utils import dictish, containerish, deep_freeze, lupish, safe_apply
 from ticdat.utils import ForeignKey, ForeignKeyMapping, TypeDictionary, RowPredicateInfo
 from string import ascii_uppercase as uppercase
-from itertools import count
+from itertools import count, chain
 import ticdat.xls as xls
 import ticdat.csvtd as csv
 import ticdat.sqlitetd as sql
@@ -18,6 +18,7 @@ import ticdat.jsontd as json
 from ticdat.pgtd import PostgresTicFactory
 import sys
 import math
+import heapq
 try:
     import amplpy
 except:
@@ -25,6 +26,11 @@ except:
 
 pd, DataFrame = utils.pd, utils.DataFrame # if pandas not installed will be falsey
 
+# the compiled check of a foreign key. native_look_up maps a native row to the value to look for in the foreign
+# table (when foreign_is_pk) or in the set of the foreign_fields values of the foreign rows (otherwise)
+_ForeignKeyPlan = namedtuple("_ForeignKeyPlan", ("native_fields", "foreign_fields", "foreign_is_pk",
+                             "native_look_up", "native_values", "native_values_from_lookup"))
+
 def _keylen(k) :
     if not utils.containerish(k) :
         return 1
@@ -144,6 +150,12 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
     def generator_tables(self):
         return deep_freeze(self._generator_tables)
     @property
+    def columnar_tables(self):
+        return deep_freeze(self._columnar_tables)
+    @property
+    def indexes(self):
+        return deep_freeze(self._indexes)
+    @property
     def default_values(self):
         return deep_freeze(self._default_values)
     @property
@@ -204,6 +216,7 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                                                                      min, max, must_be_int, strings_allowed, nullable,
                                                                      datetime)
         self._none_as_infinity_bias_cache.clear()
+        self._data_type_checks.clear()
 
     def clear_data_type(self, table, field):
         """
@@ -223,6 +236,7 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                "The data types can't be changed after a TicDatFactory has been used.")
         del(self._data_types[table][field])
         self._none_as_infinity_bias_cache.clear()
+        self._data_type_checks.clear()
 
     def add_data_row_predicate(self, table, predicate, predicate_name=None,
                                predicate_kwargs_maker=None,
@@ -399,6 +413,60 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         verify(not any(self.primary_key_fields.get(t) for t in g),
                "Can not make generators from tables with primary keys")
         self._generator_tables[:] = [_ for _ in g]
+    def set_columnar_tables(self, c):
+        """
+        sets which tables are to be columnar tables. Columnar tables store one key index and one column per data
+        field, instead of one Python object per row. The columns are numpy arrays for data fields whose data type
+        excludes strings, None and datetime (and are otherwise lists). Columnar tables are appropriate for very
+        large tables with primary keys.
+
+        Columnar tables support the familiar dat.table[pk]["field"] access and iteration, although the rows
+        are lightweight views over the columns. A row view can't be used once its row has been removed or
+        replaced (doing so raises a TicDatError). In addition, dat.table.column("field") returns all the
+        values for a field (primary key or data field) without creating per-row Python objects.
+
+        Columnar tables do not participate in foreign key links (see enable_foreign_key_links).
+
+        :param c: An iterable of table names.
+
+        :return:
+        """
+        verify(not self._has_been_used,
+               "The columnar tables can't be changed after a TicDatFactory has been used.")
+        verify(containerish(c) and set(c).issubset(self.all_tables),
+               "columnar_tables should be a container of table names")
+        verify(not set(c).intersection(set(self.generic_tables).union(self.generator_tables)),
+               "Columnar tables cannot refer to generic tables or generator tables.")
+        verify(all(self.primary_key_fields.get(t) for t in c),
+               "Columnar tables need to have primary key fields")
+        self._columnar_tables[:] = [_ for _ in c]
+    def add_index(self, table, fields):
+        """
+        Adds a hash index to a table. The TicDat objects created by this factory will keep the index current as
+        rows are added, edited and removed, and dat.table.lookup(field=value, ...) will return the matching rows
+        in time proportional to the number of matches. For example, after tdf.add_index("arcs", ["source"]),
+        dat.arcs.lookup(source="Detroit") returns a dictionary of primary key to row for the arcs out of Detroit.
+
+        :param table: A table with primary key fields. Can't be a generator table or a generic table.
+
+        :param fields: A container of primary key fields and/or data fields of table. The values of these fields
+                       need to be hashable.
+
+        :return:
+        """
+        verify(not self._has_been_used,
+               "The indexes can't be changed after a TicDatFactory has been used.")
+        verify(table in self.all_tables, "%s is not a table name"%table)
+        verify(table not in set(self.generic_tables).union(self.generator_tables),
+               "%s is a generic table or a generator table"%table)
+        verify(self.primary_key_fields.get(table), "%s has no primary key fields"%table)
+        verify(containerish(fields) and not utils.stringish(fields) and fields,
+               "fields should be a non empty container of field names")
+        all_fields = self.primary_key_fields[table] + self.data_fields.get(table, ())
+        verify(set(fields).issubset(all_fields) and len(set(fields)) == len(fields),
+               "fields should be distinct field names for %s"%table)
+        if set(fields) not in [set(_) for _ in self._indexes.get(table, ())]:
+            self._indexes.setdefault(table, []).append(tuple(fields))
     def clear_foreign_keys(self, native_table = None):
         """
         create a TicDatFactory
@@ -622,53 +690,185 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         self._data_types = clt.defaultdict(dict)
         self._data_row_predicates = clt.defaultdict(dict)
         self._generator_tables = []
+        self._columnar_tables = []
+        self._indexes = {}
         self._foreign_keys = clt.defaultdict(set)
         self.all_tables = frozenset(init_fields)
         # using list for truthiness to work around freezing headaches
         self._foreign_key_links_enabled = []
 
-        datarowfactory = lambda t :  utils.td_row_factory(t, self.primary_key_fields.get(t, ()),
-                        self.data_fields.get(t, ()), self.default_values.get(t, {}))
+        self._row_classes = {}
+        self._keyless_factories = {}
+        def datarowfactory(t):
+            # the foreign key link names are fixed once we've been used, so the row classes can be cached
+            self._trigger_has_been_used()
+            links_enabled = bool(self._foreign_key_links_enabled)
+            if (t, links_enabled) not in self._row_classes:
+                link_names = {v for (_, ft, __), v in self._linkName.items() if ft == t} if links_enabled else ()
+                self._row_classes[t, links_enabled] = utils.td_row_factory(t, self.primary_key_fields.get(t, ()),
+                        self.data_fields.get(t, ()), self.default_values.get(t, {}), link_names)
+            return self._row_classes[t, links_enabled]
 
         goodticdattable = self._good_tic_dat_table_for_init
         superself = self
-        def ticdattablefactory(alldatadicts, tablename, primarykey = (), rowfactory_ = None) :
+        self._table_classes = {}
+        def ticdattablefactory(tablename, primarykey = (), rowfactory_ = None) :
+            # the table classes are cached, so that making lots of small TicDat objects is cheap
+            cache_key = (tablename, tuple(primarykey), rowfactory_ is not None, bool(self._foreign_key_links_enabled))
+            if cache_key not in self._table_classes:
+                self._table_classes[cache_key] = maketicdattable(tablename, primarykey, rowfactory_)
+            return self._table_classes[cache_key]
+        def maketicdattable(tablename, primarykey, rowfactory_) :
             assert tablename not in self.generic_tables
             assert containerish(primarykey)
+            if tablename in self.columnar_tables and not primarykey:
+                return utils.td_columnar_table_factory(tablename, self.primary_key_fields[tablename],
+                            self.data_fields.get(tablename, ()), self.default_values.get(tablename, {}),
+                            self.data_types.get(tablename, {}), self._indexes.get(tablename, ()))
             primarykey = primarykey or  self.primary_key_fields.get(tablename, ())
             keylen = len(primarykey)
             rowfactory = rowfactory_ or datarowfactory(tablename)
+            # the TicDatDataRow rows share the freeze state of their table
+            row_class = rowfactory if isinstance(rowfactory, type) else None
+            makerow = (lambda v, state, key=None : row_class(v, state, key)) if row_class else \
+                      (lambda v, state, key=None : rowfactory(v))
+            index_fields = () if rowfactory_ else self._indexes.get(tablename, ())
             if keylen > 0 :
                 class TicDatDict (FreezeableDict) :
+                    _row_class = row_class
+                    _state = None
+                    _indexes = None
                     def __init__(self, *_args, **_kwargs):
-                        super(TicDatDict, self).__init__(*_args, **_kwargs)
-                        alldatadicts.append(self)
+                        super(TicDatDict, self).__init__()
+                        if not rowfactory_: # the foreign key link dicts hold the rows of other tables
+                            self._state = utils.TableState()
+                            if index_fields:
+                                self._indexes = utils.TableIndexes(primarykey, index_fields)
+                                self._state.listeners += (self._indexes,)
+                        if _args or _kwargs:
+                            self.update(*_args, **_kwargs)
+                    def __reduce_ex__(self, protocol):
+                        # a copy restores the rows directly, since the copied listeners already know about them
+                        return self.__class__, (), (dict(self.__dict__), dict(self))
+                    def __setstate__(self, state):
+                        attributes, rows = state
+                        dict.update(self, rows)
+                        self.__dict__.update(attributes)
+                    def _edited(self):
+                        if self._state:
+                            self._state.version += 1
+                    def _removing(self, key, replacement=None):
+                        if self._state and key in self:
+                            row = super(TicDatDict, self).__getitem__(key)
+                            for listener in self._state.listeners:
+                                listener.row_removed(key, row)
+                            if row.__class__ is self._row_class and row is not replacement:
+                                # the row leaves the table, and so its later edits should notify nobody
+                                row._detach()
+                    def _added(self, key):
+                        if self._state and self._state.listeners:
+                            row = super(TicDatDict, self).__getitem__(key)
+                            for listener in self._state.listeners:
+                                listener.row_added(key, row)
                     def __setitem__(self, key, value):
                         verify(containerish(key) ==  (keylen > 1) and
                                (keylen == 1 or keylen == len(key)),
                                "inconsistent key length for %s"%tablename)
-                        return super(TicDatDict, self).__setitem__(key, rowfactory(value))
+                        verify(not getattr(self, "_dataFrozen", False), "Can't edit a frozen TicDatDict")
+                        row = makerow(value, self._state, key)
+                        self._removing(key)
+                        rtn = super(TicDatDict, self).__setitem__(key, row)
+                        self._added(key)
+                        self._edited()
+                        return rtn
                     def __getitem__(self, item):
                         if (item not in self) and (not getattr(self, "_dataFrozen", False)):
-                            self[item] = rowfactory({})
+                            self[item] = {}
                         return super(TicDatDict, self).__getitem__(item)
+                    def __delitem__(self, key):
+                        verify(not getattr(self, "_dataFrozen", False), "Can't edit a frozen TicDatDict")
+                        self._removing(key)
+                        super(TicDatDict, self).__delitem__(key)
+                        self._edited()
+                    def pop(self, *args, **kwargs):
+                        verify(not getattr(self, "_dataFrozen", False), "Can't edit a frozen TicDatDict")
+                        if args:
+                            self._removing(args[0])
+                        rtn = super(TicDatDict, self).pop(*args, **kwargs)
+                        self._edited()
+                        return rtn
+                    def popitem(self):
+                        verify(not getattr(self, "_dataFrozen", False), "Can't edit a frozen TicDatDict")
+                        rtn = super(TicDatDict, self).popitem()
+                        if self._state:
+                            for listener in self._state.listeners:
+                                listener.row_removed(*rtn)
+                            if rtn[1].__class__ is self._row_class:
+                                rtn[1]._detach()
+                        self._edited()
+                        return rtn
+                    def update(self, *args, **kwargs):
+                        # the bulk loaders pass in rows that already share this table's state
+                        if not (self._state and (self._state.listeners or len(self))):
+                            super(TicDatDict, self).update(*args, **kwargs)
+                        else:
+                            verify(not getattr(self, "_dataFrozen", False), "Can't edit a frozen TicDatDict")
+                            added = dict(*args, **kwargs)
+                            for k, v in added.items():
+                                self._removing(k, v)
+                            super(TicDatDict, self).update(added)
+                            for k in added:
+                                self._added(k)
+                        self._edited()
+                    def setdefault(self, key, default=None):
+                        if key not in self:
+                            self[key] = {} if default is None else default
+                        return self[key]
+                    def clear(self):
+                        verify(not getattr(self, "_dataFrozen", False), "Can't edit a frozen TicDatDict")
+                        if self._state:
+                            for k in list(self):
+                                self._removing(k)
+                        super(TicDatDict, self).clear()
+                        self._edited()
+                    def lookup(self, **field_values):
+                        """
+                        :param field_values: the values of the fields of an index added with add_index
+                        :return: a dictionary of primary key to row for the rows with these field values
+                        """
+                        verify(self._indexes, "%s has no indexes. Use add_index to declare one."%tablename)
+                        return {k: self[k] for k in self._indexes.lookup(tablename, field_values)}
                 assert dictish(TicDatDict)
                 return TicDatDict
             class TicDatDataList(clt.abc.MutableSequence):
+                _row_class = row_class
                 def __init__(self, *_args):
+                    self._state = utils.TableState()
                     self._list = list()
                     self.extend(list(_args))
                 def __len__(self): return len(self._list)
                 def __getitem__(self, i): return self._list[i]
-                def __delitem__(self, i): del self._list[i]
+                def __delitem__(self, i):
+                    del self._list[i]
+                    self._state.version += 1
                 def __setitem__(self, i, v):
-                    self._list[i] = rowfactory(v)
+                    self._list[i] = makerow(v, self._state)
+                    self._state.version += 1
                 def insert(self, i, v):
-                    self._list.insert(i, rowfactory(v))
+                    self._list.insert(i, makerow(v, self._state))
+                    self._state.version += 1
                 def __repr__(self):
                     return "td:" + self._list.__repr__()
             assert containerish(TicDatDataList) and not dictish(TicDatDataList)
             return TicDatDataList
+        def tablerowfactory(table, tablename):
+            # the rows bulk loaded into a table need to share the table's state
+            if tablename in self.columnar_tables:
+                return lambda x, key=None : x
+            if table._row_class:
+                return lambda x, key=None : table._row_class(x, table._state, key)
+            drf = datarowfactory(tablename)
+            return lambda x, key=None : drf(x)
         def generatorfactory(data, tablename) :
             assert tablename in self.generator_tables
             drf = datarowfactory(tablename)
@@ -682,8 +882,14 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                     return
                 for t in set(superself.all_tables).difference(superself.generic_tables):
                     _t = getattr(self, t)
-                    if utils.dictish(_t) or utils.containerish(_t) :
-                        for v in getattr(_t, "values", lambda : _t)() :
+                    if isinstance(_t, utils.ColumnarTicDatDict):
+                        _t._dataFrozen  = True
+                        _t._attributesFrozen = True
+                    elif utils.dictish(_t) or utils.containerish(_t) :
+                        row_class = getattr(_t, "_row_class", None)
+                        if row_class : # the TicDatDataRow rows share the freeze state of their table
+                            _t._state.frozen = True
+                        for v in getattr(_t, "values", lambda : _t)() if not row_class else ():
                             if not getattr(v, "_dataFrozen", False) :
                                 v._dataFrozen =True
                                 v._attributesFrozen = True
@@ -712,9 +918,61 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                 return {t: l for t in superself.all_tables for l in [len(getattr(self, t))] if l}
             def _generatorfactory(self, data, tableName):
                 return generatorfactory(data, tableName)
+            @classmethod
+            def from_columns(cls, **tables):
+                '''
+                Bulk constructor for trusted data, such as the data read by the built-in readers. Only the table
+                names, field names and column lengths are verified. The rows themselves are not, so use
+                TicDat(**tables) for data from elsewhere.
+
+                :param tables: each table is a dictionary mapping each of its fields (primary key fields and
+                               data fields) to a sequence of values. Generic tables can be anything the DataFrame
+                               constructor accepts, and generator tables can also be a function returning an
+                               iterable of rows. Rows that repeat a primary key overwrite the earlier rows.
+
+                :return: a TicDat object.
+                '''
+                rtn = cls()
+                for t, columns in tables.items():
+                    verify(t in superself.all_tables, "Unexpected table name %s"%t)
+                    if t in superself.generic_tables:
+                        setattr(rtn, t, DataFrame(columns))
+                        continue
+                    if t in superself.generator_tables and callable(columns):
+                        setattr(rtn, t, generatorfactory(columns, t))
+                        continue
+                    pks = superself.primary_key_fields.get(t, ())
+                    dfs = superself.data_fields.get(t, ())
+                    verify(utils.dictish(columns) and set(columns) == set(pks + dfs),
+                           "The columns for %s should be its fields %s"%(t, pks + dfs))
+                    verify(len({len(columns[f]) for f in pks + dfs}) <= 1, "Inconsistent column lengths for %s"%t)
+                    keys = zip(*(columns[f] for f in pks)) if len(pks) > 1 else (columns[pks[0]] if pks else ())
+                    table = getattr(rtn, t)
+                    if t in superself.generator_tables:
+                        setattr(rtn, t, generatorfactory(list(zip(*(columns[f] for f in dfs))), t))
+                    elif t in superself.columnar_tables:
+                        table._load_columns(keys, [columns[f] for f in dfs])
+                    elif not dfs:
+                        drf = datarowfactory(t)
+                        table.update((k, drf()) for k in keys)
+                    else:
+                        drf, state = table._row_class._from_values, table._state
+                        if pks:
+                            values = zip(*(columns[f] for f in dfs))
+                            table.update((k, drf(v, state, k)) for k, v in zip(keys, values))
+                        else:
+                            table._list.extend(drf(v, state) for v in zip(*(columns[f] for f in dfs)))
+                if tables:
+                    rtn._try_make_foreign_links()
+                return rtn
             def __init__(self, **init_tables):
                 superself._trigger_has_been_used()
-                self._all_data_dicts = []
+                # the good_tic_dat_object results, along with the table versions they depend on
+                self._good_object_signatures = {}
+                # the ForeignKeyFailureTracker for each foreign key, when incremental_foreign_key_checks
+                self._foreign_key_failure_trackers = {}
+                # the predicate_kwargs_maker results, along with the table versions they depend on
+                self._predicate_kwargs_results = {}
                 self._made_foreign_links = False
                 lens = {t: l for t, v in init_tables.items() for l in [utils.safe_apply(len)(v)] if l is not None}
                 for t in init_tables :
@@ -732,19 +990,19 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                         v.rename(columns = {v.columns[0] : superself.data_fields[t][0]}, inplace=True)
                     if DataFrame and isinstance(v, DataFrame):
                       apply = utils.faster_df_apply
-                      setattr(self, t, ticdattablefactory(self._all_data_dicts, t)())
-                      _rd_ = lambda row_dict: {k: row_dict[k] for k in superself.data_fields.get(t, [])}
-                      if superself.primary_key_fields.get(t):
-                          if not set(superself.primary_key_fields[t]).issubset(v.columns):
+                      setattr(self, t, ticdattablefactory(t)())
+                      pks, dfs = superself.primary_key_fields.get(t, ()), superself.data_fields.get(t, ())
+                      # the rows are passed as (primary key values + data values) tuples, avoiding a dict per row
+                      if pks:
+                          if not set(pks).issubset(v.columns):
                               v = v.reset_index(drop=False)
-                          key_maker = (lambda rd: rd[superself.primary_key_fields[t][0]]) \
-                                      if len(superself.primary_key_fields[t]) == 1 else  \
-                                      (lambda rd: tuple(rd[_] for _ in superself.primary_key_fields[t]))
-                          def add_row(row_dict):
-                              getattr(self, t)[key_maker(row_dict)] = _rd_(row_dict)
-                          apply(v, add_row)
+                          table, npks = getattr(self, t), len(pks)
+                          def add_row(row):
+                              table[row[0] if npks == 1 else row[:npks]] = row[npks:]
+                          apply(v, add_row, fields=pks + dfs, row_type="tuple")
                       else :
-                          apply(v, lambda row_dict: getattr(self, t).append(_rd_(row_dict)))
+                          apply(v, lambda row: getattr(self, t).append(dict(zip(dfs, row))), fields=dfs,
+                                row_type="tuple")
                     elif superself.primary_key_fields.get(t) and not utils.dictish(v):
                          pklen = len(superself.primary_key_fields[t])
                          def handle_row_dict(r):
@@ -752,26 +1010,28 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                                  return r
                              return [r.get(k, 0) for k in superself.primary_key_fields[t] +
                                       superself.data_fields.get(t,[])]
-                         drf = datarowfactory(t) # lots of verification inside the datarowfactory
-                         setattr(self, t, ticdattablefactory(self._all_data_dicts, t)(
-                             {r if not utils.containerish(r) else
-                              (r[0] if pklen == 1 else tuple(r[:pklen])):
-                              drf([] if not utils.containerish(r) else r[pklen:])
-                              for _r in v for r in [handle_row_dict(_r)]}
-                         ))
+                         setattr(self, t, ticdattablefactory(t)())
+                         drf = tablerowfactory(getattr(self, t), t)
+                         getattr(self, t).update(
+                             {k : drf([] if not utils.containerish(r) else r[pklen:], k)
+                              for _r in v for r in [handle_row_dict(_r)]
+                              for k in [r if not utils.containerish(r) else
+                                        (r[0] if pklen == 1 else tuple(r[:pklen]))]}
+                         )
                     elif superself.primary_key_fields.get(t) :
                      for _k in v :
                         verify((hasattr(_k, "__len__") and
                                 (len(_k) == len(superself.primary_key_fields.get(t, ())) > 1)
                                 or len(superself.primary_key_fields.get(t, ())) == 1),
                            "Unexpected number of primary key fields for %s"%t)
-                     drf = datarowfactory(t) # lots of verification inside the datarowfactory
-                     setattr(self, t, ticdattablefactory(self._all_data_dicts, t)(
-                                    {_k : drf(v[_k] if utils.dictish(v) else ()) for _k in v}))
+                     # lots of verification inside the datarowfactory (or the columnar table)
+                     setattr(self, t, ticdattablefactory(t)())
+                     drf = tablerowfactory(getattr(self, t), t)
+                     getattr(self, t).update({_k : drf(v[_k] if utils.dictish(v) else (), _k) for _k in v})
                     elif t in superself.generator_tables :
                         setattr(self, t, generatorfactory(v, t))
                     else :
-                        setattr(self, t, ticdattablefactory(self._all_data_dicts, t)(*v))
+                        setattr(self, t, ticdattablefactory(t)(*v))
                 for t in set(superself.all_tables).difference(init_tables) :
                     if t in superself.generator_tables :
                         # a calleable that returns an empty generator
@@ -779,7 +1039,7 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                     elif t in superself.generic_tables:
                         setattr(self, t, DataFrame())
                     else :
-                        setattr(self, t, ticdattablefactory(self._all_data_dicts, t)())
+                        setattr(self, t, ticdattablefactory(t)())
                 if init_tables :
                     self._try_make_foreign_links()
                 if any(v > (l or 0) for k, v in lens.items() for l in [utils.safe_apply(len)(getattr(self, k))]):
@@ -792,6 +1052,7 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                 assert not self._made_foreign_links, "call once"
                 self._made_foreign_links = True
                 can_link_w_me = lambda t : t not in superself.generator_tables and \
+                                           t not in superself.columnar_tables and \
                                            superself.primary_key_fields.get(t)
                 for fk in superself.foreign_keys :
                     t = fk.native_table
@@ -816,28 +1077,26 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                                              for x in foreign_pk}
                             unused_local_posn = {i for i,_ in enumerate(tablefields) if i not in
                                                     local_posn.values()}
-                            if not appendage_fk :
-                                new_pk = tuple(x for x in local_pk if x not in nativefields)
-                                new_data_dct = ticdattablefactory(self._all_data_dicts, linkname,
-                                                new_pk, lambda x : x)
-                                for row in ft.values() :
-                                    setattr(row, linkname, new_data_dct())
-                            for key,row in getattr(self, t).items() :
+                            native_pk_posn = tuple(i for i in sorted(unused_local_posn) if i < len(local_pk))
+                            def link_keys(key, row, edited_field=None, old_value=None,
+                                          data_fields=superself.data_fields[t], local_posn=local_posn,
+                                          foreign_pk=foreign_pk, native_pk_posn=native_pk_posn):
                                 keyrow = ((key,) if not containerish(key) else key) + \
-                                         tuple(row[x] for x in superself.data_fields[t])
+                                         tuple(old_value if x == edited_field else row[x] for x in data_fields)
                                 lookup = tuple(keyrow[local_posn[x]] for x in foreign_pk)
-                                linkrow = ft.get(lookup[0] if len(lookup) ==1 else lookup, None)
-                                if linkrow is not None :
-                                    if appendage_fk :
-                                        # the attribute is simply a reference to the mapping table
-                                        assert not hasattr(linkrow, linkname)
-                                        setattr(linkrow, linkname,row)
-                                    else :
-                                        _key = keyrow[:-len(row)] if row else keyrow
-                                        _key = tuple(x for i,x in enumerate(_key)
-                                                     if i in unused_local_posn)
-                                        getattr(linkrow, linkname)\
-                                            [_key[0] if len(_key) == 1 else _key] = row
+                                _key = tuple(keyrow[i] for i in native_pk_posn)
+                                return (lookup[0] if len(lookup) == 1 else lookup,
+                                        _key[0] if len(_key) == 1 else _key)
+                            # the links are kept current as rows are added to and removed from both tables
+                            links = utils.ForeignKeyLinks(linkname, ft, set(nativefields), link_keys,
+                                None if appendage_fk else ticdattablefactory(linkname,
+                                    tuple(x for x in local_pk if x not in nativefields), lambda x : x))
+                            for key, row in ft.items():
+                                links.foreign_listener.row_added(key, row)
+                            for key, row in getattr(self, t).items():
+                                links.native_listener.row_added(key, row)
+                            ft._state.listeners += (links.foreign_listener,)
+                            getattr(self, t)._state.listeners += (links.native_listener,)
 
         self.TicDat = TicDat
         self.xls = xls.XlsTicFactory(self)
@@ -850,6 +1109,10 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         self._parameters = {}
         self._infinity_io_flag = ["N/A"]
         self._xlsx_trailing_empty_rows = ["prune"]
+        self._incremental_foreign_key_checks = [False]
+        self._predicate_kwargs_caching = [False]
+        self._foreign_key_plans = {}
+        self._data_type_checks = {}
         self._none_as_infinity_bias_cache = {}
         self._isFrozen=True
 
@@ -873,6 +1136,63 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         verify(value in ["prune", "ignore"], f"bad value {value}")
         self._xlsx_trailing_empty_rows[0] = value
 
+    @property
+    def incremental_foreign_key_checks(self):
+        """
+        see __doc__ for set_incremental_foreign_key_checks
+        """
+        return self._incremental_foreign_key_checks[0]
+    def set_incremental_foreign_key_checks(self, value):
+        """
+        Set the incremental_foreign_key_checks for the TicDatFactory. When True, the first find_foreign_key_failures
+        call for a TicDat object reference counts the foreign key values of its rows. Subsequent calls recheck only
+        the rows added, removed or edited since the previous call. The results are the same as the full scan done
+        when False (the default), but the reference counts use memory proportional to the number of rows.
+
+        Foreign keys involving a table with no primary key fields, or a generator table, are always fully scanned.
+        :param value: boolean
+        :return:
+        """
+        verify(value in [True, False], "value should be a boolean")
+        self._incremental_foreign_key_checks[0] = value
+
+    @property
+    def predicate_kwargs_caching(self):
+        """
+        see __doc__ for set_predicate_kwargs_caching
+        """
+        return self._predicate_kwargs_caching[0]
+    def set_predicate_kwargs_caching(self, value):
+        """
+        Set the predicate_kwargs_caching for the TicDatFactory. When True, the dict returned by a
+        predicate_kwargs_maker (see add_data_row_predicate) is remembered by the TicDat object it was computed for,
+        and find_data_row_failures reuses it until one of the tables of that TicDat is edited. This is useful when
+        a predicate_kwargs_maker is expensive and the same (typically frozen) TicDat is validated repeatedly.
+
+        Only the results of predicate_kwargs_maker functions that succeed in returning a dict are remembered.
+        Use clear_predicate_kwargs_cache if a predicate_kwargs_maker depends on anything other than its dat argument.
+        :param value: boolean
+        :return:
+        """
+        verify(value in [True, False], "value should be a boolean")
+        self._predicate_kwargs_caching[0] = value
+    def clear_predicate_kwargs_cache(self, tic_dat):
+        """
+        Forget the predicate_kwargs_maker results remembered for a TicDat object.
+        See set_predicate_kwargs_caching for more details.
+        :param tic_dat: a TicDat object
+        :return:
+        """
+        verify(isinstance(tic_dat, self.TicDat), "tic_dat should be a TicDat object created by this factory")
+        tic_dat._predicate_kwargs_results.clear()
+    def _predicate_kwargs_cache(self, tic_dat):
+        # the remembered predicate_kwargs_maker results for tic_dat, along with its current signature
+        # (or None if they can't be remembered)
+        if not (self.predicate_kwargs_caching and isinstance(tic_dat, self.TicDat)):
+            return None
+        signature = self._tic_dat_object_signature(tic_dat)
+        return (tic_dat._predicate_kwargs_results, signature) if signature else None
+
     @property
     def infinity_io_flag(self):
         """
@@ -935,6 +1255,34 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         if x is None and self.infinity_io_flag is None and utils.numericish(self._none_as_infinity_bias(t, f)):
             return float("inf") * self._none_as_infinity_bias(t, f)
         return x
+    def _general_read_cell_function(self, t, f):
+        '''
+        we expect other routines inside ticdat to access this routine, even though it starts with _
+        :param t: table name
+        :param f: field name
+        :return: a function equivalent to lambda x : self._general_read_cell(t, f, x), with the table and field
+                 specific checks resolved up front. Useful when reading many cells from the same field.
+        '''
+        assert t in self.all_tables
+        if t == "parameters":
+            return lambda x: x
+        if self._data_types.get(t, {}).get(f) and self._data_types[t][f].datetime:
+            return lambda x: self._general_read_cell(t, f, x)
+        flag, bias = self.infinity_io_flag, self._none_as_infinity_bias(t, f)
+        if utils.numericish(flag):
+            def rtn(x):
+                # the class checks short circuit numericish for the common cases of float, int and str cells
+                if x.__class__ in (float, int) or (x.__class__ is not str and utils.numericish(x)):
+                    if x >= flag:
+                        return float("inf")
+                    if x <= -flag:
+                        return float("-inf")
+                return x
+            return rtn
+        if flag is None and utils.numericish(bias):
+            none_value = float("inf") * bias
+            return lambda x: none_value if x is None else x
+        return lambda x: x
     def _infinity_flag_write_cell(self, t, f, x):
         """
         we expect other routines inside ticdat to access this routine, even though it starts with _
@@ -951,6 +1299,28 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         if utils.numericish(self.infinity_io_flag) and utils.numericish(x):
             return max(min(x, self.infinity_io_flag), -self.infinity_io_flag)
         return x
+    def _infinity_flag_write_cell_function(self, t, f):
+        """
+        we expect other routines inside ticdat to access this routine, even though it starts with _
+        :param t: table name
+        :param f: field name
+        :return: a function equivalent to lambda x : self._infinity_flag_write_cell(t, f, x), with the table and
+                 field specific checks resolved up front. Useful when writing many cells from the same field.
+        """
+        assert t in self.all_tables
+        if t == "parameters" and self._parameters:
+            return lambda x: self._infinity_flag_write_cell(t, f, x)
+        flag = self.infinity_io_flag
+        if flag is None and self._none_as_infinity_bias(t, f):
+            none_value = float("inf") * self._none_as_infinity_bias(t, f)
+            return lambda x: None if none_value == x else x
+        if utils.numericish(flag):
+            def rtn(x):
+                if x.__class__ in (float, int) or (x.__class__ is not str and utils.numericish(x)):
+                    return max(min(x, flag), -flag)
+                return x
+            return rtn
+        return lambda x: x
     def _none_as_infinity_bias(self, t, f):
         if self.infinity_io_flag is not None:
             return None
@@ -1015,6 +1385,46 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
 
         :return: True if the dataObj can be converted to a TicDat data object. False otherwise.
         """
+        signature = self._tic_dat_object_signature(data_obj)
+        good_signature = data_obj._good_object_signatures.get(row_checking, (None,))[0] if signature else None
+        if signature and good_signature == signature[0]:
+            return True
+        # only the tables that have been edited since the last good check need their rows checked again
+        unedited = {t for t, old, new in zip(sorted(self.all_tables), good_signature, signature[0])
+                    if old == new} if good_signature else set()
+        rtn = self._good_tic_dat_object(data_obj, bad_message_handler, row_checking, unedited)
+        if rtn and signature:
+            data_obj._good_object_signatures[row_checking] = signature
+        return rtn
+    def _tic_dat_object_signature(self, data_obj):
+        # the version of every table of one of our own TicDat objects, or None if one of the tables can't tell us
+        # when it has been edited. Also returns the objects whose ids are in the signature, to keep the ids valid.
+        if not isinstance(data_obj, self.TicDat):
+            return None
+        signature, objects = [], []
+        for t in sorted(self.all_tables):
+            table = getattr(data_obj, t, None)
+            state = getattr(table, "_state", None)
+            if state:
+                signature.append((id(state), state.version))
+                objects.append(state)
+            elif DataFrame and isinstance(table, DataFrame):
+                # a generic table can be edited in place, so it's signed by its contents, as PanDat tables are
+                try:
+                    hashed = int(pd.util.hash_pandas_object(table, index=True).sum())
+                except TypeError: # unhashable cells, such as lists
+                    return None
+                signature.append((id(table), (tuple(table.columns), tuple(map(str, table.dtypes)), len(table),
+                                              hashed)))
+                objects.append(table)
+            elif callable(table) or (isinstance(table, tuple) and data_obj._isFrozen):
+                # generator functions and frozen keyless tables can't be edited
+                signature.append((id(table), None))
+                objects.append(table)
+            else:
+                return None
+        return tuple(signature), objects
+    def _good_tic_dat_object(self, data_obj, bad_message_handler, row_checking, unedited_tables=()):
         rtn = True
         for t in self.all_tables:
             if not hasattr(data_obj, t) :
@@ -1032,8 +1442,8 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
             elif t in self.generic_tables:
                     bad_message_handler("Strangely, you have generic tables but not pandas")
                     return False
-            rtn = rtn and  self.good_tic_dat_table(getattr(data_obj, t), t,
-                    lambda x : bad_message_handler(t + " : " + x), row_checking)
+            rtn = rtn and (t in unedited_tables or self.good_tic_dat_table(getattr(data_obj, t), t,
+                    lambda x : bad_message_handler(t + " : " + x), row_checking))
         return rtn
 
     def _good_tic_dat_table_for_init(self, data_table, table_name,
@@ -1042,8 +1452,10 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                  and not dictish(data_table) and not utils.stringish(data_table) \
                  and not (utils.DataFrame and isinstance(data_table, utils.DataFrame)) \
                  and not (pd and isinstance(data_table, pd.Series)):
-             tdf = TicDatFactory(**{table_name:[[], list(self.primary_key_fields[table_name]) +
-                                                    list(self.data_fields.get(table_name, []))]})
+             if table_name not in self._keyless_factories:
+                 self._keyless_factories[table_name] = TicDatFactory(**{table_name:[[],
+                            list(self.primary_key_fields[table_name]) + list(self.data_fields.get(table_name, []))]})
+             tdf = self._keyless_factories[table_name]
              return tdf.good_tic_dat_table(data_table, table_name, bad_message_handler)
          return self.good_tic_dat_table(data_table, table_name, bad_message_handler)
 
@@ -1259,6 +1671,16 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         rtn = clone_factory(full_schema)
         if hasattr(rtn, "set_generator_tables"):
             rtn.set_generator_tables(self.generator_tables)
+        if hasattr(rtn, "set_columnar_tables"):
+            rtn.set_columnar_tables([t for t in self.columnar_tables if t in rtn.all_tables])
+        if hasattr(rtn, "set_incremental_foreign_key_checks"):
+            rtn.set_incremental_foreign_key_checks(self.incremental_foreign_key_checks)
+        if hasattr(rtn, "set_predicate_kwargs_caching"):
+            rtn.set_predicate_kwargs_caching(self.predicate_kwargs_caching)
+        if hasattr(rtn, "add_index"):
+            for t, index_fields in self.indexes.items():
+                for fields in index_fields if t in rtn.all_tables else ():
+                    rtn.add_index(t, fields)
         for tbl, row_predicates in self._data_row_predicates.items():
             if table_restrictions is None or tbl in table_restrictions:
                 for pn, rpi in row_predicates.items():
@@ -1467,6 +1889,14 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
             elif len(tdtable) == 0 :
                 df = DataFrame([], columns = self.primary_key_fields.get(tname,tuple()) +
                                                 self.data_fields.get(tname, tuple()))
+            elif isinstance(tdtable, utils.ColumnarTicDatDict):
+                pks = self.primary_key_fields[tname]
+                dfs = self.data_fields.get(tname, tuple())
+                df = DataFrame({f: tdtable.column(f) for f in pks + dfs}, columns=pks + dfs)
+                if not reset_index:
+                    df.set_index(list(pks), inplace=True,
+                             drop= bool(dfs if drop_pk_columns == None else drop_pk_columns))
+                utils.Sloc.add_sloc(df)
             elif dictish(tdtable):
                 pks = self.primary_key_fields[tname]
                 dfs = self.data_fields.get(tname, tuple())
@@ -1533,59 +1963,48 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         verify(verbosity in ["High", "Low"], "verbosity needs to be either 'High' or 'Low'")
         assert self.good_tic_dat_object(tic_dat), "tic_dat not a good object for this factory"
         assert max_failures > 0, "max_failures should be a positive number"
+        return self._find_foreign_key_failures(tic_dat, verbosity, max_failures)
+    def _find_foreign_key_failures(self, tic_dat, verbosity="High", max_failures=float("inf"), parent_keys=None):
+        # find_foreign_key_failures, without validating tic_dat. parent_keys maps (foreign table, foreign fields)
+        # to the set of the foreign values of the foreign table's rows, and can be shared by the caller
         rtn_values, rtn_pks = clt.defaultdict(set), clt.defaultdict(set)
-
-        def getcell(tblname, native_pk, native_data_row, field_name):
-             assert field_name in self.primary_key_fields.get(tblname, ()) + \
-                                  self.data_fields.get(tblname, ())
-             if [field_name] == list(self.primary_key_fields.get(tblname, ())):
-                 return native_pk
-             if field_name in native_data_row:
-                 return native_data_row[field_name]
-             return native_pk[self.primary_key_fields[tblname].index(field_name)]
-
-        table_data = defaultdict(set)
-        def get_table_data(tblname, fields):
-            if fields == self.primary_key_fields.get(tblname, ()):
-                return getattr(tic_dat, tblname)
-            if (tblname, fields) not in table_data:
-                add_here = table_data[tblname, fields]
-                tbl = getattr(tic_dat, tblname)
-                for k,v in (tbl.items() if dictish(tbl) else enumerate(tbl)):
-                    add_here.add(tuple(getcell(tblname, k, v, f) for f in fields))
-            return table_data[tblname, fields]
+        parent_keys = {} if parent_keys is None else parent_keys
+        def get_parent_keys(fk, plan):
+            # the foreign table itself, or the set of the foreign values of its rows
+            if plan.foreign_is_pk:
+                return getattr(tic_dat, fk.foreign_table)
+            if (fk.foreign_table, plan.foreign_fields) not in parent_keys:
+                tbl = getattr(tic_dat, fk.foreign_table)
+                foreign_values = self._field_values_getter(fk.foreign_table, plan.foreign_fields)
+                parent_keys[fk.foreign_table, plan.foreign_fields] = \
+                    {foreign_values(k, v) for k, v in (tbl.items() if dictish(tbl) else enumerate(tbl))}
+            return parent_keys[fk.foreign_table, plan.foreign_fields]
         number_failures = [0] if max_failures < float("inf") else None
+        trackers = self._foreign_key_failure_trackers(tic_dat)
         def populate_rtn():
             def inc_failures_trips_end():
                 if number_failures:
                     number_failures[0] += 1
                     return number_failures[0] >= max_failures
-            for native, fks in self._foreign_keys_by_native().items():
-                def getcell_(native_pk, native_data_row, field_name):
-                     return getcell(native, native_pk, native_data_row, field_name)
-                for fk in fks:
-                    foreign_to_native = fk.foreigntonativemapping()
-                    for native_pk, native_data_row in (getattr(tic_dat, native).items()
-                                if dictish(getattr(tic_dat, native))
-                                else enumerate(getattr(tic_dat, native))):
-                        ffs = tuple(_ff for _ff in self.primary_key_fields.get(fk.foreign_table, ()) +
-                                    self.data_fields.get(fk.foreign_table, ())
-                                    if _ff in foreign_to_native)
-                        foreign_look_up = tuple(getcell_(native_pk, native_data_row, foreign_to_native[_ff])
-                                            for _ff in ffs)
-                        if ffs == self.primary_key_fields.get(fk.foreign_table) and len(ffs)==1:
-                            foreign_look_up = foreign_look_up[0]
-                        foreign_look_into = get_table_data(fk.foreign_table, ffs)
-                        if foreign_look_up not in foreign_look_into:
+            for fk in self.foreign_keys:
+                plan = self._foreign_key_plan(fk)
+                if fk in trackers:
+                    for values, native_pks in trackers[fk].failures().items():
+                        rtn_values[fk].add(plan.native_values_from_lookup(values))
+                        for native_pk in native_pks:
                             rtn_pks[fk].add(native_pk)
-                            if type(fk.mapping) is ForeignKeyMapping :
-                                rtn_values[fk].add(getcell_(native_pk, native_data_row,
-                                                            fk.mapping.native_field))
-                            else:
-                                rtn_values[fk].add(tuple(getcell_(native_pk,
-                                                    native_data_row, _.native_field) for _ in fk.mapping))
                             if inc_failures_trips_end():
                                 return
+                    continue
+                native = getattr(tic_dat, fk.native_table)
+                foreign_look_into, native_look_up = get_parent_keys(fk, plan), plan.native_look_up
+                for native_pk, native_data_row in [(k, v) for k, v in
+                        (native.items() if dictish(native) else enumerate(native))
+                        if native_look_up(k, v) not in foreign_look_into]:
+                    rtn_pks[fk].add(native_pk)
+                    rtn_values[fk].add(plan.native_values(native_pk, native_data_row))
+                    if inc_failures_trips_end():
+                        return
         populate_rtn()
         assert set(rtn_pks) == set(rtn_values)
         RtnType = namedtuple("ForeignKeyFailures", ("native_values", "native_pks"))
@@ -1611,6 +2030,59 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                     for dt in [utils.dateutil_adjuster(df)]}
         return dict(defaults, **{k: v[self.data_fields["parameters"][0]] for k,v in dat.parameters.items()})
 
+    def _foreign_key_plan(self, fk):
+        # how to check a foreign key, compiled once per factory
+        if fk not in self._foreign_key_plans:
+            foreign_to_native = fk.foreigntonativemapping()
+            foreign_pks = self.primary_key_fields.get(fk.foreign_table, ())
+            ffs = tuple(_ for _ in foreign_pks + self.data_fields.get(fk.foreign_table, ()) if _ in foreign_to_native)
+            nfs = tuple(foreign_to_native[_] for _ in ffs)
+            foreign_is_pk = ffs == foreign_pks
+            native_pks = self.primary_key_fields.get(fk.native_table, ())
+            native_values = self._field_values_getter(fk.native_table, nfs)
+            if len(nfs) == 1 and foreign_is_pk:
+                nf = nfs[0] # the most common case, so we avoid making a tuple for each row
+                if nf not in native_pks:
+                    native_look_up = lambda k, r: r[nf]
+                elif len(native_pks) == 1:
+                    native_look_up = lambda k, r: k
+                else:
+                    native_look_up = lambda k, r, i=native_pks.index(nf): k[i]
+            else:
+                native_look_up = lambda k, r: native_values(k, r)
+            mapping = (fk.mapping,) if type(fk.mapping) is ForeignKeyMapping else fk.mapping
+            posns = tuple(ffs.index(_.foreign_field) for _ in mapping)
+            native_values_from_lookup = (lambda values: values[posns[0]]) if len(posns) == 1 else \
+                                        (lambda values: tuple(values[i] for i in posns))
+            self._foreign_key_plans[fk] = _ForeignKeyPlan(nfs, ffs, foreign_is_pk, native_look_up,
+                lambda k, r: native_values_from_lookup(native_values(k, r)), native_values_from_lookup)
+        return self._foreign_key_plans[fk]
+    def _field_values_getter(self, table, fields):
+        # for a row of table, the values of fields (optionally, with the old value of an edited field)
+        pks = self.primary_key_fields.get(table, ())
+        posns = tuple(pks.index(f) if f in pks else None for f in fields)
+        def get(key, row, edited_field=None, old_value=None):
+            key = (key,) if len(pks) == 1 else key
+            return tuple(old_value if f == edited_field else row[f] if i is None else key[i]
+                         for f, i in zip(fields, posns))
+        return get
+    def _foreign_key_failure_trackers(self, tic_dat):
+        # the up to date ForeignKeyFailureTracker objects for tic_dat, for the foreign keys that can be tracked
+        if not (self.incremental_foreign_key_checks and isinstance(tic_dat, self.TicDat)):
+            return {}
+        trackers = tic_dat._foreign_key_failure_trackers
+        trackable = lambda t: self.primary_key_fields.get(t) and t not in self.generator_tables
+        for fk in self.foreign_keys:
+            if not (trackable(fk.native_table) and trackable(fk.foreign_table)):
+                continue
+            native, foreign = getattr(tic_dat, fk.native_table), getattr(tic_dat, fk.foreign_table)
+            if fk in trackers and trackers[fk].states != (native._state, foreign._state):
+                trackers.pop(fk).detach() # a table has been replaced
+            if fk not in trackers:
+                nfs, ffs = self._foreign_key_plan(fk)[:2]
+                trackers[fk] = utils.ForeignKeyFailureTracker(native, foreign, set(nfs), set(ffs),
+                    self._field_values_getter(fk.native_table, nfs), self._field_values_getter(fk.foreign_table, ffs))
+        return trackers
     def remove_foreign_key_failures(self, tic_dat, propagate=True):
         """
         Removes foreign key failures (i.e. child records with no parent table record)
@@ -1623,21 +2095,66 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         :return: tic_dat, with the foreign key failures removed
         """
         fk_failures = self.find_foreign_key_failures(tic_dat)
-        needs_removal = set()
+        needs_removal = clt.defaultdict(set)
         for fk, (_, failed_pks) in fk_failures.items():
-            for failed_pk in failed_pks:
-                if self.primary_key_fields.get(fk.native_table):
-                    assert dictish(getattr(tic_dat, fk.native_table))
-                    if failed_pk in getattr(tic_dat, fk.native_table) :
-                        del(getattr(tic_dat, fk.native_table)[failed_pk])
-                else:
-                    needs_removal.add((fk.native_table, failed_pk))
-        for t,row_index in sorted(needs_removal, reverse=True):
-            getattr(tic_dat, t).pop(row_index)
-        if fk_failures and propagate:
-            return self.remove_foreign_key_failures(tic_dat)
+            needs_removal[fk.native_table].update(failed_pks)
+        if propagate:
+            self._cascade_foreign_key_failures(tic_dat, needs_removal)
+        for t, failed_pks in needs_removal.items():
+            if self.primary_key_fields.get(t):
+                assert dictish(getattr(tic_dat, t))
+                for failed_pk in failed_pks:
+                    del(getattr(tic_dat, t)[failed_pk])
+            else:
+                for row_index in sorted(failed_pks, reverse=True):
+                    getattr(tic_dat, t).pop(row_index)
         return tic_dat
-
+    def _cascade_foreign_key_failures(self, tic_dat, needs_removal):
+        # adds to needs_removal the rows that fail once the rows already in needs_removal are removed.
+        # The tables are visited in foreign key order, so that (outside of circular foreign keys) a table is visited
+        # once, after all of its foreign tables. The removed rows of a table are matched to the native rows that
+        # reference them with a reverse index, rather than by searching for the failures anew.
+        fks_by_foreign = clt.defaultdict(list)
+        for fk in self.foreign_keys:
+            if not set(fk[:2]).intersection(self.generator_tables):
+                fks_by_foreign[fk.foreign_table].append(fk)
+        def rows(t):
+            tbl = getattr(tic_dat, t)
+            return tbl.items() if dictish(tbl) else enumerate(tbl)
+        references, support = {}, {}
+        rank = {t: i for i, t in enumerate(utils.foreign_key_table_order(self))}
+        new_removals = {t: set(pks) for t, pks in needs_removal.items()}
+        work = [(rank[t], t) for t in new_removals]
+        heapq.heapify(work)
+        while work:
+            t = heapq.heappop(work)[1]
+            removed = new_removals.pop(t)
+            for fk in fks_by_foreign[t]:
+                plan = self._foreign_key_plan(fk)
+                if plan.foreign_is_pk:
+                    lost = removed
+                else: # the values that are no longer provided by any of the foreign rows
+                    foreign_values = self._field_values_getter(t, plan.foreign_fields)
+                    if fk not in support:
+                        support[fk] = clt.Counter(foreign_values(k, r) for k, r in rows(t))
+                    lost = set()
+                    for k in removed:
+                        values = foreign_values(k, getattr(tic_dat, t)[k])
+                        support[fk][values] -= 1
+                        if not support[fk][values]:
+                            lost.add(values)
+                if fk not in references:
+                    references[fk] = clt.defaultdict(list)
+                    for k, r in rows(fk.native_table):
+                        references[fk][plan.native_look_up(k, r)].append(k)
+                native = fk.native_table
+                for native_pk in (_ for values in lost for _ in references[fk].get(values, ())):
+                    if native_pk not in needs_removal[native]:
+                        needs_removal[native].add(native_pk)
+                        if native not in new_removals:
+                            new_removals[native] = set()
+                            heapq.heappush(work, (rank[native], native))
+                        new_removals[native].add(native_pk)
     def _get_full_row(self, ticdat, table, pk):
         full_row = dict(getattr(ticdat, table)[pk])
         if len(self.primary_key_fields[table]) == 1:
@@ -1680,40 +2197,27 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         """
         assert self.good_tic_dat_object(tic_dat), "tic_dat not a good object for this factory"
         assert max_failures > 0, "max_failures should be a positive number"
-
+        return self._find_data_type_failures(tic_dat, max_failures)
+    def _find_data_type_failures(self, tic_dat, max_failures=float("inf")):
+        # find_data_type_failures, without validating tic_dat
         rtn_values, rtn_pks = clt.defaultdict(set), clt.defaultdict(set)
-        tmp_tdf = TicDatFactory.create_from_full_schema(self.schema(include_ancillary_info=True))
-        for t, pks in self.primary_key_fields.items():
-            for pk in pks:
-                if pk not in self._data_types.get(t, ()):
-                    tmp_tdf.set_data_type(t, pk, number_allowed=True,
-                      inclusive_min=True, inclusive_max=True, min=-float("inf"), max=float("inf"),
-                      must_be_int=False, strings_allowed='*', nullable=False, datetime=False)
         number_failures = [0] if max_failures < float("inf") else None
         def populate_rtn():
             def inc_failures_trips_end():
                 if number_failures:
                     number_failures[0] += 1
                     return number_failures[0] >= max_failures
-            for table, type_row in tmp_tdf._data_types.items():
-                _table = getattr(tic_dat, table)
-                if dictish(_table):
-                    for pk  in _table:
-                        full_row = self._get_full_row(tic_dat, table, pk)
-                        for field, data_type in type_row.items():
-                            if not data_type.valid_data(full_row[field]) :
-                                rtn_values[(table, field)].add(full_row[field])
-                                rtn_pks[(table, field)].add(pk)
-                                if inc_failures_trips_end():
-                                    return
-                elif containerish(_table):
-                    for pk, data_row in enumerate(_table):
-                        for field, data_type in type_row.items():
-                            if not data_type.valid_data(data_row[field]) :
-                                rtn_values[(table, field)].add(data_row[field])
-                                rtn_pks[(table, field)].add(pk)
-                                if inc_failures_trips_end():
-                                    return
+            for table, checks in self._compiled_data_type_checks().items():
+                single_pk = len(self.primary_key_fields.get(table, ())) == 1
+                for pk, data_row in self._data_type_check_rows(getattr(tic_dat, table), table):
+                    key = (pk,) if single_pk else pk
+                    for field, valid, key_posn, data_posn in checks:
+                        data = key[key_posn] if data_posn is None else data_row[data_posn]
+                        if not valid(data):
+                            rtn_values[(table, field)].add(data)
+                            rtn_pks[(table, field)].add(pk)
+                            if inc_failures_trips_end():
+                                return
         populate_rtn()
         assert set(rtn_values).issuperset(set(rtn_pks))
         TableField = clt.namedtuple("TableField", ["table", "field"])
@@ -1722,6 +2226,37 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
                                           tuple(rtn_pks[tf]) if tf in rtn_pks else None)
                 for tf in rtn_values}
 
+    def _true_data_types(self):
+        # the data types, along with the temporary types that exclude Null from the untyped primary key fields
+        # See issue https://github.com/ticdat/ticdat/issues/46 and the doc string for find_data_type_failures
+        rtn = {t: dict(v) for t, v in self._data_types.items()}
+        for t, pks in self.primary_key_fields.items():
+            for pk in pks:
+                if pk not in self._data_types.get(t, ()):
+                    rtn.setdefault(t, {})[pk] = TypeDictionary.safe_creator(number_allowed=True,
+                      inclusive_min=True, inclusive_max=True, min=-float("inf"), max=float("inf"),
+                      must_be_int=False, strings_allowed='*', nullable=False, datetime=False)
+        return rtn
+    def _compiled_data_type_checks(self):
+        # for each table, a (field, validator, primary key position, data field position) tuple per typed field
+        if not self._data_type_checks:
+            for t, type_row in self._true_data_types().items():
+                pks, dfs = self.primary_key_fields.get(t, ()), self.data_fields.get(t, ())
+                self._data_type_checks[t] = tuple((f, data_type.validator(),
+                                                   pks.index(f) if f in pks else None,
+                                                   dfs.index(f) if f in dfs else None)
+                                                  for f, data_type in type_row.items())
+        return self._data_type_checks
+    def _data_type_check_rows(self, _table, table):
+        # (primary key or row index, tuple of data field values) for each row, without making a dict per row
+        dfs = self.data_fields.get(table, ())
+        if isinstance(_table, utils.ColumnarTicDatDict):
+            columns = [_table.column(f) for f in dfs]
+            return zip(_table, zip(*[c.tolist() if hasattr(c, "tolist") else c for c in columns]))
+        items = _table.items() if dictish(_table) else enumerate(_table) if containerish(_table) else ()
+        if getattr(_table, "_row_class", None):
+            return ((k, r.values()) for k, r in items)
+        return ((k, tuple(r[f] for f in dfs)) for k, r in items)
     def replace_data_type_failures(self, tic_dat, replacement_values = FrozenDict()):
         """
         Replace the data cells with data type failures with the default value for the appropriate field.
@@ -1769,7 +2304,8 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         assert not set(self.find_data_type_failures(tic_dat)).intersection(real_replacements)
         return tic_dat
 
-    def find_data_row_failures(self, tic_dat, exception_handling="__debug__", max_failures=float("inf")):
+    def find_data_row_failures(self, tic_dat, exception_handling="__debug__", max_failures=float("inf"),
+                               executor=None):
         """
         Finds the data row failures for a ticdat object
 
@@ -1788,6 +2324,16 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         :param max_failures: number. An upper limit on the number of failures to find. Will short circuit and return
                                      ASAP with a partial failure enumeration when this number is reached.
 
+        :param executor: optional. A concurrent.futures.Executor (i.e. a ThreadPoolExecutor or a ProcessPoolExecutor)
+                         used to evaluate the row predicates in parallel, in chunks of utils.ROW_PREDICATE_CHUNK_SIZE
+                         rows. Each predicate_kwargs_maker is still called exactly once (in the calling process) and
+                         its result is shared with the workers. The chunks are submitted table by table, as the
+                         enumeration reaches each predicate, so no more predicate_kwargs_makers are called (nor
+                         chunks submitted) once max_failures is reached. A ProcessPoolExecutor requires picklable
+                         predicates and predicate_kwargs_maker results. The returned failures (including the
+                         max_failures short circuiting and the exceptions raised when "Unhandled") are the same as
+                         when no executor is used.
+
         :return: A dictionary constructed as follow:
 
          The keys are namedtuples with members "table", "predicate_name".
@@ -1808,6 +2354,10 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         assert max_failures > 0, "max_failures should be a positive number"
         verify(exception_handling in ["Handled as Failure", "Unhandled", "__debug__"],
                "bad exception_handling argument")
+        return self._find_data_row_failures(tic_dat, exception_handling, max_failures, executor)
+    def _find_data_row_failures(self, tic_dat, exception_handling="__debug__", max_failures=float("inf"),
+                                executor=None):
+        # find_data_row_failures, without validating tic_dat
         if exception_handling == "__debug__":
             exception_handling = "Unhandled" if __debug__ else "Handled as Failure"
         data_row_predicates = {k: dict(v) for k,v in self._data_row_predicates.items()}
@@ -1828,70 +2378,157 @@ class TicDatFactory(freezable_factory(object, "_isFrozen", {"opl_prepend", "ampl
         rtn = clt.defaultdict(set)
         PKEM = clt.namedtuple("PrimaryKeyErrorMessage", ["primary_key", "error_message"])
         number_failures = [0] if max_failures < float("inf") else None
+        predicate_kwargs_maker_exceptions = {}
+        predicate_kwargs_cache = self._predicate_kwargs_cache(tic_dat)
+        if predicate_kwargs_cache:
+            cached, signature = predicate_kwargs_cache
+            predicate_kwargs_maker_results.update((maker, result) for maker, (_signature, result) in cached.items()
+                                                  if _signature[0] == signature[0])
+        def make_predicate_kwargs(rpi):
+            if not rpi.predicate_kwargs_maker:
+                return {}
+            if rpi.predicate_kwargs_maker not in predicate_kwargs_maker_results:
+                try:
+                    _predicate_kwargs = rpi.predicate_kwargs_maker(tic_dat)
+                    if predicate_kwargs_cache and isinstance(_predicate_kwargs, dict):
+                        predicate_kwargs_cache[0][rpi.predicate_kwargs_maker] = (predicate_kwargs_cache[1],
+                                                                                 _predicate_kwargs)
+                except Exception as e:
+                    if exception_handling == "Handled as Failure":
+                        _predicate_kwargs = f"Exception<{e}>"
+                    else: # defer raising until the predicate by predicate enumeration reaches this predicate
+                        _predicate_kwargs = None
+                        predicate_kwargs_maker_exceptions[rpi.predicate_kwargs_maker] = e
+                predicate_kwargs_maker_results[rpi.predicate_kwargs_maker] = _predicate_kwargs
+            if rpi.predicate_kwargs_maker in predicate_kwargs_maker_exceptions:
+                raise predicate_kwargs_maker_exceptions[rpi.predicate_kwargs_maker]
+            return predicate_kwargs_maker_results[rpi.predicate_kwargs_maker]
+        def batch_predicates(row_predicates):
+            # the first predicate (whose kwargs have been made) along with the later ones whose kwargs are already
+            # known, so that no predicate_kwargs_maker is called before the enumeration reaches its predicate
+            rtn = {}
+            for pn, rpi in row_predicates:
+                if rtn and rpi.predicate_kwargs_maker and \
+                   (rpi.predicate_kwargs_maker not in predicate_kwargs_maker_results or
+                    rpi.predicate_kwargs_maker in predicate_kwargs_maker_exceptions):
+                    continue
+                predicate_kwargs = make_predicate_kwargs(rpi)
+                if isinstance(predicate_kwargs, dict):
+                    rtn[pn] = (rpi.predicate, predicate_kwargs, rpi.predicate_failure_response)
+            return rtn
+        def table_rows(tbl):
+            # each row is seen through a single view, shared by all the predicates
+            _table = getattr(tic_dat, tbl)
+            if dictish(_table):
+                positions = utils.FullRowView.positions(self.primary_key_fields[tbl], self.data_fields[tbl])
+                return ((pk, utils.FullRowView(positions, pk, row)) for pk, row in _table.items())
+            return enumerate(_table)
+        def batch_failures(tbl, predicates, executor_rows):
+            # maps each predicate name to an iterable of (failures, exception) pairs
+            if executor is not None:
+                return {pn: [executor.submit(utils.row_predicate_failures,
+                                             executor_rows[i:i+utils.ROW_PREDICATE_CHUNK_SIZE],
+                                             *predicate, exception_handling)
+                             for i in range(0, len(executor_rows), utils.ROW_PREDICATE_CHUNK_SIZE)]
+                        for pn, predicate in predicates.items()}
+            # all the predicates of the batch are evaluated in one pass over the table
+            remaining_failures = (max_failures - number_failures[0]) if number_failures else max_failures
+            return {pn: [failures] for pn, failures in
+                    zip(predicates, utils.row_predicates_failures(table_rows(tbl), list(predicates.values()),
+                                                                  exception_handling,
+                                                                  max_first_failures=remaining_failures))}
+        chunk_futures = []
         def populate_rtn():
             def inc_failures_trips_end():
                 if number_failures:
                     number_failures[0] += 1
                     return number_failures[0] >= max_failures
             for tbl, row_predicates in data_row_predicates.items():
-                for pn, rpi in row_predicates.items():
-                    predicate_kwargs = {}
-                    if rpi.predicate_kwargs_maker:
-                        if rpi.predicate_kwargs_maker not in predicate_kwargs_maker_results:
-                            if exception_handling == "Handled as Failure":
-                                try:
-                                    _predicate_kwargs = rpi.predicate_kwargs_maker(tic_dat)
-                                except Exception as e:
-                                    _predicate_kwargs = f"Exception<{e}>"
-                            else:
-                                _predicate_kwargs = rpi.predicate_kwargs_maker(tic_dat)
-                            predicate_kwargs_maker_results[rpi.predicate_kwargs_maker] = _predicate_kwargs
-                        predicate_kwargs = predicate_kwargs_maker_results[rpi.predicate_kwargs_maker]
+                row_predicates = list(row_predicates.items())
+                table_failures, executor_rows = {}, None
+                for position, (pn, rpi) in enumerate(row_predicates):
+                    predicate_kwargs = make_predicate_kwargs(rpi)
                     if not isinstance(predicate_kwargs, dict):
                         rtn[tbl, pn] = PKEM('*', predicate_kwargs
                                             if (isinstance(predicate_kwargs, str) and "Exception<" in predicate_kwargs)
                                             else f"predicate_kwargs_maker failed to return a dict")
                         if inc_failures_trips_end():
                             return
-                    else:
-                        if rpi.predicate_failure_response == "Boolean":
-                            def _p(row):
-                                try:
-                                    return rpi.predicate(row, **predicate_kwargs)
-                                except:
-                                    return False
-                        else:
-                            def _p(row):
-                                try:
-                                    return rpi.predicate(row, **predicate_kwargs)
-                                except Exception as e:
-                                    return f"Exception<{e}>"
-                        if exception_handling == "Unhandled":
-                            _p = lambda row: rpi.predicate(row, **predicate_kwargs)
-                        _table = getattr(tic_dat, tbl)
-                        def handle_full_row_trips_end(pk, full_row):
-                            if rpi.predicate_failure_response == "Boolean" and not _p(full_row):
-                                rtn[tbl, pn].add(pk)
-                                return inc_failures_trips_end()
-                            if rpi.predicate_failure_response == "Error Message":
-                                _ = _p(full_row)
-                                if not _ is True:
-                                    rtn[tbl, pn].add(PKEM(pk, str(_)))
-                                    return inc_failures_trips_end()
-                        if dictish(_table):
-                            for pk  in _table:
-                                full_row = self._get_full_row(tic_dat, tbl, pk)
-                                if handle_full_row_trips_end(pk, full_row):
-                                    return
-                        else:
-                            for i, data_row in enumerate(_table):
-                                if handle_full_row_trips_end(i, data_row):
-                                    return
-        populate_rtn()
+                        continue
+                    if pn not in table_failures:
+                        if executor is not None and executor_rows is None:
+                            _table = getattr(tic_dat, tbl)
+                            executor_rows = [(pk, self._get_full_row(tic_dat, tbl, pk)) for pk in _table] \
+                                            if dictish(_table) else \
+                                            [(i, dict(data_row)) for i, data_row in enumerate(_table)]
+                        batch = batch_predicates([_ for _ in row_predicates[position:]
+                                                  if _[0] not in table_failures])
+                        table_failures.update(batch_failures(tbl, batch, executor_rows))
+                        if executor is not None:
+                            chunk_futures.extend(chain.from_iterable(table_failures[_] for _ in batch))
+                    for failures, exception in (table_failures[pn] if executor is None else
+                                                (future.result() for future in table_failures[pn])):
+                        for pk, result in failures:
+                            rtn[tbl, pn].add(pk if rpi.predicate_failure_response == "Boolean" else
+                                             PKEM(pk, str(result)))
+                            if inc_failures_trips_end():
+                                return
+                        if exception is not None:
+                            raise exception
+        try:
+            populate_rtn()
+        finally:
+            for future in chunk_futures:
+                future.cancel()
         TPN = clt.namedtuple("TablePredicateName", ["table", "predicate_name"])
 
         return {TPN(*k):(v if isinstance(v, PKEM) else tuple(v)) for k,v in rtn.items()}
 
+    def find_all_failures(self, tic_dat, exception_handling="__debug__", max_failures=float("inf"), executor=None):
+        """
+        Finds all the data integrity failures for a ticdat object with a single call, sharing one failure budget.
+
+        :param tic_dat: ticdat object
+
+        :param exception_handling: see find_data_row_failures
+
+        :param max_failures: number. An upper limit on the total number of failures to find. The data type failures
+                                     are enumerated first, then the data row failures and then the foreign key
+                                     failures. Will short circuit and return ASAP with a partial failure
+                                     enumeration when this number is reached.
+
+        :param executor: see find_data_row_failures
+
+        :return: a namedtuple with members "data_type_failures", "data_row_failures" and "foreign_key_failures".
+                 These are the dictionaries returned by find_data_type_failures, find_data_row_failures and
+                 find_foreign_key_failures, respectively.
+
+                 Note that a TicDat object can't hold duplicate primary keys. Use the find_duplicates functions
+                 of the file readers (i.e. tdf.csv.find_duplicates) to check the raw data for duplicates.
+        """
+        msg = []
+        verify(self.good_tic_dat_object(tic_dat, msg.append),
+               "tic_dat not a good object for this factory : %s"%"\n".join(msg))
+        assert max_failures > 0, "max_failures should be a positive number"
+        verify(exception_handling in ["Handled as Failure", "Unhandled", "__debug__"],
+               "bad exception_handling argument")
+        rtn, number_failures = {}, 0
+        # tic_dat was validated above, so the checks skip straight to their scans
+        parent_keys = {}
+        for name, find, num_failures in [
+                ("data_type_failures", lambda mf: self._find_data_type_failures(tic_dat, mf),
+                 lambda v: len(v.pks)),
+                ("data_row_failures", lambda mf: self._find_data_row_failures(tic_dat, exception_handling, mf,
+                                                                              executor),
+                 lambda v: 1 if hasattr(v, "error_message") else len(v)),
+                ("foreign_key_failures", lambda mf: self._find_foreign_key_failures(tic_dat, "High", mf,
+                                                                                    parent_keys),
+                 lambda v: len(v.native_pks))]:
+            rtn[name] = find(max_failures - number_failures) if number_failures < max_failures else {}
+            number_failures += sum(map(num_failures, rtn[name].values()))
+        AllFailures = namedtuple("AllFailures", list(rtn))
+        return AllFailures(**rtn)
+
     def obfusimplify(self, tic_dat, table_prepends = utils.FrozenDict(), skip_tables = (),
                      freeze_it = False) :
         """
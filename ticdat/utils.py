@@ -4,7 +4,8 @@ PEP8
 """
 from numbers import Number
 from itertools import chain, combinations
-from collections import defaultdict
+from collections import defaultdict, Counter
+from collections.abc import MutableMapping, Mapping
 import ticdat
 import getopt
 import sys
@@ -23,13 +24,20 @@ try:
 except:
     pd = DataFrame = numpy = None
 
+try:
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+except:
+    guess_datetime_format = None
+
 try:
     import ocp_ticdat_drm as drm
 except:
     drm = None
 import inspect
+from operator import attrgetter
 
-def faster_df_apply(df, func, trip_wire_check=None):
+def faster_df_apply(df, func, trip_wire_check=None, fields=None, row_type="dict", executor=None,
+                    chunk_size=None):
     """
     pandas.DataFrame.apply is rarely used because it is slow. It is slow because it creates a Series for each row
     of the DataFrame, and passes this Series to the function. faster_df_apply creates a dict for each row of the
@@ -50,25 +58,180 @@ def faster_df_apply(df, func, trip_wire_check=None):
                                       trip_wire_check can either return falsey, or a replacement to func to be applied
                                       to the remainder of the DataFrame
 
+    :param fields: optional. The columns func needs. If provided, only these columns are pulled from df, which is
+                   faster for wide DataFrames. Defaults to all the columns.
+
+    :param row_type: "dict" (the default), "tuple" or "namedtuple". For "tuple", func is passed a tuple of the
+                     values of fields (or of all the columns) for each row, so no dict is created per row. For
+                     "namedtuple", the tuple is a namedtuple with members named after the columns (when the column
+                     names are valid identifiers).
+
+    :param executor: optional. A concurrent.futures.Executor (i.e. a ProcessPoolExecutor) used to apply func to
+                     chunks of df in parallel. func (and trip_wire_check) should be free of side effects, since
+                     rows past the point where trip_wire_check replaces func might still be evaluated with func.
+                     A ProcessPoolExecutor requires a picklable func.
+
+    :param chunk_size: optional. The number of rows in each of the chunks passed to the executor.
+                       Defaults to DF_APPLY_CHUNK_SIZE.
+
     :return: a pandas Series with the same index as df and the values of calling func on each row dict.
     """
     verify(DataFrame and isinstance(df, DataFrame), "df argument needs to be a DataFrame")
     verify(callable(func), "func needs to be a function")
     verify(not trip_wire_check or callable(trip_wire_check), "trip_wire_check needs to None, or a function")
-    cols = list(df.columns)
-    data, index = [], []
-    for row in df.itertuples(index=True):
-        row_dict = {f:v for f,v in zip(cols, row[1:])}
-        data.append(func(row_dict))
-        index.append(row[0])
+    verify(row_type in ("dict", "tuple", "namedtuple"), "row_type needs to be dict, tuple or namedtuple")
+    verify(fields is None or (containerish(fields) and set(fields).issubset(df.columns)),
+           "fields needs to be None, or a subset of the DataFrame columns")
+    chunk_size = chunk_size or DF_APPLY_CHUNK_SIZE
+    if executor is None or len(df) <= chunk_size:
+        data = _df_apply_values(df, func, fields, row_type, trip_wire_check)
+    else:
+        futures = [executor.submit(_df_apply_values, df.iloc[i:i+chunk_size], func, fields, row_type)
+                   for i in range(0, len(df), chunk_size)]
+        data = []
+        try:
+            for future in futures:
+                if not trip_wire_check:
+                    data.extend(future.result())
+                    continue
+                for value in future.result():
+                    data.append(value)
+                    new_func = trip_wire_check(value)
+                    if new_func:
+                        data.extend(_df_apply_values(df.iloc[len(data):], new_func, fields, row_type))
+                        return _df_apply_series(df, data)
+        finally:
+            for future in futures:
+                future.cancel()
+    return _df_apply_series(df, data)
+
+# the number of rows in each of the chunks faster_df_apply passes to an executor
+DF_APPLY_CHUNK_SIZE = 50000
+
+def _df_apply_values(df, func, fields, row_type, trip_wire_check=None):
+    # the list of func results for the rows of df. The rows are built from whole columns, rather than itertuples
+    field_posns = {f: i for i, f in enumerate(df.columns)} # like a dict, the last duplicated column wins
+    cols = list(field_posns) if fields is None else list(fields)
+    columns = [df.iloc[:, field_posns[f]].tolist() for f in cols]
+    rows = zip(*columns) if columns else (() for _ in range(len(df)))
+    if row_type == "dict":
+        rows = (dict(zip(cols, row)) for row in rows)
+    elif row_type == "namedtuple":
+        rows = map(namedtuple("Row", [str(_) for _ in cols], rename=True)._make, rows)
+    if not trip_wire_check:
+        return list(map(func, rows))
+    data = []
+    for row in rows:
+        data.append(func(row))
         if trip_wire_check:
             new_func = trip_wire_check(data[-1])
             if new_func:
                 func = new_func
                 trip_wire_check = None
+    return data
+
+def _df_apply_series(df, data):
     # will default to float for empty Series, like original pandas
+    index = df.index.set_names([None] * df.index.nlevels)
     return pd.Series(data, index=index, **({"dtype": numpy.float64} if not data else {}))
 
+# the number of rows evaluated by each executor job when row predicates are checked in parallel
+ROW_PREDICATE_CHUNK_SIZE = 10000
+
+def row_predicates_failures(rows, predicates, exception_handling, max_first_failures=float("inf")):
+    """
+    Evaluates several row predicates in a single pass over rows.
+
+    :param rows: an iterable of (key, row) pairs. row is passed to each predicate, and key identifies failures.
+
+    :param predicates: a list of (predicate, predicate_kwargs, predicate_failure_response) triplets
+
+    :param exception_handling: either "Handled as Failure" or "Unhandled"
+
+    :param max_first_failures: the pass stops early once the first predicate has failed this many times
+                               (or has raised an unhandled exception), as the remaining predicates then don't matter
+                               to a caller enumerating failures predicate by predicate.
+
+    :return: a list of (failures, exception) pairs, one per predicate, as per row_predicate_failures.
+    """
+    failures = [[] for _ in predicates]
+    exceptions = [None] * len(predicates)
+    active = [(i, predicate, predicate_kwargs, predicate_failure_response == "Error Message")
+              for i, (predicate, predicate_kwargs, predicate_failure_response) in enumerate(predicates)]
+    first_failures = failures[0] if failures else ()
+    for key, row in rows:
+        raised = False
+        for i, predicate, predicate_kwargs, error_message in active:
+            try:
+                result = predicate(row, **predicate_kwargs)
+            except Exception as e:
+                if exception_handling == "Unhandled":
+                    exceptions[i] = e
+                    raised = True
+                    continue
+                result = f"Exception<{e}>" if error_message else False
+            if (result is not True) if error_message else (not result):
+                failures[i].append((key, result))
+        if raised:
+            if exceptions[0] is not None:
+                break
+            active = [_ for _ in active if exceptions[_[0]] is None]
+        if len(first_failures) >= max_first_failures:
+            break
+    return list(zip(failures, exceptions))
+
+def row_predicate_failures(rows, predicate, predicate_kwargs, predicate_failure_response, exception_handling):
+    """
+    Evaluates a row predicate over a chunk of rows. Used by the find_data_row_failures functions to farm out
+    row predicate checking to a concurrent.futures executor, and thus is a module level function (so as to be
+    picklable for process pools).
+
+    :param rows: a list of (key, row) pairs. row is passed to predicate, and key is used to identify failures.
+
+    :param predicate: the row predicate
+
+    :param predicate_kwargs: the dict to unpack for each call to predicate
+
+    :param predicate_failure_response: "Boolean" or "Error Message"
+
+    :param exception_handling: either "Handled as Failure" or "Unhandled"
+
+    :return: a (failures, exception) pair. failures is the list of (key, predicate result) pairs for the failing rows,
+             in row order. exception is None, or the unhandled exception that stopped the evaluation (in which case
+             failures only reflects the rows preceding the one that raised the exception).
+    """
+    return row_predicates_failures(rows, [(predicate, predicate_kwargs, predicate_failure_response)],
+                                   exception_handling)[0]
+
+def df_row_predicate_failures(df, predicate, predicate_kwargs, predicate_failure_response, exception_handling):
+    """
+    The DataFrame analog of row_predicate_failures.
+
+    :param df: a DataFrame (typically a row range of a larger table)
+
+    :return: a (predicate results, exception) pair. predicate results is a Series of the values returned by
+             predicate (with handled exceptions mapped to failure values) and is truncated to exclude the row
+             that raised the unhandled exception (if any) and all subsequent rows.
+    """
+    raised = []
+    def _p(row):
+        if raised:
+            return True
+        try:
+            return predicate(row, **predicate_kwargs)
+        except Exception as e:
+            if exception_handling == "Unhandled":
+                raised.append((len(evaluated), e))
+                return True
+            return f"Exception<{e}>" if predicate_failure_response == "Error Message" else False
+        finally:
+            evaluated.append(None)
+    evaluated = []
+    rtn = faster_df_apply(df, _p)
+    if raised:
+        return rtn.iloc[:raised[0][0]], raised[0][1]
+    return rtn, None
+
 def dat_restricted(table_list):
     '''
     Decorator factory used to decorate action functions (or solve function) to restrict the access to the
@@ -182,6 +345,63 @@ def dateutil_adjuster(x):
     if not numericish(x):
         return _try_to_timestamp(str(x))
 
+def dateutil_adjusted_series(series):
+    """
+    The vectorized equivalent of replacing each entry x of series with dateutil_adjuster(x) (when this isn't None).
+    The strings that share the format (and length) of the first string are parsed in a single pass, and each
+    distinct remaining entry is passed to dateutil_adjuster only once.
+    :param series: a pandas Series
+    :return: a pandas Series with the same index as series
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    values = series.tolist()
+    if pd.api.types.infer_dtype(series, skipna=False) == "string":
+        lengths = numpy.fromiter(map(len, values), dtype=int, count=len(values))
+        string_posns = numpy.arange(len(values))
+    else:
+        string_posns = numpy.array([i for i, x in enumerate(values) if isinstance(x, str)], dtype=int)
+        lengths = numpy.array([len(values[i]) for i in string_posns], dtype=int)
+    parsed = {}
+    fmt = safe_apply(guess_datetime_format)(values[string_posns[0]]) if len(string_posns) and guess_datetime_format \
+          else None
+    if fmt:
+        # formats without separators can parse strings of other lengths differently than pd.Timestamp
+        string_posns = string_posns[lengths == lengths[0]]
+        strings = values if len(string_posns) == len(values) else [values[i] for i in string_posns]
+        timestamps = safe_apply(pd.to_datetime)(strings, format=fmt, errors="coerce")
+        if timestamps is not None and pd.api.types.is_datetime64_any_dtype(timestamps):
+            if len(string_posns) == len(values) and not timestamps.hasnans:
+                return pd.Series(timestamps, index=series.index.set_names([None] * series.index.nlevels))
+            parsed = {i: ts for i, ts in zip(string_posns.tolist(), timestamps) if not pd.isnull(ts)}
+    cache = {}
+    def adjusted(x):
+        key = (type(x), x)
+        try:
+            if key not in cache:
+                cache[key] = dateutil_adjuster(x)
+            rtn = cache[key]
+        except TypeError: # unhashable
+            rtn = dateutil_adjuster(x)
+        return rtn if rtn is not None else x
+    return _df_apply_series(series, [parsed[i] if i in parsed else adjusted(x) for i, x in enumerate(values)])
+
+def infinity_flag_masks(series, flag):
+    """
+    :param series: a pandas Series
+    :param flag: a positive number
+    :return: a pair of boolean Series flagging the numericish entries of series that are >= flag and <= -flag,
+             respectively
+    """
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return tuple(mask.fillna(False).astype(bool) for mask in [series >= flag, series <= -flag])
+    if pd.api.types.is_datetime64_any_dtype(series) or pd.api.types.is_bool_dtype(series) or \
+       pd.api.types.infer_dtype(series, skipna=True) in ("string", "bytes", "empty"):
+        return tuple(pd.Series(False, index=series.index, dtype=bool) for _ in range(2))
+    values = series.tolist()
+    return (pd.Series([numericish(x) and x >= flag for x in values], index=series.index, dtype=bool),
+            pd.Series([numericish(x) and x <= -flag for x in values], index=series.index, dtype=bool))
+
 def acceptable_default(v) :
     return numericish(v) or stringish(v) or (v is None)
 
@@ -217,6 +437,77 @@ class TypeDictionary(namedtuple("TypeDictionary",
             assert containerish(self.strings_allowed)
             return data in self.strings_allowed
         return False
+    def validator(self):
+        """
+        :return: a function equivalent to valid_data, specialized for this TypeDictionary. The common cell
+                 types (str, int, float and None) are checked without the generic type sniffing.
+        """
+        if self.datetime:
+            return self.valid_data
+        nullable, valid_data = bool(self.nullable), self.valid_data
+        if not self.number_allowed:
+            number_ok = lambda data: False
+        else:
+            min_, max_, must_be_int = self.min, self.max, self.must_be_int
+            strict_min, strict_max = not self.inclusive_min, not self.inclusive_max
+            inf_is_int = self.inclusive_max and max_ == float("inf")
+            def number_ok(data):
+                if data < min_ or data > max_ or (strict_min and data == min_) or (strict_max and data == max_):
+                    return False
+                if must_be_int and type(data) is float and not data.is_integer():
+                    return inf_is_int and data == max_
+                return True
+        if self.strings_allowed == "*":
+            string_ok = lambda data: True
+        else:
+            strings_allowed = frozenset(self.strings_allowed)
+            string_ok = lambda data: data in strings_allowed
+        def rtn(data):
+            type_ = type(data)
+            if type_ is int:
+                return number_ok(data)
+            if type_ is float:
+                return nullable if data != data else number_ok(data)
+            if type_ is str:
+                return string_ok(data)
+            if data is None:
+                return nullable
+            return valid_data(data)
+        return rtn
+    def valid_data_mask(self, series):
+        """
+        :param series: a pandas Series
+        :return: a numpy boolean array that is True where valid_data is True, computed a column at a time
+                 wherever the dtype of series allows
+        """
+        nulls = series.isnull().values
+        rtn = numpy.full(len(series), bool(self.nullable))
+        if nulls.all():
+            return rtn
+        non_null = series[~nulls]
+        kind = non_null.dtype.kind
+        if kind in "iuf" and not self.datetime: # every cell is numericish
+            if not self.number_allowed:
+                rtn[~nulls] = False
+                return rtn
+            values = non_null.values
+            valid = (values >= self.min) if self.inclusive_min else (values > self.min)
+            valid &= (values <= self.max) if self.inclusive_max else (values < self.max)
+            if self.must_be_int and kind == "f":
+                with numpy.errstate(invalid="ignore"):
+                    is_int = numpy.isfinite(values) & (numpy.mod(values, 1) == 0)
+                if self.inclusive_max and self.max == float("inf"):
+                    is_int |= values == self.max
+                valid &= is_int
+            rtn[~nulls] = valid
+        elif kind == "M" and self.datetime:
+            rtn[~nulls] = True
+        elif kind == "O" and not self.datetime and pd.api.types.infer_dtype(non_null, skipna=False) == "string":
+            rtn[~nulls] = True if self.strings_allowed == "*" else non_null.isin(self.strings_allowed).values
+        else:
+            validator = self.validator()
+            rtn[~nulls] = numpy.fromiter((validator(x) for x in non_null.tolist()), dtype=bool, count=len(non_null))
+        return rtn
     @staticmethod
     def safe_creator(number_allowed, inclusive_min, inclusive_max, min, max,
                       must_be_int, strings_allowed, nullable, datetime=False):
@@ -785,6 +1076,88 @@ def all_underscore_replacements(s):
         rtn.append(s_)
     return rtn
 
+def sqlite_table_matches(con, tables):
+    """
+    :param con: a SQLite connection
+    :param tables: an iterable of table names
+    :return: a dictionary mapping each table name to the list of tables (and views) of the SQLite database that
+             match it. Matching is case insensitive, and treats spaces in the SQLite names as underscores
+             (i.e. a match is equivalent to being one of the all_underscore_replacements of the table name).
+             The sqlite_master catalog is read once, rather than probing the database for each candidate name.
+    """
+    candidates = defaultdict(list)
+    for (name,) in con.execute("Select name from sqlite_master where type in ('table', 'view')"):
+        candidates[name.lower().replace(" ", "_")].append(name)
+    return {t: list(candidates.get(t.lower(), [])) for t in tables}
+
+def sqlite_column_names(con, table):
+    """
+    :param con: a SQLite connection
+    :param table: the name of a table (or view) in the SQLite database
+    :return: the list of column names of the table, read from the catalog (i.e. without scanning any rows)
+    """
+    return [row[1] for row in con.execute("PRAGMA table_info([%s])"%table)]
+
+DeltaWriteCounts = namedtuple("DeltaWriteCounts", ["inserted", "updated", "deleted"])
+
+def _stored_form(row):
+    # the form in which sqlite3 stores a row - nan becomes null, and dates (and datetimes) become their str
+    return tuple(None if x is None or x != x else str(x) if isinstance(x, datetime_.date) else x for x in row)
+
+def sqlite_delta_write(con, table, primary_key_fields, data_fields, rows, batch_size=10000):
+    """
+    brings a SQLite table in line with rows, touching only the records that differ.
+
+    :param con: a SQLite connection. The caller is responsible for committing.
+    :param table: the name of an existing table of the SQLite database
+    :param primary_key_fields: the primary key fields. If empty, the table is compared as a whole
+                               (as a multiset of rows) and rewritten in full only if it differs.
+    :param data_fields: the data fields
+    :param rows: an iterable of tuples, each holding the primary key values followed by the data field values,
+                 formatted as they are to be written. If there are primary key fields, no two rows can share
+                 a primary key.
+    :param batch_size: the number of records read from the database at a time
+    :return: a DeltaWriteCounts of the number of records inserted, updated and deleted.
+             Records are matched by primary key and updated or deleted by rowid, so no index is needed.
+             Cells are compared in the form sqlite3 stores them (so that nan matches null, and a datetime matches
+             its text).
+    """
+    fields = tuple(primary_key_fields) + tuple(data_fields)
+    bracketed = ",".join("[%s]"%f for f in fields)
+    insert = "Insert into [%s] (%s) values (%s)"%(table, bracketed, ",".join("?" * len(fields)))
+    cursor = con.execute("Select rowid, %s from [%s]"%(bracketed, table))
+    existing_rows = chain.from_iterable(iter(lambda: cursor.fetchmany(batch_size), []))
+    if not primary_key_fields:
+        existing = [row[1:] for row in existing_rows]
+        rows = list(rows)
+        if Counter(map(_stored_form, existing)) == Counter(map(_stored_form, rows)):
+            return DeltaWriteCounts(0, 0, 0)
+        con.execute("Delete from [%s]"%table)
+        con.executemany(insert, rows)
+        return DeltaWriteCounts(len(rows), 0, len(existing))
+    num_pks = len(primary_key_fields)
+    existing, deletes = {}, [] # existing maps primary key -> (rowid, data), deletes holds rowid singletons
+    for row in existing_rows:
+        key = row[1:num_pks+1]
+        if key in existing: # duplicated primary keys are resolved by keeping only the last record
+            deletes.append(existing[key][:1])
+        existing[key] = (row[0], row[num_pks+1:])
+    inserts, updates = [], []
+    for row in rows:
+        key, data = row[:num_pks], row[num_pks:]
+        rowid, old_data = existing.pop(key, None) or existing.pop(_stored_form(key), (None, None))
+        if rowid is None:
+            inserts.append(row)
+        elif old_data != data and _stored_form(old_data) != _stored_form(data):
+            updates.append(data + (rowid,))
+    deletes.extend((rowid,) for rowid, _ in existing.values())
+    con.executemany("Delete from [%s] where rowid = ?"%table, deletes)
+    if data_fields:
+        con.executemany("Update [%s] set %s where rowid = ?"%
+                        (table, ",".join("[%s] = ?"%f for f in data_fields)), updates)
+    con.executemany(insert, inserts)
+    return DeltaWriteCounts(len(inserts), len(updates), len(deletes))
+
 def all_subsets(my_set):
     return [set(subset) for l in range(len(my_set)+1) for subset in combinations(my_set, l)]
 
@@ -802,11 +1175,12 @@ def safe_apply(f) :
             return None
     return _rtn
 
-def dictish(x): return all(hasattr(x, _) for _ in
+# the built in types are checked first, since these functions are called for every row of every table
+def dictish(x): return type(x) is dict or all(hasattr(x, _) for _ in
                            ("__getitem__", "keys", "values", "items", "__contains__", "__len__"))
-def stringish(x): return all(hasattr(x, _) for _ in ("lower", "upper", "strip"))
-def containerish(x): return all(hasattr(x, _) for _ in ("__iter__", "__len__", "__contains__")) \
-                                and not stringish(x)
+def stringish(x): return type(x) is str or all(hasattr(x, _) for _ in ("lower", "upper", "strip"))
+def containerish(x): return type(x) in (list, tuple, dict, set, frozenset) or \
+                            (all(hasattr(x, _) for _ in ("__iter__", "__len__", "__contains__")) and not stringish(x))
 def generatorish(x): return all(hasattr(x, _) for _ in ("__iter__", "next")) \
                             and not (containerish(x) or dictish(x))
 def numericish(x) : return isinstance(x, Number) and not isinstance(x, bool)
@@ -880,53 +1254,356 @@ def deep_freeze(x) :
     return frozenset(map(deep_freeze,x))
 
 
-def td_row_factory(table, key_field_names, data_field_names, default_values={}):
+class TableState(object):
+    """
+    The state a TicDat table shares with its rows. The version is incremented by every edit to the table
+    or its rows, so that work done on an unchanged table can be remembered.
+    The listeners are told about every row that is added, removed or edited, via their row_added(key, row),
+    row_removed(key, row) and row_edited(key, row, field, old_value, new_value) methods.
+    """
+    __slots__ = ("frozen", "version", "listeners")
+    def __init__(self):
+        self.frozen = False
+        self.version = 0
+        self.listeners = ()
+
+class FullRowView(Mapping):
+    """
+    A read-only field name -> value view of a keyed TicDat row, combining the primary key and the data row
+    without copying either. Unknown field names raise KeyError, just like the equivalent dict would.
+    """
+    __slots__ = ("_positions", "_key", "_row")
+    @staticmethod
+    def positions(key_field_names, data_field_names):
+        """
+        :return: the field -> position mapping that FullRowView objects for such a table share
+        """
+        rtn = {f: (i if len(key_field_names) > 1 else -1) for i, f in enumerate(key_field_names)}
+        rtn.update((f, None) for f in data_field_names)
+        return rtn
+    def __init__(self, positions, key, row):
+        self._positions, self._key, self._row = positions, key, row
+    def __getitem__(self, field):
+        position = self._positions[field]
+        if position is None:
+            return self._row[field]
+        return self._key if position < 0 else self._key[position]
+    def __contains__(self, field):
+        return field in self._positions
+    def __iter__(self):
+        return iter(self._positions)
+    def __len__(self):
+        return len(self._positions)
+    def __repr__(self):
+        return "_frv:" + dict(self).__repr__()
+
+class TableIndexes(object):
+    """
+    The hash indexes a TicDat table keeps on subsets of its fields. Each index maps the values of its fields
+    to the primary keys of the matching rows, and is kept current as the table and its rows are edited.
+    """
+    def __init__(self, key_field_names, index_fields):
+        self._key_posn = {f: i for i, f in enumerate(key_field_names)}
+        self._single_key = len(key_field_names) == 1
+        self._indexes = {frozenset(fields): (tuple(fields), {}) for fields in index_fields}
+    def _values(self, fields, key, row, edited_field=None, value=None):
+        key = (key,) if self._single_key else key
+        return tuple(value if f == edited_field else key[self._key_posn[f]] if f in self._key_posn else row[f]
+                     for f in fields)
+    def row_added(self, key, row):
+        for fields, index in self._indexes.values():
+            index.setdefault(self._values(fields, key, row), {})[key] = None
+    def _remove(self, key, row, edited_field=None, value=None):
+        for fields, index in self._indexes.values():
+            if edited_field is None or edited_field in fields:
+                values = self._values(fields, key, row, edited_field, value)
+                del index[values][key]
+                if not index[values]:
+                    del index[values]
+    def row_removed(self, key, row):
+        self._remove(key, row)
+    def row_edited(self, key, row, field, old_value, new_value):
+        self._remove(key, row, field, old_value)
+        for fields, index in self._indexes.values():
+            if field in fields:
+                index.setdefault(self._values(fields, key, row, field, new_value), {})[key] = None
+    def lookup(self, table_name, field_values):
+        verify(frozenset(field_values) in self._indexes,
+               "There is no index on the fields %s for %s"%(tuple(field_values), table_name))
+        fields, index = self._indexes[frozenset(field_values)]
+        return tuple(index.get(tuple(field_values[f] for f in fields), ()))
+
+class _TableListener(object):
+    __slots__ = ("row_added", "row_removed", "row_edited")
+    def __init__(self, row_added, row_removed, row_edited):
+        self.row_added, self.row_removed, self.row_edited = row_added, row_removed, row_edited
+
+class ForeignKeyLinks(object):
+    """
+    The navigation attributes that enable_foreign_key_links adds to the rows of a foreign table, kept current
+    as rows are added to and removed from the native and foreign tables. native_listener and foreign_listener
+    are the TableState listeners for the native table and the foreign table, respectively.
+    """
+    def __init__(self, link_name, foreign_table, native_fields, link_keys, link_dict_factory=None):
+        """
+        :param link_keys: maps the key and row of a native row (and optionally, an edited field and its old value)
+                          to the primary key of the foreign row it references, and to its key in the link dictionary
+        :param link_dict_factory: makes the link dictionaries. None for one-to-one links, where the
+                                  attribute is simply a reference to the native row.
+        """
+        self._link_name, self._foreign_table, self._native_fields = link_name, foreign_table, native_fields
+        self._link_keys, self._link_dict_factory = link_keys, link_dict_factory
+        # the links for the foreign key values that don't (currently) match a foreign row
+        self._pending = {}
+        self.native_listener = _TableListener(self._native_added, self._native_removed, self._native_edited)
+        self.foreign_listener = _TableListener(self._foreign_added, self._foreign_removed,
+                                               lambda key, row, field, old_value, new_value: None)
+    def _foreign_added(self, key, row):
+        if self._link_dict_factory:
+            link_dict = self._link_dict_factory()
+            link_dict.update(self._pending.pop(key, ()))
+            setattr(row, self._link_name, link_dict)
+        elif key in self._pending:
+            setattr(row, self._link_name, self._pending.pop(key))
+    def _foreign_removed(self, key, row):
+        if hasattr(row, self._link_name) and (self._link_dict_factory is None or getattr(row, self._link_name)):
+            self._pending[key] = getattr(row, self._link_name)
+    def _native_added(self, key, row):
+        foreign_key, link_key = self._link_keys(key, row)
+        foreign_row = self._foreign_table.get(foreign_key)
+        if self._link_dict_factory:
+            link_dict = getattr(foreign_row, self._link_name) if foreign_row is not None else \
+                        self._pending.setdefault(foreign_key, {})
+            link_dict[link_key] = row
+        elif foreign_row is not None:
+            setattr(foreign_row, self._link_name, row)
+        else:
+            self._pending[foreign_key] = row
+    def _native_removed(self, key, row, edited_field=None, old_value=None):
+        foreign_key, link_key = self._link_keys(key, row, edited_field, old_value)
+        foreign_row = self._foreign_table.get(foreign_key)
+        if self._link_dict_factory:
+            link_dict = getattr(foreign_row, self._link_name) if foreign_row is not None else \
+                        self._pending.get(foreign_key, {})
+            if link_dict.get(link_key) is row:
+                del link_dict[link_key]
+            if foreign_row is None and not link_dict:
+                self._pending.pop(foreign_key, None)
+        elif foreign_row is not None:
+            if getattr(foreign_row, self._link_name, None) is row:
+                delattr(foreign_row, self._link_name)
+        elif self._pending.get(foreign_key) is row:
+            del self._pending[foreign_key]
+    def _native_edited(self, key, row, field, old_value, new_value):
+        if field in self._native_fields:
+            self._native_removed(key, row, field, old_value)
+            self._native_added(key, row)
+
+class ForeignKeyFailureTracker(object):
+    """
+    The foreign key failures for one foreign key of a TicDat object. The native rows are reference counted by the
+    foreign values they look up, and the foreign rows by the foreign values they provide. The listeners record the
+    foreign values touched since the last check, and failures() rechecks only those.
+    """
+    def __init__(self, native_table, foreign_table, native_fields, foreign_fields, native_values, foreign_values):
+        """
+        :param native_values: maps the key and row of a native row (and optionally, an edited field and its
+                              old value) to the foreign values it looks up
+        :param foreign_values: the same, for the foreign values provided by a foreign row
+        """
+        self.states = (native_table._state, foreign_table._state)
+        self._native_fields, self._foreign_fields = native_fields, foreign_fields
+        self._native_values, self._foreign_values = native_values, foreign_values
+        self._parent_counts = {}
+        self._children = {}
+        self._changed = set()
+        self._failed = set()
+        self.native_listener = _TableListener(self._native_added, self._native_removed, self._native_edited)
+        self.foreign_listener = _TableListener(self._foreign_added, self._foreign_removed, self._foreign_edited)
+        for key, row in foreign_table.items():
+            self._foreign_added(key, row)
+        for key, row in native_table.items():
+            self._native_added(key, row)
+        for state, listener in zip(self.states, (self.native_listener, self.foreign_listener)):
+            state.listeners += (listener,)
+    def detach(self):
+        for state, listener in zip(self.states, (self.native_listener, self.foreign_listener)):
+            state.listeners = tuple(_ for _ in state.listeners if _ is not listener)
+    def _native_added(self, key, row, edited_field=None, old_value=None):
+        values = self._native_values(key, row, edited_field, old_value)
+        self._children.setdefault(values, {})[key] = None
+        self._changed.add(values)
+    def _native_removed(self, key, row, edited_field=None, old_value=None):
+        values = self._native_values(key, row, edited_field, old_value)
+        children = self._children[values]
+        del children[key]
+        if not children:
+            del self._children[values]
+        self._changed.add(values)
+    def _native_edited(self, key, row, field, old_value, new_value):
+        if field in self._native_fields:
+            self._native_removed(key, row, field, old_value)
+            self._native_added(key, row)
+    def _foreign_added(self, key, row, edited_field=None, old_value=None):
+        values = self._foreign_values(key, row, edited_field, old_value)
+        self._parent_counts[values] = self._parent_counts.get(values, 0) + 1
+        self._changed.add(values)
+    def _foreign_removed(self, key, row, edited_field=None, old_value=None):
+        values = self._foreign_values(key, row, edited_field, old_value)
+        self._parent_counts[values] -= 1
+        if not self._parent_counts[values]:
+            del self._parent_counts[values]
+        self._changed.add(values)
+    def _foreign_edited(self, key, row, field, old_value, new_value):
+        if field in self._foreign_fields:
+            self._foreign_removed(key, row, field, old_value)
+            self._foreign_added(key, row)
+    def failures(self):
+        """
+        :return: a dictionary of the failed foreign values to the primary keys of the native rows that look them up
+        """
+        for values in self._changed:
+            if values in self._children and values not in self._parent_counts:
+                self._failed.add(values)
+            else:
+                self._failed.discard(values)
+        self._changed.clear()
+        return {values: tuple(self._children[values]) for values in self._failed}
+
+class DataLessRow(FreezeableDict):
+    """
+    The row of a table with no data fields. It can't hold any data, but can still hold foreign key links.
+    """
+    def __setitem__(self, key, value):
+        raise TicDatError("Attempting to add data to a row of a table with no data fields")
+    def update(self, *args, **kwargs):
+        verify(not dict(*args, **kwargs), "Attempting to add data to a row of a table with no data fields")
+    def setdefault(self, key, default=None):
+        raise TicDatError("Attempting to add data to a row of a table with no data fields")
+
+# the state of the rows that aren't (yet) part of a table
+_unbound_table_state = TableState()
+
+def td_row_factory(table, key_field_names, data_field_names, default_values={}, link_names=()):
     assert dictish(default_values) and set(default_values).issubset(data_field_names)
     assert not set(key_field_names).intersection(data_field_names)
     if not data_field_names:
          # need a freezeable dict not a frozen dict here so can still link foreign keys
         def makefreezeabledict(x=()) :
             verify(containerish(x) and len(x) == 0, "Attempting to add non-empty data to %s"%table)
-            return FreezeableDict()
+            return DataLessRow()
         return makefreezeabledict
     fieldtoindex = {x:data_field_names.index(x) for x in data_field_names}
     indextofield = {v:k for k,v in fieldtoindex.items()}
-    class TicDatDataRow(freezable_factory(object, "_attributesFrozen")) :
-        def __init__(self, x):
-            # since ticDat targeting numerical analysis, 0 is good default default
-            self._data = [0] * len(fieldtoindex)
-            if dictish(x) :
+    field_names = tuple(indextofield[i] for i in range(len(data_field_names)))
+    # the data values are stored inline in slots, and the foreign key links (if any) get slots of their own.
+    # the freeze state is shared with the table, so that a table can freeze all of its rows at once
+    data_slots = tuple("_%s"%i for i in range(len(data_field_names)))
+    link_slots = tuple(sorted(set(link_names)))
+    if not all(_.isidentifier() for _ in link_slots) or set(link_slots).intersection(data_slots):
+        link_slots = ("__dict__",)
+    defaults = tuple(default_values.get(indextofield[i], 0) for i in range(len(data_field_names)))
+    class TicDatDataRow(object) :
+        __slots__ = ("_state", "_key") + data_slots + link_slots
+        def __init__(self, x, state=None, key=None):
+            state_descriptor.__set__(self, state or _unbound_table_state)
+            key_descriptor.__set__(self, key)
+            if isinstance(x, TicDatDataRow):
+                for d in descriptors:
+                    d.__set__(self, d.__get__(x))
+            elif dictish(x) :
                 verify(set(x.keys()).issubset(fieldtoindex),
                        "Applying inappropriate data field names to %s"%table)
-                for f,i in fieldtoindex.items():
-                    if f in default_values :
-                        self._data[i] = default_values[f]
+                # since ticDat targeting numerical analysis, 0 is good default default
+                for d, _d in zip(descriptors, defaults):
+                    d.__set__(self, _d)
                 for f,_d in x.items():
-                    self[f] = _d
+                    fieldtodescriptor[f].__set__(self, _d)
             elif containerish(x) :
-                verify(len(x) == len(self), "%s requires each row to have %s data values"%
-                       (table, len(self)))
-                for i in range(len(self)):
-                    self._data[i] = x[i]
+                verify(len(x) == len(descriptors), "%s requires each row to have %s data values"%
+                       (table, len(descriptors)))
+                for d, _d in zip(descriptors, x):
+                    d.__set__(self, _d)
             else:
-                verify(len(self) ==1, "%s requires each row to have %s data values"%
-                       (table, len(self)))
-                self._data[0] = x
+                verify(len(descriptors) ==1, "%s requires each row to have %s data values"%
+                       (table, len(descriptors)))
+                descriptors[0].__set__(self, x)
         def __getitem__(self, item):
             try :
-                return self._data[fieldtoindex[item]]
+                return fieldtodescriptor[item].__get__(self)
             except :
                 raise TicDatError("Key error : %s not data field name for table %s"% (item, table))
         def __setitem__(self, key, value):
             verify(key in fieldtoindex, "Key error : %s not data field name for table %s"%
                    (key, table))
-            if getattr(self, "_dataFrozen", False) :
+            state = self._state
+            if state.frozen :
                 raise TicDatError("Can't edit a frozen TicDatDataRow")
-            self._data[fieldtoindex[key]] = value
+            state.version += 1
+            if state.listeners:
+                old_value = fieldtodescriptor[key].__get__(self)
+                fieldtodescriptor[key].__set__(self, value)
+                for listener in state.listeners:
+                    listener.row_edited(self._key, self, key, old_value, value)
+            else:
+                fieldtodescriptor[key].__set__(self, value)
+        @classmethod
+        def _from_values(cls, values, state, key=None):
+            # the trusted constructor, used for bulk loading
+            rtn = object.__new__(cls)
+            state_descriptor.__set__(rtn, state)
+            key_descriptor.__set__(rtn, key)
+            for d, _d in zip(descriptors, values):
+                d.__set__(rtn, _d)
+            return rtn
+        @property
+        def _dataFrozen(self):
+            return self._state.frozen
+        @property
+        def _attributesFrozen(self):
+            return self._state.frozen
+        def __setattr__(self, key, value):
+            if self._attributesFrozen :
+                raise TicDatError("can't set attributes to a frozen " + self.__class__.__name__)
+            return super(TicDatDataRow, self).__setattr__(key, value)
+        def __delattr__(self, item):
+            if self._attributesFrozen :
+                raise TicDatError("can't del attributes to a frozen " + self.__class__.__name__)
+            return super(TicDatDataRow, self).__delattr__(item)
+        def _detach(self):
+            # called when the row leaves its table
+            state_descriptor.__set__(self, _unbound_table_state)
+            key_descriptor.__set__(self, None)
+        def _link_state(self):
+            if link_slots == ("__dict__",):
+                return dict(getattr(self, "__dict__", {}))
+            return {s: getattr(self, s) for s in link_slots if hasattr(self, s)}
+        def __reduce_ex__(self, protocol):
+            # the default reduction restores the slots through __setattr__, which can't run before _state is
+            # restored. Restoring everything in __setstate__ lets deepcopy memoize the row before it copies the
+            # state the row shares with its table (and, through the foreign key links, with other rows)
+            return object.__new__, (self.__class__,), (self._state, self._key, self.values(), self._link_state())
+        def __setstate__(self, state):
+            _state, key, values, links = state
+            state_descriptor.__set__(self, _state)
+            key_descriptor.__set__(self, key)
+            for d, _d in zip(descriptors, values):
+                d.__set__(self, _d)
+            for k, v in links.items():
+                object.__setattr__(self, k, v) # __setattr__ would refuse to edit a frozen row
+        def __copy__(self):
+            # a shallow copy isn't part of any table, and so its edits notify nobody
+            state = _unbound_table_state
+            if self._state.frozen:
+                state = TableState()
+                state.frozen = True
+            rtn = object.__new__(self.__class__)
+            rtn.__setstate__((state, None, self.values(), self._link_state()))
+            return rtn
         def keys(self):
-            return tuple(indextofield[i] for i in range(len(self)))
+            return field_names
         def values(self):
-            return tuple(self._data)
+            return values_getter(self)
         def items(self):
             return zip(self.keys(), self.values())
         def __contains__(self, item):
@@ -934,12 +1611,303 @@ def td_row_factory(table, key_field_names, data_field_names, default_values={}):
         def __iter__(self):
             return iter(fieldtoindex)
         def __len__(self):
-            return len(self._data)
+            return len(descriptors)
         def __repr__(self):
             return "_td:" + {k:v for k,v in self.items()}.__repr__()
+    state_descriptor = TicDatDataRow.__dict__["_state"]
+    key_descriptor = TicDatDataRow.__dict__["_key"]
+    descriptors = tuple(TicDatDataRow.__dict__[_] for _ in data_slots)
+    values_getter = attrgetter(*data_slots) if len(data_slots) > 1 else (lambda row: (descriptors[0].__get__(row),))
+    fieldtodescriptor = {f:descriptors[i] for f,i in fieldtoindex.items()}
     assert dictish(TicDatDataRow)
     return TicDatDataRow
 
+def _columnar_dtype(data_type):
+    # only the data types that exclude strings, None and datetime are candidates for a numpy column
+    if not (numpy and data_type) or data_type.datetime or data_type.strings_allowed or data_type.nullable or \
+       not data_type.number_allowed:
+        return None
+    return numpy.int64 if data_type.must_be_int else numpy.float64
+
+def _fits_columnar_dtype(dtype, x):
+    if isinstance(x, bool) or not isinstance(x, (int, float, numpy.integer, numpy.floating)):
+        return False
+    if dtype is numpy.float64:
+        return isinstance(x, (float, numpy.floating)) or -2**53 < x < 2**53
+    return isinstance(x, (int, numpy.integer)) and -2**63 <= x < 2**63
+
+class ColumnarTicDatDict(freezable_factory(MutableMapping, "_attributesFrozen")):
+    """
+    Base class for the columnar (struct-of-arrays) TicDat tables. Don't use this class directly,
+    td_columnar_table_factory will subclass it for each table.
+    The rows are stored as one key index and one column per data field. The columns are numpy arrays when the
+    data type of the field permits (and are otherwise lists). A column reverts to a list if it is asked to hold
+    a value its numpy dtype can't represent faithfully.
+    The rows are views addressed by key. A view is stamped with the generation of its key when it is made, and
+    is dead once its key is removed or replaced (even if the key is later added back).
+    """
+    _table = None
+    _key_field_names = ()
+    _data_field_names = ()
+    _default_values = {}
+    _dtypes = {}
+    _row_class = None
+    _index_fields = ()
+    def __init__(self, *args, **kwargs):
+        self._state = TableState()
+        if self._index_fields:
+            self._indexes = TableIndexes(self._key_field_names, self._index_fields)
+            self._state.listeners += (self._indexes,)
+        self._index = {}
+        self._keys = []
+        self._columns = {f: self._new_column(f, 8) for f in self._data_field_names}
+        self._epoch = 0 # bumped by clear
+        self._removals = {} # key -> number of times the key has been removed or replaced, since the last clear
+        self.update(*args, **kwargs)
+    def _generation(self, key):
+        return self._epoch, self._removals.get(key, 0)
+    def _removed(self, key):
+        self._removals[key] = self._removals.get(key, 0) + 1
+    def _new_column(self, f, capacity):
+        if self._dtypes.get(f):
+            return numpy.empty(capacity, dtype=self._dtypes[f])
+        return []
+    def _before_edit(self):
+        if getattr(self, "_dataFrozen", False):
+            raise TicDatError("Can't edit a frozen " + self.__class__.__name__)
+        self._state.version += 1
+    def _row_values(self, x):
+        if dictish(x):
+            verify(set(x.keys()).issubset(self._columns),
+                   "Applying inappropriate data field names to %s"%self._table)
+            return [x[f] if f in x else self._default_values.get(f, 0) for f in self._data_field_names]
+        if containerish(x):
+            verify(len(x) == len(self._data_field_names), "%s requires each row to have %s data values"%
+                   (self._table, len(self._data_field_names)))
+            return list(x)
+        verify(len(self._data_field_names) == 1, "%s requires each row to have %s data values"%
+               (self._table, len(self._data_field_names)))
+        return [x]
+    def _set_cell(self, f, i, x):
+        col = self._columns[f]
+        if isinstance(col, list):
+            if i == len(col):
+                col.append(x)
+            else:
+                col[i] = x
+            return
+        if not _fits_columnar_dtype(col.dtype.type, x):
+            self._columns[f] = col = col[:len(self._keys)].tolist()
+            return self._set_cell(f, i, x)
+        if i >= len(col):
+            new_col = numpy.empty(max(8, 2 * len(col)), dtype=col.dtype)
+            new_col[:len(col)] = col
+            self._columns[f] = col = new_col
+        col[i] = x
+    def _check_generation(self, key, generation):
+        if generation is not None and generation != (self._epoch, self._removals.get(key, 0)):
+            raise TicDatError("The %s row for %s is no longer in the table"%(self._table, key))
+    def _get_cell(self, key, f, generation=None):
+        self._check_generation(key, generation)
+        if f not in self._columns:
+            raise TicDatError("Key error : %s not data field name for table %s"% (f, self._table))
+        col = self._columns[f]
+        i = self._index[key]
+        return col[i] if isinstance(col, list) else col.item(i)
+    def _set_existing_cell(self, key, f, x, generation=None):
+        self._check_generation(key, generation)
+        verify(f in self._columns, "Key error : %s not data field name for table %s"% (f, self._table))
+        if getattr(self, "_dataFrozen", False):
+            raise TicDatError("Can't edit a frozen TicDatDataRow")
+        self._state.version += 1
+        if self._state.listeners:
+            old_value = self._get_cell(key, f)
+            self._set_cell(f, self._index[key], x)
+            for listener in self._state.listeners:
+                listener.row_edited(key, self._row_class(self, key), f, old_value, x)
+        else:
+            self._set_cell(f, self._index[key], x)
+    def __setitem__(self, key, value):
+        self._before_edit()
+        keylen = len(self._key_field_names)
+        verify(containerish(key) == (keylen > 1) and (keylen == 1 or keylen == len(key)),
+               "inconsistent key length for %s"%self._table)
+        values = self._row_values(value)
+        if key in self._index:
+            i = self._index[key]
+            for listener in self._state.listeners:
+                listener.row_removed(key, self._row_class(self, key))
+            self._removed(key)
+        else:
+            i = len(self._keys)
+            for f in self._data_field_names: # make room first, so that a failure can't leave a ragged table
+                if isinstance(self._columns[f], list):
+                    self._columns[f].append(None)
+            self._index[key] = i
+            self._keys.append(key)
+        for f, x in zip(self._data_field_names, values):
+            self._set_cell(f, i, x)
+        for listener in self._state.listeners:
+            listener.row_added(key, self._row_class(self, key))
+    def __getitem__(self, key):
+        if key not in self._index:
+            if getattr(self, "_dataFrozen", False):
+                raise KeyError(key)
+            self[key] = {}
+        return self._row_class(self, key)
+    def __delitem__(self, key):
+        self._before_edit()
+        if key in self._index:
+            for listener in self._state.listeners:
+                listener.row_removed(key, self._row_class(self, key))
+        i = self._index.pop(key)
+        self._removed(key)
+        last = len(self._keys) - 1
+        for col in self._columns.values():
+            col[i] = col[last]
+            if isinstance(col, list):
+                col.pop()
+        if i != last:
+            self._keys[i] = self._keys[last]
+            self._index[self._keys[i]] = i
+        self._keys.pop()
+    def __contains__(self, key):
+        return key in self._index
+    def __iter__(self):
+        return iter(self._keys)
+    def __len__(self):
+        return len(self._keys)
+    def get(self, key, default=None):
+        return self[key] if key in self._index else default
+    def pop(self, key, *args):
+        verify(len(args) <= 1, "pop expected at most 2 arguments")
+        if key not in self._index:
+            if args:
+                return args[0]
+            raise KeyError(key)
+        rtn = {f: self._get_cell(key, f) for f in self._data_field_names}
+        del self[key]
+        return rtn
+    def setdefault(self, key, default=None):
+        if key not in self._index:
+            self[key] = {} if default is None else default
+        return self[key]
+    def clear(self):
+        self._before_edit()
+        for key in self._keys if self._state.listeners else ():
+            for listener in self._state.listeners:
+                listener.row_removed(key, self._row_class(self, key))
+        self._index = {}
+        self._keys = []
+        self._columns = {f: self._new_column(f, 8) for f in self._data_field_names}
+        self._epoch += 1
+        self._removals = {}
+    def _load_columns(self, keys, columns):
+        # the trusted bulk load of an empty table, with one data column per data field
+        assert not self._keys
+        self._state.version += 1
+        keys = list(keys)
+        columns = [list(_) for _ in columns]
+        index = {k: i for i, k in enumerate(keys)}
+        if len(index) < len(keys): # the duplicated keys are resolved one row at a time
+            for i, k in enumerate(keys):
+                self[k] = [c[i] for c in columns]
+            return
+        self._index, self._keys = index, keys
+        for f, col in zip(self._data_field_names, columns):
+            dtype = self._dtypes.get(f)
+            if dtype and all(_fits_columnar_dtype(dtype, x) for x in col):
+                col = numpy.array(col, dtype=dtype) if col else self._new_column(f, 8)
+            self._columns[f] = col
+        for key in keys if self._state.listeners else ():
+            for listener in self._state.listeners:
+                listener.row_added(key, self._row_class(self, key))
+    def lookup(self, **field_values):
+        """
+        :param field_values: the values for the fields of one of the indexes declared with TicDatFactory.add_index
+        :return: a dictionary of primary key to row, for the rows matching field_values
+        """
+        verify(self._index_fields, "There are no indexes for %s"%self._table)
+        return {k: self._row_class(self, k) for k in self._indexes.lookup(self._table, field_values)}
+    def column(self, field):
+        """
+        :param field: a primary key field or data field for this table
+        :return: the field values for every row, ordered consistently with iteration over the table.
+                 A read-only numpy array when numpy is available, otherwise a tuple.
+        """
+        verify(field in self._columns or field in self._key_field_names,
+               "%s is not a field for table %s"%(field, self._table))
+        if field in self._columns:
+            col = self._columns[field]
+            if not isinstance(col, list):
+                rtn = col[:len(self._keys)]
+                rtn.flags.writeable = False
+                return rtn
+            rtn = col
+        elif len(self._key_field_names) == 1:
+            rtn = self._keys
+        else:
+            i = self._key_field_names.index(field)
+            rtn = [k[i] for k in self._keys]
+        if not numpy:
+            return tuple(rtn)
+        rtn_ = numpy.empty(len(rtn), dtype=object)
+        try:
+            rtn_[:] = rtn
+        except ValueError: # numpy tries to unpack cells that are themselves sequences
+            for i, x in enumerate(rtn):
+                rtn_[i] = x
+        rtn_.flags.writeable = False
+        return rtn_
+    def __repr__(self):
+        return "td:" + {k: self[k] for k in self._keys}.__repr__()
+
+def td_columnar_table_factory(table, key_field_names, data_field_names, default_values={}, data_types={},
+                              index_fields=()):
+    """
+    :return: a ColumnarTicDatDict subclass for table. Rows are materialized as lightweight views over the columns.
+    """
+    assert key_field_names and not set(key_field_names).intersection(data_field_names)
+    assert dictish(default_values) and set(default_values).issubset(data_field_names)
+    fieldtoindex = {x:data_field_names.index(x) for x in data_field_names}
+    class TicDatColumnarDataRow(object):
+        __slots__ = ("_owner", "_key", "_generation")
+        def __init__(self, owner, key):
+            self._owner = owner
+            self._key = key
+            self._generation = owner._generation(key)
+        def __getitem__(self, item):
+            return self._owner._get_cell(self._key, item, self._generation)
+        def __setitem__(self, key, value):
+            self._owner._set_existing_cell(self._key, key, value, self._generation)
+        def keys(self):
+            return tuple(data_field_names)
+        def values(self):
+            return tuple(self[f] for f in data_field_names)
+        def items(self):
+            return zip(self.keys(), self.values())
+        def __contains__(self, item):
+            return item in fieldtoindex
+        def __iter__(self):
+            return iter(data_field_names)
+        def __len__(self):
+            return len(data_field_names)
+        def __repr__(self):
+            return "_td:" + {k:v for k,v in self.items()}.__repr__()
+    assert dictish(TicDatColumnarDataRow)
+    class TicDatColumnarDict(ColumnarTicDatDict):
+        _table = table
+        _key_field_names = tuple(key_field_names)
+        _data_field_names = tuple(data_field_names)
+        _default_values = dict(default_values)
+        _dtypes = {f: _columnar_dtype(data_types.get(f)) for f in data_field_names
+                   if _columnar_dtype(data_types.get(f)) and
+                   _fits_columnar_dtype(_columnar_dtype(data_types.get(f)), default_values.get(f, 0))}
+        _row_class = TicDatColumnarDataRow
+        _index_fields = tuple(map(tuple, index_fields))
+    assert dictish(TicDatColumnarDict)
+    return TicDatColumnarDict
+
 
 class Sloc(object):
     """
@@ -1132,7 +2100,8 @@ def nearly_same(x1, x2, epsilon) :
     return per_error(x1, x2) < epsilon
 
 RowPredicateInfo = namedtuple("RowPredicateInfo", ["predicate", "predicate_kwargs_maker",
-                                                   "predicate_failure_response"])
+                                                   "predicate_failure_response", "vectorized"])
+RowPredicateInfo.__new__.__defaults__ = (False,) # only PanDatFactory supports vectorized predicates
 
 def does_new_fk_complete_circle(native_tbl, foreign_tbl, tdf):
     fks = defaultdict(set)
@@ -1146,4 +2115,23 @@ def does_new_fk_complete_circle(native_tbl, foreign_tbl, tdf):
             for fk in fks.get(t, ()):
                 process_table(fk.foreign_table, already_seen + [t])
     process_table(foreign_tbl, [])
-    return bool(rtn)
\ No newline at end of file
+    return bool(rtn)
+
+def foreign_key_table_order(tdf):
+    """
+    :param tdf: a TicDatFactory or PanDatFactory
+    :return: the tables of tdf, ordered so that (outside of circular foreign keys) each foreign table precedes
+             the native tables that reference it
+    """
+    parents = defaultdict(set)
+    for fk in tdf.foreign_keys:
+        if fk.native_table != fk.foreign_table:
+            parents[fk.native_table].add(fk.foreign_table)
+    rtn, placed = [], set()
+    while len(rtn) < len(tdf.all_tables):
+        ready = [t for t in sorted(tdf.all_tables) if t not in placed and parents[t].issubset(placed)]
+        # a circle of foreign keys is broken at an arbitrary table
+        for t in ready or [next(t for t in sorted(tdf.all_tables) if t not in placed)]:
+            rtn.append(t)
+            placed.add(t)
+    return tuple(rtn)
\ No newline at end of file